@@ -0,0 +1,380 @@
+"""
+Batch Job Runner
+Reads JSONL records (a URL plus questions and/or a summary request), scrapes
+and answers them as a pipelined job and streams results to an output JSONL.
+The output doubles as the checkpoint: rerunning the same command after a
+crash or Ctrl-C skips every record that already has a result.
+
+Input records:
+    {"id": "acme", "url": "https://example.com", "questions": ["Who runs it?"], "summarize": true}
+
+"id" is optional (a hash of the record is used instead), "question" may be
+given instead of "questions", and "model" overrides the job's model.
+"""
+
+import hashlib
+import json
+import os
+import sys
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from scraper import ENGINES, WebScraper
+from openai_qa import DEFAULT_CONTEXT_TOKENS, OpenAIQA
+from http_cache import HTTPCache
+from llm_cache import ResponseCache
+from rate_limiter import RateLimiter
+
+
+def record_id(record):
+    """Stable identifier of an input record"""
+    if record.get('id') is not None:
+        return str(record['id'])
+    payload = json.dumps(record, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:16]
+
+
+def load_checkpoint(output_path, retry_errors=False):
+    """
+    Collect the ids of records already written to an output file
+
+    A partially written last line (left by a crash mid-write) is cut off so
+    appending starts on a clean line.
+
+    Args:
+        output_path: Output JSONL file (may not exist yet)
+        retry_errors: Leave out records whose latest result is an error, so
+            they are run again
+
+    Returns:
+        Set of finished record ids
+    """
+    latest = {}
+    if not os.path.exists(output_path):
+        return set()
+
+    good_end = 0
+    with open(output_path, 'rb') as f:
+        for line in f:
+            if not line.endswith(b'\n'):
+                break
+            try:
+                result = json.loads(line)
+            except ValueError:
+                break
+            latest[result['id']] = result.get('error') is None
+            good_end += len(line)
+
+    if good_end < os.path.getsize(output_path):
+        with open(output_path, 'r+b') as f:
+            f.truncate(good_end)
+
+    return {key for key, ok in latest.items() if ok or not retry_errors}
+
+
+class BatchRunner:
+    def __init__(self, scraper=None, qa=None, model="gpt-3.5-turbo", fetch_concurrency=8, llm_concurrency=4,
+                 packed=False, retry_errors=False, max_context_tokens=DEFAULT_CONTEXT_TOKENS, top_k=5):
+        """
+        Initialize the runner
+
+        Args:
+            scraper: WebScraper used for fetching (a new one if None)
+            qa: OpenAIQA used for questions and summaries (required if any record
+                asks for them)
+            model: Default OpenAI model
+            fetch_concurrency: Maximum pages fetched at once
+            llm_concurrency: Maximum OpenAI requests at once
+            packed: Answer all of a record's questions in one request
+            retry_errors: On resume, run records whose previous result was an error again
+            max_context_tokens: Most page tokens sent with each question (None
+                fills the model's context window)
+            top_k: Most relevant chunks sent with each question (None for as
+                many as fit)
+        """
+        self.scraper = scraper or WebScraper()
+        self.qa = qa
+        self.model = model
+        self.fetch_concurrency = fetch_concurrency
+        self.llm_concurrency = llm_concurrency
+        self.packed = packed
+        self.retry_errors = retry_errors
+        self.max_context_tokens = max_context_tokens
+        self.top_k = top_k
+        self.stats = {
+            'records': 0,
+            'skipped': 0,
+            'completed': 0,
+            'errors': 0,
+            'tokens_used': 0
+        }
+
+    def _read(self, input_path):
+        """Yield (line number, id, record, error) for every non-blank input line"""
+        with open(input_path, encoding='utf-8') as f:
+            for line_no, line in enumerate(f, 1):
+                line = line.strip()
+                if not line or line.startswith('#'):
+                    continue
+                try:
+                    record = json.loads(line)
+                    if not isinstance(record, dict) or not isinstance(record.get('url'), str):
+                        raise ValueError("record needs a 'url' string")
+                except ValueError as e:
+                    yield line_no, f"line-{line_no}", None, f"Invalid record: {e}"
+                    continue
+                yield line_no, record_id(record), record, None
+
+    def _questions(self, record):
+        questions = record.get('questions') or []
+        if isinstance(questions, str):
+            questions = [questions]
+        if record.get('question'):
+            questions = [record['question']] + list(questions)
+        return questions
+
+    def _fetch(self, record):
+        """Scrape one record's page (runs on the fetch pool)"""
+        return self.scraper.scrape(record['url'])['text']
+
+    def _ask(self, record, text):
+        """Answer one record's questions and summary (runs on the LLM pool)"""
+        model = record.get('model') or self.model
+        questions = self._questions(record)
+        # One request at a time per record, so llm_concurrency is the real limit
+        answers = self.qa.answer_questions(
+            text, questions, model=model, mode='packed' if self.packed else 'concurrent', max_workers=1,
+            top_k=self.top_k, max_context_tokens=self.max_context_tokens
+        ) if questions else []
+        summary = None
+        summary_tokens = 0
+        if record.get('summarize'):
+            summary, summary_tokens = self.qa.summarize_content(text, model=model, max_workers=1, return_usage=True)
+        return answers, summary, summary_tokens
+
+    def run(self, input_path, output_path):
+        """
+        Run every unfinished record of the input, appending results to the output
+
+        Args:
+            input_path: Input JSONL file
+            output_path: Output JSONL file; also the checkpoint
+
+        Returns:
+            The stats dictionary
+        """
+        finished = load_checkpoint(output_path, self.retry_errors)
+        records = self._read(input_path)
+        more = True
+        # Pages waiting for the LLM stage count too, so fast fetching can't pile up text in memory
+        max_in_flight = self.fetch_concurrency + 2 * self.llm_concurrency
+        fetching = {}
+        asking = {}
+
+        fetch_pool = ThreadPoolExecutor(max_workers=self.fetch_concurrency, thread_name_prefix='batch-fetch')
+        llm_pool = ThreadPoolExecutor(max_workers=self.llm_concurrency, thread_name_prefix='batch-llm')
+        with open(output_path, 'a', encoding='utf-8') as out:
+            def write(job, answers=None, summary=None, summary_tokens=0, error=None):
+                line_no, key, record = job
+                tokens = sum(answer['tokens_used'] for answer in answers or []) + summary_tokens
+                result = {
+                    'id': key,
+                    'line': line_no,
+                    'url': record.get('url') if record else None,
+                    'answers': [
+                        {'question': answer['question'], 'answer': answer['answer'], 'tokens_used': answer['tokens_used']}
+                        for answer in answers or []
+                    ],
+                    'summary': summary,
+                    'tokens_used': tokens,
+                    'error': error
+                }
+                out.write(json.dumps(result, ensure_ascii=False) + '\n')
+                out.flush()
+                finished.add(key)
+                self.stats['tokens_used'] += tokens
+                self.stats['errors' if error else 'completed'] += 1
+
+            try:
+                while True:
+                    # Read ahead only as far as the pipeline has room
+                    while more and len(fetching) + len(asking) < max_in_flight:
+                        try:
+                            line_no, key, record, error = next(records)
+                        except StopIteration:
+                            more = False
+                            break
+                        self.stats['records'] += 1
+                        if key in finished:
+                            self.stats['skipped'] += 1
+                            continue
+                        if error:
+                            write((line_no, key, record), error=error)
+                            continue
+                        if (self._questions(record) or record.get('summarize')) and self.qa is None:
+                            write((line_no, key, record), error="No OpenAI client configured for questions")
+                            continue
+                        finished.add(key)  # Duplicates later in the input are skipped
+                        fetching[fetch_pool.submit(self._fetch, record)] = (line_no, key, record)
+
+                    if not fetching and not asking:
+                        break
+
+                    done, _ = wait(list(fetching) + list(asking), return_when=FIRST_COMPLETED)
+                    for future in done:
+                        if future in fetching:
+                            job = fetching.pop(future)
+                            try:
+                                text = future.result()
+                            except Exception as e:
+                                write(job, error=str(e))
+                                continue
+                            record = job[2]
+                            if self._questions(record) or record.get('summarize'):
+                                asking[llm_pool.submit(self._ask, record, text)] = job
+                            else:
+                                write(job)
+                        else:
+                            job = asking.pop(future)
+                            try:
+                                answers, summary, summary_tokens = future.result()
+                            except Exception as e:
+                                write(job, error=str(e))
+                                continue
+                            write(job, answers, summary, summary_tokens)
+            finally:
+                # On Ctrl-C, drop queued work; whatever is already written stays checkpointed
+                for future in list(fetching) + list(asking):
+                    future.cancel()
+                fetch_pool.shutdown(wait=False)
+                llm_pool.shutdown(wait=False)
+
+        return self.stats
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description='Batch Web Scraper with Q&A - answer questions for every record of a JSONL file'
+    )
+    parser.add_argument('input', help='Input JSONL file with one {"url": ..., "questions": [...], "summarize": ...} record per line')
+    parser.add_argument('-o', '--output', required=True, help='Output JSONL file; rerun with the same file to resume')
+    parser.add_argument(
+        '--fetch-concurrency',
+        type=int,
+        default=8,
+        help='Maximum pages fetched at once (default: 8)'
+    )
+    parser.add_argument(
+        '--llm-concurrency',
+        type=int,
+        default=4,
+        help='Maximum OpenAI requests at once (default: 4)'
+    )
+    parser.add_argument(
+        '--packed',
+        action='store_true',
+        help="Answer each record's questions in a single OpenAI request"
+    )
+    parser.add_argument(
+        '--retry-errors',
+        action='store_true',
+        help='When resuming, run records that failed last time again'
+    )
+    parser.add_argument(
+        '--engine',
+        choices=ENGINES,
+        default='bs4',
+        help='HTML extraction engine (default: bs4; lxml is faster)'
+    )
+    parser.add_argument(
+        '--cache-dir',
+        help='Cache fetched pages in this directory and revalidate them on later runs'
+    )
+    parser.add_argument(
+        '--llm-cache-dir',
+        help='Cache OpenAI answers and summaries in this directory and reuse them for identical requests'
+    )
+    parser.add_argument(
+        '--rpm',
+        type=int,
+        help="Your OpenAI requests-per-minute limit; requests are paced to stay under it"
+    )
+    parser.add_argument(
+        '--tpm',
+        type=int,
+        help="Your OpenAI tokens-per-minute limit; requests are paced to stay under it"
+    )
+    parser.add_argument(
+        '--api-key',
+        help='OpenAI API key (or set OPENAI_API_KEY environment variable)'
+    )
+    parser.add_argument(
+        '--model',
+        default='gpt-3.5-turbo',
+        help='OpenAI model to use (default: gpt-3.5-turbo)'
+    )
+    parser.add_argument(
+        '--max-context-tokens',
+        type=int,
+        default=DEFAULT_CONTEXT_TOKENS,
+        help=f"Most page tokens sent with each question (default: {DEFAULT_CONTEXT_TOKENS}); "
+             "0 fills the model's context window"
+    )
+    parser.add_argument(
+        '--top-k',
+        type=int,
+        default=5,
+        help='Most relevant chunks sent with each question (default: 5); '
+             '0 sends as many as fit in --max-context-tokens'
+    )
+
+    args = parser.parse_args()
+
+    cache = HTTPCache(args.cache_dir) if args.cache_dir else None
+    scraper = WebScraper(
+        max_concurrency=args.fetch_concurrency,
+        per_host_limit=args.fetch_concurrency,
+        engine=args.engine,
+        cache=cache
+    )
+    # Shared by every LLM worker, so a 429 pauses them all instead of failing records
+    limiter = RateLimiter(args.rpm, args.tpm) if args.rpm or args.tpm else None
+    try:
+        qa = OpenAIQA(
+            api_key=args.api_key,
+            cache=ResponseCache(args.llm_cache_dir) if args.llm_cache_dir else None,
+            rate_limiter=limiter
+        )
+    except ValueError as e:
+        print(f"⚠️ {e} Records with questions will fail.", file=sys.stderr)
+        qa = None
+
+    runner = BatchRunner(
+        scraper, qa,
+        model=args.model,
+        fetch_concurrency=args.fetch_concurrency,
+        llm_concurrency=args.llm_concurrency,
+        packed=args.packed,
+        retry_errors=args.retry_errors,
+        max_context_tokens=args.max_context_tokens or None,
+        top_k=args.top_k or None
+    )
+
+    print(f"📦 Running {args.input} → {args.output}")
+    try:
+        stats = runner.run(args.input, args.output)
+    except KeyboardInterrupt:
+        stats = runner.stats
+        print(f"\n⏸️ Interrupted after {stats['completed'] + stats['errors']} records. "
+              f"Run the same command again to resume.", file=sys.stderr)
+        sys.stdout.flush()
+        sys.stderr.flush()
+        # Results are already on disk; don't wait for requests still in flight
+        os._exit(130)
+
+    print(f"✅ {stats['completed']} completed, {stats['errors']} failed, "
+          f"{stats['skipped']} already done, {stats['tokens_used']} tokens used")
+    if limiter is not None and limiter.stats['rate_limited']:
+        print(f"⏳ Rate limited {limiter.stats['rate_limited']} times, "
+              f"{limiter.stats['seconds_waited']:.0f}s of waiting across workers")
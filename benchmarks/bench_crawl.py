@@ -0,0 +1,55 @@
+"""
+Crawler Benchmark
+Crawls a local multi-page fixture site, checks robots.txt, dedup and budgets
+are honored and reports pages per second
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fixtures import make_site
+from server import LocalServer
+from crawler import Crawler
+from scraper import WebScraper
+
+
+def run(site, latency, **options):
+    with LocalServer(site, latency=latency) as server:
+        crawler = Crawler(WebScraper(engine='lxml'), **options)
+        start = time.perf_counter()
+        pages = list(crawler.crawl(server.url + '/'))
+        elapsed = time.perf_counter() - start
+    return pages, crawler.stats, elapsed
+
+
+def main():
+    site = make_site(pages=60, fanout=4)
+    crawlable = len([path for path in site if path != '/robots.txt' and not path.startswith('/private/')])
+
+    pages, stats, elapsed = run(site, 0.05, max_pages=1000, max_depth=10, max_workers=8, per_domain_limit=8)
+    urls = [page['url'] for page in pages]
+    fetched = [page for page in pages if not page['error']]
+    assert len(urls) == len(set(urls)), "A page was fetched twice"
+    assert not any('/private/' in url for url in urls), "robots.txt was ignored"
+    assert len(fetched) == crawlable, f"Expected {crawlable} pages, crawled {len(fetched)}"
+    # Throughput counts successful fetches only
+    print(f"✅ Full crawl: {len(fetched)} pages in {elapsed:.2f}s ({len(fetched) / elapsed:.1f} pages/s), "
+          f"{len(pages) - len(fetched)} errors, {stats}")
+
+    pages, stats, _ = run(site, 0.0, max_pages=10, max_depth=10)
+    assert len(pages) == 10, "Page budget exceeded"
+    pages, stats, _ = run(site, 0.0, max_pages=1000, max_depth=1)
+    assert max(page['depth'] for page in pages) == 1, "Depth budget not honored"
+    print("✅ Page and depth budgets honored")
+
+    serial, _, serial_time = run(site, 0.05, max_pages=20, max_depth=10, max_workers=1, per_domain_limit=1)
+    serial_fetched = [page for page in serial if not page['error']]
+    print(f"Serial crawl of {len(serial_fetched)} pages: {len(serial_fetched) / serial_time:.1f} pages/s, "
+          f"{len(serial) - len(serial_fetched)} errors")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Extraction Engine Benchmark
+Checks that the bs4 and lxml engines produce the same text on the fixture
+corpus and compares their throughput in pages per second
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fixtures import corpus
+from scraper import ENGINES, WebScraper
+
+
+def pages_per_second(func, pages, min_seconds=1.0):
+    count = 0
+    start = time.perf_counter()
+    while True:
+        for html in pages:
+            func(html)
+        count += len(pages)
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_seconds:
+            return count / elapsed
+
+
+def main():
+    scrapers = {engine: WebScraper(engine=engine) for engine in ENGINES}
+    pages = corpus()
+
+    for name, html in pages.items():
+        outputs = {engine: scraper.extract_text(html) for engine, scraper in scrapers.items()}
+        structured = {engine: scraper.extract_structured_content(html) for engine, scraper in scrapers.items()}
+        assert len(set(outputs.values())) == 1, f"extract_text differs between engines on {name}"
+        assert structured['bs4'] == structured['lxml'], f"extract_structured_content differs between engines on {name}"
+    print(f"✅ Engines agree on {len(pages)} fixture pages")
+
+    by_size = {}
+    for name, html in pages.items():
+        by_size.setdefault(name.split('-')[0], []).append(html)
+
+    print(f"{'size':<8}" + ''.join(f"{engine + ' pages/s':>16}" for engine in ENGINES) + f"{'speedup':>10}")
+    for size, htmls in by_size.items():
+        rates = {engine: pages_per_second(scraper.extract_text, htmls) for engine, scraper in scrapers.items()}
+        print(f"{size:<8}" + ''.join(f"{rates[engine]:>16.1f}" for engine in ENGINES)
+              + f"{rates['lxml'] / rates['bs4']:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
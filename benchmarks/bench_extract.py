@@ -0,0 +1,72 @@
+"""
+Structured Extraction Micro-benchmark
+Compares single-pass extract_structured_content against the previous
+parse-twice implementation on the fixture corpus
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup
+
+from fixtures import corpus
+from scraper import WebScraper
+
+
+def legacy_extract_structured_content(scraper, html_content):
+    """The previous implementation: parses the page twice and walks it three times"""
+    soup = BeautifulSoup(html_content, 'lxml')
+    for script in soup(["script", "style", "meta", "link", "noscript"]):
+        script.decompose()
+
+    content = {'title': '', 'headings': [], 'paragraphs': [], 'links': []}
+    title_tag = soup.find('title')
+    if title_tag:
+        content['title'] = title_tag.get_text().strip()
+    for heading in soup.find_all(['h1', 'h2', 'h3', 'h4', 'h5', 'h6']):
+        heading_text = heading.get_text().strip()
+        if heading_text:
+            content['headings'].append(heading_text)
+    for para in soup.find_all('p'):
+        para_text = para.get_text().strip()
+        if para_text and len(para_text) > 20:
+            content['paragraphs'].append(para_text)
+
+    return {'structured': content, 'full_text': scraper.extract_text(html_content)}
+
+
+def time_per_page(func, pages, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for html in pages:
+            func(html)
+    return (time.perf_counter() - start) / (repeat * len(pages))
+
+
+def main():
+    scraper = WebScraper()
+    pages = corpus()
+    by_size = {}
+    for name, html in pages.items():
+        by_size.setdefault(name.split('-')[0], []).append(html)
+
+    print(f"{'size':<8}{'legacy ms':>12}{'single ms':>12}{'speedup':>10}")
+    for size, htmls in by_size.items():
+        # Same output apart from the links the old code never filled in
+        for html in htmls:
+            new = scraper.extract_structured_content(html)
+            old = legacy_extract_structured_content(scraper, html)
+            new['structured']['links'] = []
+            assert new == old, f"Output mismatch on {size} page"
+
+        repeat = 20 if size == 'small' else 3 if size == 'medium' else 1
+        legacy = time_per_page(lambda h: legacy_extract_structured_content(scraper, h), htmls, repeat)
+        single = time_per_page(scraper.extract_structured_content, htmls, repeat)
+        print(f"{size:<8}{legacy * 1000:>12.2f}{single * 1000:>12.2f}{legacy / single:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
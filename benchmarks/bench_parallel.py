@@ -0,0 +1,50 @@
+"""
+Parallel Extraction Benchmark
+Compares serial extract_text with ParallelExtractor at increasing worker
+counts on the fixture corpus
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fixtures import CORPUS_SIZES, make_page
+from parallel_extract import ParallelExtractor
+from scraper import WebScraper
+
+
+def batch(count=240):
+    """Mixed batch of small and medium pages as raw bytes"""
+    sizes = [CORPUS_SIZES['small'], CORPUS_SIZES['medium']]
+    return [(i, make_page(sizes[i % 2], seed=i).encode('utf-8')) for i in range(count)]
+
+
+def main():
+    engine = sys.argv[1] if len(sys.argv) > 1 else 'bs4'
+    pages = batch()
+
+    scraper = WebScraper(engine=engine)
+    start = time.perf_counter()
+    expected = {page_id: scraper.extract_text(html) for page_id, html in pages}
+    serial = len(pages) / (time.perf_counter() - start)
+    print(f"engine={engine} cpus={os.cpu_count()}")
+    print(f"{'workers':<10}{'pages/s':>10}{'speedup':>10}")
+    print(f"{'serial':<10}{serial:>10.1f}{1.0:>9.2f}x")
+
+    workers = 1
+    while workers <= (os.cpu_count() or 1):
+        with ParallelExtractor(engine=engine, max_workers=workers) as extractor:
+            # Warm the pool up so process start-up isn't timed
+            list(extractor.extract_many(pages[:workers * extractor.chunk_size]))
+            start = time.perf_counter()
+            results = {result['id']: result['content'] for result in extractor.extract_many(pages)}
+            rate = len(pages) / (time.perf_counter() - start)
+        assert results == expected, "Parallel output differs from serial extract_text"
+        print(f"{workers:<10}{rate:>10.1f}{rate / serial:>9.2f}x")
+        workers *= 2
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Rate Limit Benchmark
+Sends a burst of questions at the local OpenAI stand-in with request and
+token limits switched on, with and without a shared RateLimiter, and from
+threads and from asyncio, counting 429s and failed answers
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from openai import AsyncOpenAI
+
+from fake_openai import FakeOpenAIServer
+from fixtures import make_page
+from openai_qa import OpenAIQA
+from rate_limiter import RateLimiter
+from scraper import WebScraper
+
+
+def run_threads(server, questions, context, limiter, workers):
+    """Answer every question on a thread pool; returns (answered, failed, seconds)"""
+    qa = OpenAIQA(api_key='local', base_url=server.url, rate_limiter=limiter)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(qa.answer_question, context, question, max_tokens=100) for question in questions]
+    failed = sum(1 for future in futures if future.exception() is not None)
+    return len(questions) - failed, failed, time.perf_counter() - start
+
+
+def run_asyncio(server, count, limiter):
+    """Send count requests as concurrent asyncio tasks through the limiter"""
+    client = AsyncOpenAI(api_key='local', base_url=server.url, max_retries=0)
+    messages = [{'role': 'user', 'content': 'Say something. ' * 50}]
+
+    async def one():
+        raw = await limiter.call_async(
+            lambda: client.chat.completions.with_raw_response.create(
+                model='gpt-3.5-turbo', messages=messages, max_tokens=100
+            ),
+            tokens=300
+        )
+        return raw.parse()
+
+    async def main():
+        return await asyncio.gather(*(one() for _ in range(count)), return_exceptions=True)
+
+    start = time.perf_counter()
+    results = asyncio.run(main())
+    failed = sum(1 for result in results if isinstance(result, Exception))
+    return count - failed, failed, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare OpenAI calls with and without the shared rate limiter')
+    parser.add_argument('--questions', type=int, default=40, help='Questions sent in the burst')
+    parser.add_argument('--workers', type=int, default=16, help='Threads sending questions')
+    parser.add_argument('--rpm', type=int, default=300, help='Request limit enforced by the stand-in')
+    parser.add_argument('--tpm', type=int, default=300000, help='Token limit enforced by the stand-in')
+    args = parser.parse_args()
+
+    context = WebScraper().extract_text(make_page(20))
+    questions = [f"What does section {i} say?" for i in range(args.questions)]
+
+    print(f"{'run':<26}{'answered':>10}{'failed':>8}{'429s':>7}{'seconds':>9}")
+    for name, limiter in (('threads, no limiter', None),
+                          ('threads, RateLimiter', RateLimiter(args.rpm, args.tpm))):
+        with FakeOpenAIServer(latency=0.05, requests_per_minute=args.rpm, tokens_per_minute=args.tpm,
+                              burst_seconds=2.0) as server:
+            answered, failed, seconds = run_threads(server, questions, context, limiter, args.workers)
+            print(f"{name:<26}{answered:>10}{failed:>8}{server.rate_limited:>7}{seconds:>9.1f}")
+
+    with FakeOpenAIServer(latency=0.05, requests_per_minute=args.rpm, tokens_per_minute=args.tpm,
+                          burst_seconds=2.0) as server:
+        answered, failed, seconds = run_asyncio(server, args.questions, RateLimiter(args.rpm, args.tpm))
+        print(f"{'asyncio, RateLimiter':<26}{answered:>10}{failed:>8}{server.rate_limited:>7}{seconds:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Start-up Benchmark
+Runs the CLIs in fresh interpreters under `python -X importtime` and checks the
+cold-start cost of the paths that never talk to OpenAI: heavy modules must not
+be imported at all, and the total import time must stay within a budget
+
+Usage:
+    python benchmarks/bench_startup.py                      # exits 1 if a budget is exceeded
+    python benchmarks/bench_startup.py --budget-ms 200 --engine lxml
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from fixtures import CORPUS_SIZES, make_page
+from server import LocalServer
+
+# Packages a run must not import, by scenario
+FORBIDDEN = {
+    'help': ('requests', 'lxml', 'bs4', 'openai', 'numpy'),
+    'scrape': ('openai', 'pydantic', 'dotenv', 'numpy', 'tiktoken', 'zstandard'),
+}
+
+
+def parse_importtime(stderr):
+    """
+    Read -X importtime output
+
+    Returns:
+        Tuple of (total import time in ms, set of imported module names,
+        list of (cumulative ms, name) for top-level imports)
+    """
+    top_level = []
+    modules = set()
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        rows.append((int(cumulative) / 1000, len(name) - len(name.lstrip(' ')), name.strip()))
+        modules.add(name.strip())
+    if rows:
+        depth = min(level for _, level, _ in rows)
+        top_level = [(ms, name) for ms, level, name in rows if level == depth]
+    return sum(ms for ms, _ in top_level), modules, top_level
+
+
+def run(command, runs):
+    """
+    Start a command `runs` times
+
+    Returns:
+        Dictionary with median wall and import time, the modules seen and the
+        slowest top-level imports of the median run
+    """
+    results = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, '-X', 'importtime'] + command,
+            cwd=ROOT, capture_output=True, text=True
+        )
+        wall_ms = (time.perf_counter() - start) * 1000
+        if proc.returncode != 0:
+            raise RuntimeError(f"{' '.join(command)} failed:\n{proc.stderr[-2000:]}")
+        import_ms, modules, top_level = parse_importtime(proc.stderr)
+        results.append((import_ms, wall_ms, modules, top_level))
+
+    results.sort(key=lambda result: result[0])
+    import_ms, _, modules, top_level = results[len(results) // 2]
+    return {
+        'import_ms': import_ms,
+        'wall_ms': statistics.median(result[1] for result in results),
+        'modules': modules,
+        'slowest': sorted(top_level, reverse=True)[:5]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check the cold-start time of the scrape-only CLI path')
+    parser.add_argument('--runs', type=int, default=5, help='Interpreter starts per scenario (the median is used)')
+    parser.add_argument('--engine', default='bs4', help='Extraction engine for the scrape scenario')
+    parser.add_argument('--budget-ms', type=float, default=300.0,
+                        help='Maximum import time of a scrape-only run, in milliseconds')
+    parser.add_argument('--help-budget-ms', type=float, default=80.0,
+                        help='Maximum import time of main.py --help, in milliseconds')
+    args = parser.parse_args()
+
+    with LocalServer({'/page.html': make_page(CORPUS_SIZES['small'])}) as server:
+        scenarios = [
+            ('help', ['main.py', '--help'], args.help_budget_ms),
+            ('scrape', ['main.py', f"{server.url}/page.html", '--engine', args.engine], args.budget_ms),
+            ('interactive help', ['interactive.py', '--help'], args.help_budget_ms),
+        ]
+
+        failed = False
+        print(f"{'scenario':<18}{'imports ms':>12}{'wall ms':>10}{'budget ms':>11}")
+        for name, command, budget in scenarios:
+            result = run(command, args.runs)
+            over = result['import_ms'] > budget
+            print(f"{name:<18}{result['import_ms']:>12.1f}{result['wall_ms']:>10.1f}{budget:>11.0f}"
+                  f"{'  ❌ over budget' if over else ''}")
+            forbidden = sorted(set(FORBIDDEN[name.split()[-1]]) & result['modules'])
+            if forbidden:
+                print(f"    ❌ imported {', '.join(forbidden)}")
+            if over or forbidden:
+                failed = True
+                for ms, module in result['slowest']:
+                    print(f"    {ms:8.1f} ms  {module}")
+
+    if failed:
+        sys.exit(1)
+    print("✅ Start-up within budget")
+
+
+if __name__ == "__main__":
+    main()
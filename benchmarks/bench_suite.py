@@ -0,0 +1,190 @@
+"""
+Benchmark Suite
+Measures throughput, latency percentiles and peak memory of the fetch, extract
+and QA stages entirely offline, and writes the results as JSON so runs can be
+compared
+
+Usage:
+    python benchmarks/bench_suite.py                        # writes benchmarks/results/<timestamp>.json
+    python benchmarks/bench_suite.py --compare old.json     # also prints the change against a previous run
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from fake_openai import FakeOpenAIServer
+from fixtures import corpus
+from server import LocalServer
+from openai_qa import OpenAIQA
+from scraper import ENGINES, WebScraper
+
+QUESTION = "What does the page say about the response cache?"
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a list of numbers"""
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def peak_memory(func, inputs):
+    """Largest peak of Python allocations over single calls of func"""
+    peak = 0
+    tracemalloc.start()
+    try:
+        for item in inputs:
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            func(item)
+            peak = max(peak, tracemalloc.get_traced_memory()[1] - before)
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def measure(func, inputs, min_seconds):
+    """
+    Time func over inputs until min_seconds have passed (at least one round)
+
+    Memory is traced in a separate pass so tracemalloc doesn't skew the timings.
+
+    Returns:
+        Dictionary of throughput, latency percentiles and peak memory
+    """
+    samples = []
+    start = time.perf_counter()
+    while True:
+        for item in inputs:
+            t0 = time.perf_counter()
+            func(item)
+            samples.append(time.perf_counter() - t0)
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_seconds:
+            break
+
+    return {
+        'calls': len(samples),
+        'seconds': round(elapsed, 4),
+        'per_second': round(len(samples) / elapsed, 2),
+        'p50_ms': round(percentile(samples, 50) * 1000, 3),
+        'p90_ms': round(percentile(samples, 90) * 1000, 3),
+        'p99_ms': round(percentile(samples, 99) * 1000, 3),
+        'max_ms': round(max(samples) * 1000, 3),
+        'peak_memory_kb': round(peak_memory(func, inputs) / 1024, 1)
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(args):
+    pages = corpus(args.pages_per_size)
+    by_size = {}
+    for name, html in pages.items():
+        by_size.setdefault(name.split('-')[0], []).append((name, html))
+
+    results = []
+
+    def record(stage, engine, size, stats):
+        results.append(dict({'stage': stage, 'engine': engine, 'size': size}, **stats))
+        print(f"{stage:<28}{engine:<8}{size:<8}{stats['per_second']:>10.1f}/s"
+              f"{stats['p50_ms']:>10.2f}{stats['p90_ms']:>10.2f}{stats['p99_ms']:>10.2f}"
+              f"{stats['peak_memory_kb']:>12.0f}")
+
+    print(f"{'stage':<28}{'engine':<8}{'size':<8}{'throughput':>12}{'p50 ms':>10}{'p90 ms':>10}"
+          f"{'p99 ms':>10}{'peak KB':>12}")
+
+    # fetch_url over a local server
+    site = {f'/{name}.html': html for name, html in pages.items()}
+    with LocalServer(site, latency=args.http_latency) as server:
+        scraper = WebScraper()
+        for size, items in by_size.items():
+            urls = [f"{server.url}/{name}.html" for name, _ in items]
+            record('fetch_url', '', size, measure(scraper.fetch_url, urls, args.min_seconds))
+
+    # Extraction with each engine
+    for engine in ENGINES:
+        scraper = WebScraper(engine=engine)
+        for size, items in by_size.items():
+            htmls = [html for _, html in items]
+            record('extract_text', engine, size, measure(scraper.extract_text, htmls, args.min_seconds))
+            record('extract_structured_content', engine, size,
+                   measure(scraper.extract_structured_content, htmls, args.min_seconds))
+
+    # answer_question against the local chat-completions stand-in
+    scraper = WebScraper(engine='lxml')
+    with FakeOpenAIServer(latency=args.llm_latency) as llm:
+        qa = OpenAIQA(api_key='benchmark', base_url=llm.url)
+        for size, items in by_size.items():
+            texts = [scraper.extract_text(html) for _, html in items]
+            record('answer_question', '', size,
+                   measure(lambda text: qa.answer_question(text, QUESTION), texts, args.min_seconds))
+
+    return results
+
+
+def compare(results, baseline):
+    """Print throughput and median latency changes against a previous run"""
+    previous = {(r['stage'], r['engine'], r['size']): r for r in baseline['results']}
+    print(f"\nCompared with {baseline['meta'].get('revision') or 'baseline'} ({baseline['meta']['timestamp']}):")
+    print(f"{'stage':<28}{'engine':<8}{'size':<8}{'throughput':>12}{'p50':>10}")
+    for result in results:
+        old = previous.get((result['stage'], result['engine'], result['size']))
+        if not old:
+            continue
+        throughput = result['per_second'] / old['per_second'] - 1
+        median = result['p50_ms'] / old['p50_ms'] - 1 if old['p50_ms'] else 0.0
+        print(f"{result['stage']:<28}{result['engine']:<8}{result['size']:<8}{throughput:>+11.1%}{median:>+10.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline benchmarks for the scraper and QA stages')
+    parser.add_argument('--output', help='JSON file to write (default: benchmarks/results/<timestamp>.json)')
+    parser.add_argument('--compare', help='Previous results JSON to compare against')
+    parser.add_argument('--min-seconds', type=float, default=1.0, help='Minimum time spent on each measurement')
+    parser.add_argument('--pages-per-size', type=int, default=3, help='Fixture pages generated for each size')
+    parser.add_argument('--http-latency', type=float, default=0.0, help='Seconds the local web server waits per request')
+    parser.add_argument('--llm-latency', type=float, default=0.05, help='Seconds the local OpenAI stand-in waits per request')
+    args = parser.parse_args()
+
+    results = run_suite(args)
+    report = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'revision': git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'options': vars(args)
+        },
+        'results': results
+    }
+
+    output = args.output or os.path.join(ROOT, 'benchmarks', 'results', time.strftime('%Y%m%d-%H%M%S') + '.json')
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n💾 Results written to {output}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            compare(results, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+"""
+Local OpenAI Stand-in
+Serves a minimal chat-completions endpoint on localhost so QA benchmarks
+never call the real API or spend tokens. It can also enforce request and
+token limits, answering 429 with OpenAI-style rate-limit headers.
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+REPLY = "This is a canned answer from the local benchmark server."
+
+
+class FakeOpenAIServer:
+    def __init__(self, latency=0.0, token_delay=0.0, reply=REPLY, requests_per_minute=None,
+                 tokens_per_minute=None, burst_seconds=60.0):
+        """
+        Initialize the server
+
+        Args:
+            latency: Seconds to wait before the first byte of each reply
+            token_delay: Seconds between streamed tokens
+            reply: Text every request is answered with
+            requests_per_minute: Request limit; over it, requests get a 429
+            tokens_per_minute: Token limit (prompt estimate plus max_tokens per
+                request); over it, requests get a 429
+            burst_seconds: Seconds of limit that can be used at once. Like the real
+                API, the allowance refills continuously; a short burst makes 429s
+                show up quickly in tests
+        """
+        self.latency = latency
+        self.token_delay = token_delay
+        self.reply = reply
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.burst_seconds = burst_seconds
+        self.requests = 0
+        self.rate_limited = 0
+        self.prompt_bytes = 0
+        # Allowance left per limit, refilled at limit / 60 per second up to the burst
+        self._allowance = {
+            kind: [limit * burst_seconds / 60.0, time.monotonic()]
+            for kind, limit in (('requests', requests_per_minute), ('tokens', tokens_per_minute))
+            if limit is not None
+        }
+        self._limit_lock = threading.Lock()
+        self._server = None
+
+    def _admit(self, body):
+        """
+        Apply the rate limits to a request
+
+        Returns:
+            Tuple of (accepted, rate-limit headers)
+        """
+        costs = {'requests': 1, 'tokens': self._usage(body)['prompt_tokens'] + (body.get('max_tokens') or 0)}
+        limits = {'requests': self.requests_per_minute, 'tokens': self.tokens_per_minute}
+        headers = {}
+        with self._limit_lock:
+            now = time.monotonic()
+            for kind, allowance in self._allowance.items():
+                rate = limits[kind] / 60.0
+                allowance[0] = min(limits[kind] * self.burst_seconds / 60.0, allowance[0] + (now - allowance[1]) * rate)
+                allowance[1] = now
+            short = {
+                kind: (costs[kind] - allowance[0]) / (limits[kind] / 60.0)
+                for kind, allowance in self._allowance.items() if allowance[0] < costs[kind]
+            }
+            accepted = not short
+            if accepted:
+                for kind, allowance in self._allowance.items():
+                    allowance[0] -= costs[kind]
+            else:
+                self.rate_limited += 1
+
+            for kind, allowance in self._allowance.items():
+                rate = limits[kind] / 60.0
+                full = limits[kind] * self.burst_seconds / 60.0
+                headers[f'x-ratelimit-limit-{kind}'] = str(limits[kind])
+                headers[f'x-ratelimit-remaining-{kind}'] = str(int(max(0, allowance[0])))
+                headers[f'x-ratelimit-reset-{kind}'] = f"{(full - allowance[0]) / rate:.3f}s"
+        if not accepted:
+            headers['retry-after-ms'] = str(max(1, int(max(short.values()) * 1000)))
+        return accepted, headers
+
+    def _usage(self, body):
+        prompt_tokens = sum(len(message.get('content', '')) for message in body.get('messages', [])) // 4
+        completion_tokens = len(self.reply) // 4
+        return {
+            'prompt_tokens': prompt_tokens,
+            'completion_tokens': completion_tokens,
+            'total_tokens': prompt_tokens + completion_tokens
+        }
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # Headers and body are written separately; don't let Nagle delay the body
+            disable_nagle_algorithm = True
+
+            def do_POST(self):
+                raw = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                server.requests += 1
+                server.prompt_bytes += len(raw)
+                body = json.loads(raw or b'{}')
+                if not self.path.endswith('/chat/completions'):
+                    self.send_error(404)
+                    return
+                accepted, headers = server._admit(body)
+                if not accepted:
+                    self._rate_limited(headers)
+                    return
+                if server.latency:
+                    time.sleep(server.latency)
+
+                if body.get('stream'):
+                    self._stream(body, headers)
+                else:
+                    self._complete(body, headers)
+
+            def _rate_limited(self, headers):
+                payload = json.dumps({'error': {
+                    'message': 'Rate limit reached (local stand-in)',
+                    'type': 'requests',
+                    'code': 'rate_limit_exceeded'
+                }}).encode('utf-8')
+                self.send_response(429)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def _complete(self, body, headers):
+                payload = json.dumps({
+                    'id': 'chatcmpl-bench',
+                    'object': 'chat.completion',
+                    'created': int(time.time()),
+                    'model': body.get('model', ''),
+                    'choices': [{
+                        'index': 0,
+                        'message': {'role': 'assistant', 'content': server.reply},
+                        'finish_reason': 'stop'
+                    }],
+                    'usage': server._usage(body)
+                }).encode('utf-8')
+                self.send_response(200)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def _stream(self, body, headers):
+                self.send_response(200)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Type', 'text/event-stream')
+                self.send_header('Connection', 'close')
+                self.end_headers()
+
+                def event(data):
+                    self.wfile.write(f"data: {json.dumps(data)}\n\n".encode('utf-8'))
+                    self.wfile.flush()
+
+                chunk = {'id': 'chatcmpl-bench', 'object': 'chat.completion.chunk',
+                         'created': int(time.time()), 'model': body.get('model', '')}
+                for word in server.reply.split(' '):
+                    if server.token_delay:
+                        time.sleep(server.token_delay)
+                    event(dict(chunk, choices=[{'index': 0, 'delta': {'content': word + ' '}, 'finish_reason': None}]))
+                if body.get('stream_options', {}).get('include_usage'):
+                    event(dict(chunk, choices=[], usage=server._usage(body)))
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.close_connection = True
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        """Start serving on a free port in a background thread and return the base URL"""
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self.url
+
+    @property
+    def url(self):
+        """Base URL to pass to OpenAIQA(base_url=...)"""
+        return f"http://127.0.0.1:{self._server.server_port}/v1"
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,149 @@
+"""
+Benchmark Fixtures
+Generates a deterministic corpus of realistic HTML pages for benchmarks
+"""
+
+import random
+import re
+
+WORDS = (
+    "data web page content scraper python request response server client "
+    "article section summary question answer model token network parser "
+    "element document browser cache session header footer navigation menu "
+    "the of and to in is that for it as with was on be by this are from"
+).split()
+
+# Page sizes used across the benchmarks: name -> number of content sections
+CORPUS_SIZES = {
+    'small': 5,
+    'medium': 60,
+    'large': 600,
+}
+
+
+def _sentence(rng, min_words=6, max_words=18):
+    words = [rng.choice(WORDS) for _ in range(rng.randint(min_words, max_words))]
+    return ' '.join(words).capitalize() + '.'
+
+
+def _paragraph(rng):
+    return ' '.join(_sentence(rng) for _ in range(rng.randint(2, 6)))
+
+
+def make_page(sections, seed=0, links_to=None):
+    """
+    Build a realistic HTML page
+
+    Args:
+        sections: Number of content sections (controls page size)
+        seed: Random seed so the same arguments always give the same page
+        links_to: Optional list of hrefs to link from the page body
+
+    Returns:
+        HTML string
+    """
+    rng = random.Random(seed)
+    parts = [
+        '<!DOCTYPE html>',
+        '<html lang="en"><head>',
+        '<meta charset="utf-8">',
+        f'<title>{_sentence(rng, 3, 6)}</title>',
+        '<link rel="stylesheet" href="/static/site.css">',
+        '<style>body { font-family: sans-serif; } .nav li { display: inline; }</style>',
+        '<script>window.dataLayer = window.dataLayer || []; function gtag(){dataLayer.push(arguments);}</script>',
+        '</head><body>',
+        '<nav class="nav"><ul>',
+    ]
+    for name in ('Home', 'Products', 'Blog', 'About', 'Contact'):
+        parts.append(f'  <li><a href="/{name.lower()}">{name}</a></li>')
+    parts.append('</ul></nav>')
+    parts.append('<div id="cookie-banner">We use cookies to improve your experience. <a href="#accept">Accept</a></div>')
+    parts.append(f'<main><h1>{_sentence(rng, 3, 8)}</h1>')
+
+    for i in range(sections):
+        parts.append(f'<section id="s{i}">')
+        parts.append(f'  <!-- section {i} -->')
+        parts.append(f'  <h2>{_sentence(rng, 2, 6)}</h2>')
+        for _ in range(rng.randint(1, 4)):
+            parts.append(f'  <p>{_paragraph(rng)}</p>')
+        if rng.random() < 0.3:
+            parts.append('  <ul>')
+            for _ in range(rng.randint(2, 5)):
+                parts.append(f'    <li>{_sentence(rng, 3, 8)}</li>')
+            parts.append('  </ul>')
+        if rng.random() < 0.2:
+            parts.append(f'  <h3>{_sentence(rng, 2, 5)}</h3>')
+            parts.append(f'  <div class="card"><span>{_sentence(rng)}</span>  <em>{_sentence(rng)}</em></div>')
+        if rng.random() < 0.2:
+            parts.append('  <table><tr><th>Name</th><th>Value</th></tr>')
+            for _ in range(3):
+                parts.append(f'    <tr><td>{rng.choice(WORDS)}</td><td>{rng.randint(1, 9999)}</td></tr>')
+            parts.append('  </table>')
+        if rng.random() < 0.1:
+            parts.append('  <script>console.log("section loaded");</script>')
+            parts.append('  <noscript>Please enable JavaScript.</noscript>')
+        parts.append(f'  <p>Read more in <a href="/articles/{seed}-{i}">part {i}</a> &amp; related &quot;notes&quot;.</p>')
+        parts.append('</section>')
+
+    for href in links_to or []:
+        parts.append(f'<p><a href="{href}">{href}</a></p>')
+
+    parts.append('</main>')
+    parts.append('<footer><p>Copyright 2024 Example Corp. All rights reserved.</p>'
+                 '<a href="/privacy">Privacy</a> <a href="/terms">Terms</a></footer>')
+    parts.append('</body></html>')
+    return '\n'.join(parts)
+
+
+def corpus(pages_per_size=3):
+    """
+    Build the standard fixture corpus
+
+    Args:
+        pages_per_size: Number of pages to generate for each size
+
+    Returns:
+        Dictionary mapping fixture name (e.g. 'medium-1') to HTML
+    """
+    pages = {}
+    for size, sections in CORPUS_SIZES.items():
+        for i in range(pages_per_size):
+            pages[f'{size}-{i}'] = make_page(sections, seed=sections * 1000 + i)
+    return pages
+
+
+def make_site(pages=50, fanout=5, sections=10, disallow='/private/'):
+    """
+    Build a multi-page fixture site for crawling
+
+    Page i links to pages fanout*i+1 .. fanout*i+fanout (a tree), back to the
+    home page, and to a page under the disallowed prefix. The navigation,
+    article and footer links every page carries lead to short leaf pages, so
+    no link on the site is dead.
+
+    Args:
+        pages: Number of crawlable pages
+        fanout: Links from each page to the next level
+        sections: Content sections per page
+        disallow: Path prefix that robots.txt disallows
+
+    Returns:
+        Dictionary mapping paths to bodies, including /robots.txt
+    """
+    site = {'/robots.txt': f"User-agent: *\nDisallow: {disallow}\n"}
+    for i in range(pages):
+        children = [f'/page/{child}' for child in range(fanout * i + 1, fanout * i + fanout + 1) if child < pages]
+        path = '/' if i == 0 else f'/page/{i}'
+        links = children + ['/', f'{disallow}secret-{i}', f'{path}#top']
+        site[path] = make_page(sections, seed=i, links_to=links)
+        site[f'{disallow}secret-{i}'] = make_page(1, seed=-i)
+
+    linked = {
+        path for page, body in site.items() if not page.startswith(disallow)
+        for path in re.findall(r'<a href="(/[^"#]*)"', body) if not path.startswith(disallow)
+    }
+    for path in sorted(linked - set(site)):
+        rng = random.Random(path)
+        site[path] = (f'<!DOCTYPE html><html><head><title>{_sentence(rng, 2, 4)}</title></head>'
+                      f'<body><main><h1>{_sentence(rng, 3, 8)}</h1><p>{_paragraph(rng)}</p></main></body></html>')
+    return site
@@ -0,0 +1,79 @@
+"""
+Local Benchmark Server
+Serves fixture pages over HTTP on localhost so benchmarks never touch the network
+"""
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class LocalServer:
+    def __init__(self, pages, latency=0.0):
+        """
+        Initialize the server
+
+        Args:
+            pages: Dictionary mapping paths (e.g. '/index.html') to response
+                bodies (str or bytes). '/robots.txt' is served as plain text
+            latency: Seconds to wait before answering each request
+        """
+        self.pages = pages
+        self.latency = latency
+        self.requests = 0
+        self._server = None
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # Headers and body are written separately; don't let Nagle delay the body
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                server.requests += 1
+                if server.latency:
+                    time.sleep(server.latency)
+
+                path = self.path.split('?', 1)[0]
+                body = server.pages.get(path)
+                if body is None:
+                    self.send_error(404)
+                    return
+                if isinstance(body, str):
+                    body = body.encode('utf-8')
+
+                content_type = 'text/plain' if path.endswith('.txt') else 'text/html; charset=utf-8'
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        """Start serving on a free port in a background thread and return the base URL"""
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self.url
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
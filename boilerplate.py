@@ -0,0 +1,151 @@
+"""
+Boilerplate Detection Module
+Learns which text blocks repeat across pages of the same site (navigation,
+cookie banners, footers) and strips them before text is stored or sent to
+the model
+"""
+
+import hashlib
+import re
+import threading
+from collections import Counter
+from urllib.parse import urlparse
+
+from token_budget import approximate_tokens
+
+DIGITS_RE = re.compile(r'\d+')
+SPACE_RE = re.compile(r'\s+')
+
+
+def fingerprint(block):
+    """
+    Hash a text block so small variations still match
+
+    Case, whitespace and numbers (dates, counters, years) are normalized
+    away before hashing, so "© 2023 Example" and "© 2024 Example" collide.
+    """
+    normalized = SPACE_RE.sub(' ', DIGITS_RE.sub('0', block.lower())).strip()
+    digest = hashlib.blake2b(normalized.encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little')
+
+
+class _SiteStats:
+    def __init__(self):
+        self.pages = 0
+        self.block_pages = Counter()
+        self.boilerplate_blocks = 0
+        self.bytes_in = 0
+        self.bytes_saved = 0
+        self.tokens_saved = 0
+
+
+class BoilerplateDetector:
+    def __init__(self, min_pages=3, min_fraction=0.5, max_blocks_per_site=200_000, count_tokens=approximate_tokens):
+        """
+        Initialize the detector
+
+        Args:
+            min_pages: A block is only treated as boilerplate once it has been
+                seen on at least this many pages of a site
+            min_fraction: ...and on at least this fraction of the site's pages
+            max_blocks_per_site: Number of distinct blocks remembered per site;
+                blocks seen on a single page are forgotten first when it is exceeded
+            count_tokens: Function counting the tokens in a text, used for the
+                savings report (default: the fast estimate)
+        """
+        self.min_pages = min_pages
+        self.min_fraction = min_fraction
+        self.max_blocks_per_site = max_blocks_per_site
+        self.count_tokens = count_tokens
+        self._sites = {}
+        self._lock = threading.Lock()
+
+    def _site(self, url):
+        host = urlparse(url).netloc.lower()
+        if host not in self._sites:
+            self._sites[host] = _SiteStats()
+        return self._sites[host]
+
+    def learn(self, url, blocks):
+        """
+        Record the blocks of one page
+
+        Args:
+            url: Page URL (blocks are grouped by its host)
+            blocks: List of text blocks on the page
+        """
+        with self._lock:
+            site = self._site(url)
+            site.pages += 1
+            site.block_pages.update(set(fingerprint(block) for block in blocks))
+            if len(site.block_pages) > self.max_blocks_per_site:
+                # Keep the blocks that already repeat
+                site.block_pages = Counter({key: count for key, count in site.block_pages.items() if count > 1})
+
+    def _is_boilerplate(self, site, key):
+        count = site.block_pages.get(key, 0)
+        return count >= self.min_pages and count >= site.pages * self.min_fraction
+
+    def clean(self, url, blocks):
+        """
+        Drop the blocks of a page that are boilerplate for its site
+
+        Args:
+            url: Page URL
+            blocks: List of text blocks on the page
+
+        Returns:
+            List of the remaining blocks, in order
+        """
+        with self._lock:
+            site = self._site(url)
+            kept = []
+            removed = []
+            for block in blocks:
+                if self._is_boilerplate(site, fingerprint(block)):
+                    removed.append(block)
+                else:
+                    kept.append(block)
+
+            site.bytes_in += sum(len(block.encode('utf-8')) for block in blocks)
+            site.boilerplate_blocks += len(removed)
+            site.bytes_saved += sum(len(block.encode('utf-8')) for block in removed)
+            site.tokens_saved += sum(self.count_tokens(block) for block in removed)
+            return kept
+
+    def process(self, url, blocks):
+        """
+        Learn from a page, then clean it
+
+        The first pages of a site are kept whole; blocks are stripped once
+        they have repeated on min_pages pages.
+
+        Args:
+            url: Page URL
+            blocks: List of text blocks on the page
+
+        Returns:
+            List of the remaining blocks, in order
+        """
+        self.learn(url, blocks)
+        return self.clean(url, blocks)
+
+    def report(self):
+        """
+        Savings per site
+
+        Returns:
+            Dictionary mapping each host to 'pages', 'boilerplate_blocks',
+            'bytes_in', 'bytes_saved' and 'tokens_saved'
+        """
+        with self._lock:
+            return {
+                host: {
+                    'pages': site.pages,
+                    'boilerplate_blocks': site.boilerplate_blocks,
+                    'bytes_in': site.bytes_in,
+                    'bytes_saved': site.bytes_saved,
+                    'tokens_saved': site.tokens_saved
+                }
+                for host, site in self._sites.items()
+            }
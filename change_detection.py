@@ -0,0 +1,252 @@
+"""
+Change Detection Module
+Fingerprints the sections of a page (each heading with the text blocks under
+it), compares them with the sections seen on the previous scrape of the same
+URL, and rebuilds summaries by summarizing only the sections that changed
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Section states in a diff
+ADDED = 'added'
+REMOVED = 'removed'
+CHANGED = 'changed'
+UNCHANGED = 'unchanged'
+
+# Length in words of each section summary
+SECTION_SUMMARY_WORDS = 120
+
+# Sections shorter than this many words go into the page summary as they are;
+# a summary of them would be about as long as the text
+MIN_SUMMARY_WORDS = 200
+
+
+def fingerprint(section):
+    """Hash of a section's heading and blocks, ignoring whitespace differences"""
+    parts = [' '.join(section['heading'].split())]
+    parts.extend(' '.join(block.split()) for block in section['blocks'])
+    return hashlib.sha256('\x00'.join(parts).encode('utf-8')).hexdigest()
+
+
+def section_keys(sections):
+    """
+    Keys that identify sections across versions of a page
+
+    A section is known by its heading; repeated headings are numbered in page
+    order ("Notes", "Notes #2", ...).
+    """
+    seen = {}
+    keys = []
+    for section in sections:
+        heading = ' '.join(section['heading'].split())
+        seen[heading] = seen.get(heading, 0) + 1
+        keys.append(heading if seen[heading] == 1 else f"{heading} #{seen[heading]}")
+    return keys
+
+
+def section_text(section):
+    """A section as plain text: its heading, then its blocks"""
+    return "\n\n".join(([section['heading']] if section['heading'] else []) + section['blocks'])
+
+
+class ChangeDetector:
+    def __init__(self, directory='.cache/changes'):
+        """
+        Open (or create) the fingerprint and summary store
+
+        Args:
+            directory: Directory holding the SQLite database
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(directory, 'changes.sqlite3'), check_same_thread=False)
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                checked_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS sections (
+                url TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                key TEXT NOT NULL,
+                fingerprint TEXT NOT NULL,
+                PRIMARY KEY (url, position)
+            );
+            CREATE TABLE IF NOT EXISTS summaries (
+                key TEXT PRIMARY KEY,
+                summary TEXT NOT NULL,
+                created REAL NOT NULL
+            );
+        """)
+        self._db.commit()
+
+        self.stats = {
+            'pages_checked': 0,
+            'pages_changed': 0,
+            'summaries_reused': 0,
+            'summaries_generated': 0
+        }
+
+    def diff(self, url, sections):
+        """
+        Compare sections with the ones recorded for a URL, without recording them
+
+        Args:
+            url: Page URL
+            sections: 'sections' from WebScraper.extract_structured_content
+
+        Returns:
+            Dictionary with 'url', 'first_seen', 'checked_at' (time of the
+            previous check, or None) and the section keys that were 'added',
+            'removed', 'changed' and 'unchanged', in page order
+        """
+        with self._lock:
+            row = self._db.execute("SELECT checked_at FROM pages WHERE url = ?", (url,)).fetchone()
+            previous = dict(self._db.execute(
+                "SELECT key, fingerprint FROM sections WHERE url = ? ORDER BY position", (url,)
+            ))
+
+        result = {
+            'url': url,
+            'first_seen': row is None,
+            'checked_at': row[0] if row else None,
+            ADDED: [],
+            REMOVED: [],
+            CHANGED: [],
+            UNCHANGED: []
+        }
+        keys = section_keys(sections)
+        for key, section in zip(keys, sections):
+            if key not in previous:
+                result[ADDED].append(key)
+            elif previous[key] != fingerprint(section):
+                result[CHANGED].append(key)
+            else:
+                result[UNCHANGED].append(key)
+        current = set(keys)
+        result[REMOVED] = [key for key in previous if key not in current]
+        return result
+
+    def update(self, url, sections):
+        """
+        Compare sections with the ones recorded for a URL, then record them
+
+        Returns:
+            The diff (see diff)
+        """
+        result = self.diff(url, sections)
+        rows = [
+            (url, position, key, fingerprint(section))
+            for position, (key, section) in enumerate(zip(section_keys(sections), sections))
+        ]
+        with self._lock:
+            self._db.execute("DELETE FROM sections WHERE url = ?", (url,))
+            self._db.executemany(
+                "INSERT INTO sections (url, position, key, fingerprint) VALUES (?, ?, ?, ?)", rows
+            )
+            self._db.execute(
+                "INSERT OR REPLACE INTO pages (url, checked_at) VALUES (?, ?)", (url, time.time())
+            )
+            self._db.commit()
+            self.stats['pages_checked'] += 1
+            if not result['first_seen'] and (result[ADDED] or result[REMOVED] or result[CHANGED]):
+                self.stats['pages_changed'] += 1
+        return result
+
+    def _get_summary(self, key):
+        with self._lock:
+            row = self._db.execute("SELECT summary FROM summaries WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _put_summary(self, key, summary):
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO summaries (key, summary, created) VALUES (?, ?, ?)",
+                (key, summary, time.time())
+            )
+            self._db.commit()
+
+    def summarize(self, sections, qa, max_length=200, model="gpt-3.5-turbo", max_workers=8, max_context_tokens=None):
+        """
+        Summarize a page from its sections, reusing stored section summaries
+
+        Each section long enough to be worth it is summarized on its own, and
+        that summary is kept under the section's fingerprint, so a later run
+        only calls the model for sections whose text changed. The section
+        summaries are then merged; the merged summary is kept too, so an
+        unchanged page costs no calls at all.
+
+        Args:
+            sections: 'sections' from WebScraper.extract_structured_content
+            qa: OpenAIQA to summarize with
+            max_length: Maximum length of the page summary in words
+            model: OpenAI model to use
+            max_workers: Maximum number of section summaries requested at once
+            max_context_tokens: Cap on content tokens per request; None fills the
+                model's context window
+
+        Returns:
+            Dictionary with 'summary', 'sections_summarized' (model calls made
+            for sections) and 'sections_reused' (section summaries taken from
+            the store)
+        """
+        sections = [section for section in sections if section['blocks']]
+        parts = [None] * len(sections)
+        missing = []
+        reused = 0
+        for i, section in enumerate(sections):
+            text = section_text(section)
+            if len(text.split()) < MIN_SUMMARY_WORDS:
+                parts[i] = text
+                continue
+            key = f"section:{model}:{SECTION_SUMMARY_WORDS}:{fingerprint(section)}"
+            parts[i] = self._get_summary(key)
+            if parts[i] is None:
+                missing.append((i, key, text))
+            else:
+                reused += 1
+
+        def summarize_section(item):
+            i, key, text = item
+            summary = qa.summarize_content(
+                text, max_length=SECTION_SUMMARY_WORDS, model=model, max_context_tokens=max_context_tokens
+            )
+            self._put_summary(key, summary)
+            return i, summary
+
+        if missing:
+            with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(missing)))) as executor:
+                for i, summary in executor.map(summarize_section, missing):
+                    parts[i] = summary
+
+        summary = ''
+        if parts:
+            parts_hash = hashlib.sha256('\x00'.join(parts).encode('utf-8')).hexdigest()
+            key = f"page:{model}:{max_length}:{parts_hash}"
+            summary = self._get_summary(key)
+            if summary is None:
+                summary = qa.merge_summaries(
+                    parts, max_length=max_length, model=model, max_workers=max_workers,
+                    max_context_tokens=max_context_tokens
+                )
+                self._put_summary(key, summary)
+
+        with self._lock:
+            self.stats['summaries_reused'] += reused
+            self.stats['summaries_generated'] += len(missing)
+        return {
+            'summary': summary,
+            'sections_summarized': len(missing),
+            'sections_reused': reused
+        }
+
+    def close(self):
+        """Close the database"""
+        with self._lock:
+            self._db.close()
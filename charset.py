@@ -0,0 +1,150 @@
+"""
+Charset Sniffing Module
+Works out the encoding of an HTML body from its byte-order mark, the
+Content-Type header or a <meta charset> in its first few KB, the way browsers
+do, so the raw bytes can go straight to the parser without a full-body guess
+"""
+
+import codecs
+import re
+import threading
+from functools import lru_cache
+
+import lxml.etree
+
+try:
+    import charset_normalizer
+except ImportError:  # Optional: used only when nothing else identifies the encoding
+    charset_normalizer = None
+
+# How far into the body to look for <meta charset>
+SNIFF_BYTES = 4096
+
+# Where an encoding came from, in the order they are tried
+METHODS = ('bom', 'header', 'meta', 'utf-8', 'detected', 'default')
+
+# Encoding used when nothing identifies one (the HTML standard's fallback)
+DEFAULT_ENCODING = 'cp1252'
+
+META_CHARSET_RE = re.compile(rb'<meta[^>]+charset=["\']?([A-Za-z0-9_.:-]+)', re.IGNORECASE)
+HEADER_CHARSET_RE = re.compile(r'charset=["\']?([A-Za-z0-9_.:-]+)', re.IGNORECASE)
+
+BOMS = (
+    (codecs.BOM_UTF8, 'utf-8'),
+    (codecs.BOM_UTF16_LE, 'utf-16-le'),
+    (codecs.BOM_UTF16_BE, 'utf-16-be'),
+)
+
+
+def normalize_encoding(name):
+    """
+    Canonical Python name of an encoding label, or None if it is unknown
+
+    Latin-1 and ASCII labels map to cp1252, as browsers treat them.
+    """
+    try:
+        encoding = codecs.lookup(name.strip()).name
+    except (LookupError, ValueError):
+        return None
+    if encoding in ('iso8859-1', 'ascii'):
+        return DEFAULT_ENCODING
+    return encoding
+
+
+def sniff_encoding(body, content_type=None, complete=True):
+    """
+    Work out the encoding of an HTML body
+
+    Checked in order: byte-order mark, charset in the Content-Type header,
+    <meta charset> in the first SNIFF_BYTES, valid UTF-8, then (only for a
+    complete body, and only if charset_normalizer is installed) statistical
+    detection over the whole body.
+
+    Args:
+        body: Body bytes (or just the start of them)
+        content_type: Content-Type header value, if any
+        complete: False when body is only the start of the document; detection
+            is skipped and a multi-byte character cut at the end is allowed
+
+    Returns:
+        Tuple of (encoding, method), method being one of METHODS
+    """
+    for bom, encoding in BOMS:
+        if body.startswith(bom):
+            return encoding, 'bom'
+
+    if content_type:
+        match = HEADER_CHARSET_RE.search(content_type)
+        encoding = normalize_encoding(match.group(1)) if match else None
+        if encoding:
+            return encoding, 'header'
+
+    match = META_CHARSET_RE.search(body[:SNIFF_BYTES])
+    encoding = normalize_encoding(match.group(1).decode('ascii')) if match else None
+    if encoding:
+        # A page can't really declare UTF-16 from inside an ASCII-compatible <meta>
+        return ('utf-8' if encoding.startswith('utf-16') else encoding), 'meta'
+
+    try:
+        codecs.getincrementaldecoder('utf-8')().decode(body, final=complete)
+        return 'utf-8', 'utf-8'
+    except UnicodeDecodeError:
+        pass
+
+    if complete and charset_normalizer is not None:
+        best = charset_normalizer.from_bytes(body).best()
+        encoding = normalize_encoding(best.encoding) if best is not None else None
+        if encoding:
+            return encoding, 'detected'
+
+    return DEFAULT_ENCODING, 'default'
+
+
+@lru_cache(maxsize=64)
+def parser_encoding(encoding):
+    """
+    The name libxml2 knows an encoding by, or None if lxml can't decode it
+
+    Python's names mostly work as they are; some need a hyphen instead of an
+    underscore (euc_jp) or none at all (utf-16-le).
+    """
+    if not encoding:
+        return None
+    for name in (encoding, encoding.replace('_', '-'), encoding.replace('-le', 'le').replace('-be', 'be')):
+        try:
+            lxml.etree.fromstring(b'<p>x</p>', lxml.etree.HTMLParser(encoding=name))
+            return name
+        except LookupError:
+            continue
+    return None
+
+
+def decode_body(body, encoding):
+    """Decode a body, replacing undecodable bytes and dropping a UTF-8 BOM"""
+    try:
+        text = body.decode(encoding or 'utf-8', errors='replace')
+    except LookupError:
+        text = body.decode('utf-8', errors='replace')
+    return text[1:] if text.startswith('\ufeff') else text
+
+
+class CharsetSniffer:
+    """
+    sniff_encoding plus counters of how often each method decided the encoding
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stats = dict.fromkeys(METHODS, 0)
+
+    def sniff(self, body, content_type=None, complete=True):
+        """
+        Work out the encoding of an HTML body (see sniff_encoding)
+
+        Returns:
+            The encoding
+        """
+        encoding, method = sniff_encoding(body, content_type, complete)
+        with self._lock:
+            self.stats[method] += 1
+        return encoding
@@ -0,0 +1,319 @@
+"""
+Site Crawler Module
+Crawls a site breadth-first with WebScraper, honoring robots.txt and
+per-domain politeness limits
+"""
+
+import hashlib
+import heapq
+import math
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from urllib.parse import urljoin, urlparse, urlunparse
+from urllib.robotparser import RobotFileParser
+
+import requests
+
+from scraper import WebScraper
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+def normalize_url(url, base_url=None):
+    """
+    Canonicalize a URL so equivalent spellings deduplicate
+
+    Resolves it against base_url, lowercases the scheme and host, drops the
+    default port and the fragment, and gives empty paths a '/'.
+
+    Args:
+        url: URL or href to normalize
+        base_url: Optional page URL that relative hrefs are resolved against
+
+    Returns:
+        Normalized URL string, or None if it isn't an http(s) URL
+    """
+    if base_url:
+        url = urljoin(base_url, url)
+    parsed = urlparse(url.strip())
+    scheme = parsed.scheme.lower()
+    if scheme not in DEFAULT_PORTS or not parsed.hostname:
+        return None
+
+    host = parsed.hostname.lower()
+    try:
+        port = parsed.port
+    except ValueError:
+        return None
+    netloc = host if port in (None, DEFAULT_PORTS[scheme]) else f"{host}:{port}"
+    return urlunparse((scheme, netloc, parsed.path or '/', parsed.params, parsed.query, ''))
+
+
+class BloomFilter:
+    def __init__(self, capacity=1_000_000, error_rate=0.001):
+        """
+        Compact probabilistic set for seen URLs
+
+        Args:
+            capacity: Expected number of items
+            error_rate: Acceptable false positive rate at that capacity
+        """
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hash_count)]
+
+    def add(self, item):
+        """
+        Add an item
+
+        Returns:
+            True if the item was not (probably) in the set before
+        """
+        added = False
+        for position in self._positions(item):
+            byte, bit = divmod(position, 8)
+            if not self.bits[byte] & (1 << bit):
+                self.bits[byte] |= 1 << bit
+                added = True
+        if added:
+            self.count += 1
+        return added
+
+    def __contains__(self, item):
+        for position in self._positions(item):
+            byte, bit = divmod(position, 8)
+            if not self.bits[byte] & (1 << bit):
+                return False
+        return True
+
+
+class Crawler:
+    def __init__(self, scraper=None, max_pages=100, max_depth=2, max_bytes=50 * 1024 * 1024,
+                 max_workers=8, per_domain_limit=2, same_domain=True, respect_robots=True,
+                 default_delay=0.0, timeout=10, boilerplate=None, sections=False):
+        """
+        Initialize the crawler
+
+        Args:
+            scraper: WebScraper used to fetch and parse pages (a new one if None)
+            max_pages: Maximum number of pages to fetch
+            max_depth: Maximum link depth from the start URLs (0 fetches only the start URLs)
+            max_bytes: Stop scheduling new pages once this many bytes have been downloaded
+            max_workers: Maximum number of pages fetched at once
+            per_domain_limit: Maximum number of pages fetched at once from one domain
+            same_domain: Only follow links to the domains of the start URLs
+            respect_robots: Obey robots.txt rules and Crawl-delay
+            default_delay: Minimum seconds between requests to one domain when
+                robots.txt doesn't set a Crawl-delay
+            timeout: Request timeout in seconds
+            boilerplate: Optional BoilerplateDetector; blocks repeated across a
+                site's pages are then stripped from each page's 'text'
+            sections: Also extract each page's 'sections' (see
+                WebScraper.extract_structured_content)
+        """
+        self.scraper = scraper or WebScraper()
+        self.max_pages = max_pages
+        self.max_depth = max_depth
+        self.max_bytes = max_bytes
+        self.max_workers = max_workers
+        self.per_domain_limit = per_domain_limit
+        self.same_domain = same_domain
+        self.respect_robots = respect_robots
+        self.default_delay = default_delay
+        self.timeout = timeout
+        self.boilerplate = boilerplate
+        self.sections = sections
+
+        self.user_agent = self.scraper.session.headers.get('User-Agent', '*')
+        self._robots = {}
+        self.stats = {
+            'pages': 0,
+            'errors': 0,
+            'bytes': 0,
+            'skipped_robots': 0,
+            'duplicates': 0
+        }
+
+    def _domain(self, url):
+        return urlparse(url).netloc
+
+    def _fetch_robots(self, url):
+        """Fetch and parse robots.txt for the URL's domain (runs on a worker thread)"""
+        parser = RobotFileParser()
+        robots_url = f"{urlparse(url).scheme}://{self._domain(url)}/robots.txt"
+        try:
+            response = self.scraper.session.get(robots_url, timeout=self.timeout)
+            if response.status_code in (401, 403):
+                parser.disallow_all = True
+            elif response.status_code < 400:
+                parser.parse(response.text.splitlines())
+            else:
+                parser.allow_all = True
+        except requests.exceptions.RequestException:
+            parser.allow_all = True
+        return parser
+
+    def _robots_for(self, url):
+        """Fetch and cache robots.txt for the URL's domain"""
+        domain = self._domain(url)
+        if domain not in self._robots:
+            self._robots[domain] = self._fetch_robots(url)
+        return self._robots[domain]
+
+    def _delay_for(self, url):
+        """Minimum seconds between requests to the URL's domain"""
+        if self.respect_robots:
+            delay = self._robots_for(url).crawl_delay(self.user_agent)
+            if delay is not None:
+                return float(delay)
+        return self.default_delay
+
+    def _allowed(self, url):
+        return not self.respect_robots or self._robots_for(url).can_fetch(self.user_agent, url)
+
+    def _fetch(self, url):
+        """Fetch and parse one page (runs on a worker thread)"""
+        body, encoding = self.scraper.fetch_bytes(url, timeout=self.timeout)
+        content = self.scraper.extract_structured_content(body, base_url=url, encoding=encoding,
+                                                          sections=self.sections)
+        blocks = self.scraper.extract_text_blocks(body, encoding) if self.boilerplate else None
+        return len(body), content, blocks
+
+    def crawl(self, start_urls):
+        """
+        Crawl from the start URLs, yielding pages as they are fetched
+
+        Pages are fetched breadth-first (shallowest first) within the page,
+        depth and byte budgets.
+
+        Args:
+            start_urls: URL or list of URLs to start from
+
+        Yields:
+            Dictionaries with 'url', 'depth', 'title', 'text', 'structured' and
+            'error' (None on success, error message on failure)
+        """
+        if isinstance(start_urls, str):
+            start_urls = [start_urls]
+
+        seen = BloomFilter(capacity=max(10_000, self.max_pages * 50))
+        # One priority queue per domain, so a busy domain never blocks the others
+        frontiers = {}
+        sequence = 0
+        allowed_domains = set()
+
+        def enqueue(url, depth):
+            nonlocal sequence
+            heapq.heappush(frontiers.setdefault(self._domain(url), []), (depth, sequence, url))
+            sequence += 1
+
+        for url in start_urls:
+            url = normalize_url(url)
+            if url and seen.add(url):
+                enqueue(url, 0)
+                allowed_domains.add(self._domain(url))
+
+        in_flight = {}
+        # robots.txt fetches on the pool, so a new domain doesn't stall the others
+        robots_in_flight = {}
+        domain_active = {}
+        domain_next_time = {}
+        scheduled = 0
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='crawl') as executor:
+            while True:
+                within_budget = scheduled < self.max_pages and self.stats['bytes'] < self.max_bytes
+
+                # A domain's pages wait until its robots.txt is in
+                if self.respect_robots:
+                    fetching_robots = set(robots_in_flight.values())
+                    for domain, queue in frontiers.items():
+                        if queue and domain not in self._robots and domain not in fetching_robots:
+                            robots_in_flight[executor.submit(self._fetch_robots, queue[0][2])] = domain
+
+                # Start the best eligible URLs while politeness and budgets allow
+                while within_budget and len(in_flight) < self.max_workers:
+                    now = time.monotonic()
+                    ready = [
+                        (queue[0], domain) for domain, queue in frontiers.items()
+                        if queue
+                        and (not self.respect_robots or domain in self._robots)
+                        and domain_active.get(domain, 0) < self.per_domain_limit
+                        and domain_next_time.get(domain, 0) <= now
+                    ]
+                    if not ready:
+                        break
+                    (depth, _, url), domain = min(ready)
+                    heapq.heappop(frontiers[domain])
+
+                    if not self._allowed(url):
+                        self.stats['skipped_robots'] += 1
+                        continue
+
+                    domain_active[domain] = domain_active.get(domain, 0) + 1
+                    domain_next_time[domain] = now + self._delay_for(url)
+                    in_flight[executor.submit(self._fetch, url)] = (url, depth)
+                    scheduled += 1
+                    within_budget = scheduled < self.max_pages
+
+                waiting = any(frontiers.values()) and within_budget
+                if not in_flight and not waiting:
+                    break
+
+                # Wake up for the next finished page or robots.txt, or the end of a crawl delay
+                now = time.monotonic()
+                delays = [t - now for domain, t in domain_next_time.items() if t > now and frontiers.get(domain)]
+                timeout = min(delays) if waiting and delays else None
+                if not in_flight and not robots_in_flight:
+                    time.sleep(timeout or 0)
+                    continue
+                done, _ = wait(list(in_flight) + list(robots_in_flight), timeout=timeout,
+                               return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    if future in robots_in_flight:
+                        self._robots[robots_in_flight.pop(future)] = future.result()
+                        continue
+                    url, depth = in_flight.pop(future)
+                    domain_active[self._domain(url)] -= 1
+                    try:
+                        size, content, blocks = future.result()
+                    except Exception as e:
+                        self.stats['errors'] += 1
+                        yield {'url': url, 'depth': depth, 'title': '', 'text': '', 'structured': None, 'error': str(e)}
+                        continue
+
+                    self.stats['pages'] += 1
+                    self.stats['bytes'] += size
+
+                    if depth < self.max_depth:
+                        for link in content['structured']['links']:
+                            link = normalize_url(link, url)
+                            if not link:
+                                continue
+                            if self.same_domain and self._domain(link) not in allowed_domains:
+                                continue
+                            if not seen.add(link):
+                                self.stats['duplicates'] += 1
+                                continue
+                            enqueue(link, depth + 1)
+
+                    text = content['full_text']
+                    if self.boilerplate:
+                        text = ' '.join(self.boilerplate.process(url, blocks))
+
+                    yield {
+                        'url': url,
+                        'depth': depth,
+                        'title': content['structured']['title'],
+                        'text': text,
+                        'structured': content['structured'],
+                        'error': None
+                    }
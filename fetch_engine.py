@@ -0,0 +1,84 @@
+"""
+Async Fetch Engine
+Runs blocking fetch/parse work concurrently on an asyncio event loop
+with a global concurrency cap and a per-host cap
+"""
+
+import asyncio
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+
+class AsyncFetchEngine:
+    def __init__(self, max_concurrency=50, per_host_limit=25):
+        """
+        Initialize the fetch engine
+
+        Args:
+            max_concurrency: Maximum number of requests in flight across all hosts
+            per_host_limit: Maximum number of requests in flight against a single host
+        """
+        if max_concurrency < 1 or per_host_limit < 1:
+            raise ValueError("Concurrency limits must be at least 1")
+
+        self.max_concurrency = max_concurrency
+        self.per_host_limit = per_host_limit
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrency,
+            thread_name_prefix='fetch'
+        )
+        # Semaphores bind to the loop they are first used on, so keep one set per loop
+        self._limits = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def _semaphores(self, url):
+        """Return the (global, host) semaphores for the running loop"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if loop not in self._limits:
+                self._limits[loop] = (asyncio.Semaphore(self.max_concurrency), {})
+            global_limit, host_limits = self._limits[loop]
+
+            host = urlparse(url).netloc.lower()
+            if host not in host_limits:
+                host_limits[host] = asyncio.Semaphore(self.per_host_limit)
+            return global_limit, host_limits[host]
+
+    async def run(self, url, func, *args):
+        """
+        Run a blocking callable for a URL once both limits allow it
+
+        Args:
+            url: URL the work is for (used to pick the per-host limit)
+            func: Blocking callable to run on the engine's thread pool
+            *args: Arguments passed to func
+
+        Returns:
+            Whatever func returns
+        """
+        global_limit, host_limit = self._semaphores(url)
+
+        # Take the host slot first so a busy host doesn't hold global slots
+        async with host_limit:
+            async with global_limit:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(self._executor, func, *args)
+
+    async def offload(self, func, *args):
+        """
+        Run a blocking callable on the engine's thread pool without taking a slot
+
+        For CPU work after a fetch (e.g. parsing), so the slot goes to the next
+        request instead of waiting on the parse.
+
+        Returns:
+            Whatever func returns
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    def close(self):
+        """Shut down the worker threads"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,185 @@
+"""
+HTTP Cache Module
+Persistent on-disk cache for fetched pages with conditional revalidation
+"""
+
+import os
+import sqlite3
+import threading
+import time
+
+
+class HTTPCache:
+    def __init__(self, directory='.cache/http', max_bytes=200 * 1024 * 1024, ttl=None):
+        """
+        Initialize the cache
+
+        Args:
+            directory: Directory holding the cache database
+            max_bytes: Maximum total size of cached bodies; least recently used
+                entries are evicted beyond this
+            ttl: If set, entries younger than this many seconds are served without
+                contacting the server. Otherwise every use revalidates with
+                If-None-Match / If-Modified-Since
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(directory, 'cache.sqlite3'), check_same_thread=False)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                url TEXT PRIMARY KEY,
+                body BLOB NOT NULL,
+                encoding TEXT,
+                etag TEXT,
+                last_modified TEXT,
+                stored_at REAL NOT NULL,
+                last_access REAL NOT NULL,
+                size INTEGER NOT NULL
+            )
+        """)
+        self._db.execute("CREATE INDEX IF NOT EXISTS entries_last_access ON entries (last_access)")
+        self._db.commit()
+
+        self.stats = {
+            'hits': 0,
+            'revalidated': 0,
+            'misses': 0,
+            'bytes_saved': 0,
+            'evictions': 0
+        }
+
+    def get(self, url):
+        """
+        Look up a cached response
+
+        Args:
+            url: URL to look up
+
+        Returns:
+            Dictionary with body, encoding, etag, last_modified and stored_at, or None
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT body, encoding, etag, last_modified, stored_at FROM entries WHERE url = ?",
+                (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            'body': row[0],
+            'encoding': row[1],
+            'etag': row[2],
+            'last_modified': row[3],
+            'stored_at': row[4]
+        }
+
+    def is_fresh(self, entry):
+        """Check whether an entry can be served without revalidation (TTL mode)"""
+        return self.ttl is not None and time.time() - entry['stored_at'] < self.ttl
+
+    def conditional_headers(self, entry):
+        """Build the revalidation headers for a cached entry"""
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def record_hit(self, url, entry, revalidated=False):
+        """
+        Record that a cached entry was served
+
+        Args:
+            url: URL that was served
+            entry: Entry returned by get
+            revalidated: True if the server confirmed it with a 304
+        """
+        now = time.time()
+        with self._lock:
+            self.stats['hits'] += 1
+            self.stats['bytes_saved'] += len(entry['body'])
+            if revalidated:
+                self.stats['revalidated'] += 1
+                # A 304 restarts the TTL as well
+                self._db.execute(
+                    "UPDATE entries SET last_access = ?, stored_at = ? WHERE url = ?",
+                    (now, now, url)
+                )
+            else:
+                self._db.execute("UPDATE entries SET last_access = ? WHERE url = ?", (now, url))
+            self._db.commit()
+
+    def store(self, url, response, encoding=None):
+        """
+        Store a fresh response and count it as a miss
+
+        Args:
+            url: URL that was fetched
+            response: requests.Response with a 200 status
+            encoding: Encoding of the body, if already known
+        """
+        body = response.content
+        cache_control = response.headers.get('Cache-Control', '').lower()
+
+        with self._lock:
+            self.stats['misses'] += 1
+            if 'no-store' in cache_control or len(body) > self.max_bytes:
+                return
+
+            now = time.time()
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries "
+                "(url, body, encoding, etag, last_modified, stored_at, last_access, size) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    url,
+                    body,
+                    encoding or response.encoding,
+                    response.headers.get('ETag'),
+                    response.headers.get('Last-Modified'),
+                    now,
+                    now,
+                    len(body)
+                )
+            )
+            self._evict()
+            self._db.commit()
+
+    def _evict(self):
+        """Drop least recently used entries until the cache fits in max_bytes"""
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        for url, size in self._db.execute(
+            "SELECT url, size FROM entries ORDER BY last_access"
+        ).fetchall():
+            self._db.execute("DELETE FROM entries WHERE url = ?", (url,))
+            self.stats['evictions'] += 1
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def size(self):
+        """Return the number of entries and their total size in bytes"""
+        with self._lock:
+            count, total = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+            ).fetchone()
+        return count, total
+
+    def clear(self):
+        """Remove every cached entry"""
+        with self._lock:
+            self._db.execute("DELETE FROM entries")
+            self._db.commit()
+
+    def close(self):
+        """Close the cache database"""
+        with self._lock:
+            self._db.close()
@@ -4,11 +4,10 @@ Allows interactive question answering on scraped content
 """
 
 import sys
-from scraper import WebScraper
-from openai_qa import OpenAIQA
 
 
-def interactive_mode(url, api_key=None, model="gpt-3.5-turbo"):
+def interactive_mode(url, api_key=None, model="gpt-3.5-turbo", cache_dir=None, cache_ttl=None,
+                     store_dir=None, refresh=False, max_context_tokens=3000, top_k=5):
     """
     Run interactive Q&A mode
     
@@ -16,19 +15,50 @@ def interactive_mode(url, api_key=None, model="gpt-3.5-turbo"):
         url: URL to scrape
         api_key: OpenAI API key
         model: OpenAI model to use
+        cache_dir: Optional directory for the HTTP cache
+        cache_ttl: Seconds a cached page is reused without revalidation
+        store_dir: Optional page store directory; a page already stored there
+            is reused instead of scraped again
+        refresh: Scrape the page even if it is in the page store
+        max_context_tokens: Most page tokens sent with each question (None
+            fills the model's context window)
+        top_k: Most relevant chunks sent with each question (None for as
+            many as fit)
     """
-    print(f"🔍 Scraping website: {url}")
-    scraper = WebScraper()
+    # Imported here rather than at the top so --help and argument errors return at once
+    from scraper import WebScraper
+    from http_cache import HTTPCache
+    from page_store import PageStore
+    
+    cache = HTTPCache(cache_dir, ttl=cache_ttl) if cache_dir else None
+    scraper = WebScraper(cache=cache)
+    store = PageStore(store_dir) if store_dir else None
     
     try:
-        # Scrape the website
-        content = scraper.scrape(url)
-        text_content = content['text']
-        print(f"✅ Successfully scraped {len(text_content)} characters\n")
+        page = store.get(url) if store is not None and not refresh else None
+        if page is not None:
+            print(f"📦 Loaded {len(page)} characters from the page store\n")
+        else:
+            # Scrape the website
+            print(f"🔍 Scraping website: {url}")
+            content = scraper.scrape(url)
+            print(f"✅ Successfully scraped {len(content['text'])} characters\n")
+            if cache and cache.stats['hits']:
+                print(f"💾 Served from cache ({cache.stats['bytes_saved']} bytes saved)\n")
+            if store is not None:
+                page = store.put(url, content['text'])
+        # Without a store the text is kept in memory for the session
+        text_content = content['text'] if page is None else None
         
         # Initialize OpenAI QA
         print("🤖 Initializing OpenAI...")
+        # The OpenAI SDK is the slowest import by far; load it after the page is in
+        from openai_qa import OpenAIQA
         qa = OpenAIQA(api_key=api_key)
+        
+        # Index the page once; every question below reuses it
+        index = qa.build_index(text_content or page.text)
+        print(f"📚 Indexed {len(index.chunks)} chunks for retrieval")
         print("✅ Ready!\n")
         
         print("=" * 60)
@@ -51,14 +81,21 @@ def interactive_mode(url, api_key=None, model="gpt-3.5-turbo"):
                 
                 if question.lower() == 'summary':
                     print("\n📋 Generating summary...")
-                    summary = qa.summarize_content(text_content)
+                    summary = qa.summarize_content(text_content or page.text)
                     print(f"\n📄 Summary:\n{summary}\n")
                     continue
                 
                 print("💭 Thinking...")
-                result = qa.answer_question(text_content, question, model=model)
-                print(f"\n💡 Answer:\n{result['answer']}")
-                print(f"📊 Tokens used: {result['tokens_used']}\n")
+                stream = qa.stream_answer(text_content or page.text, question, model=model,
+                                          top_k=top_k, max_context_tokens=max_context_tokens)
+                print("\n💡 Answer:")
+                for text in stream:
+                    print(text, end="", flush=True)
+                result = stream.result
+                print(f"\n📊 Tokens used: {result['tokens_used']}")
+                if result['time_to_first_token'] is not None:
+                    print(f"⏱️ First token after {result['time_to_first_token']:.2f}s")
+                print()
             
             except KeyboardInterrupt:
                 print("\n\n👋 Goodbye!")
@@ -88,6 +125,39 @@ if __name__ == "__main__":
         help='OpenAI model to use (default: gpt-3.5-turbo)'
     )
     
+    parser.add_argument(
+        '--cache-dir',
+        help='Cache fetched pages in this directory and revalidate them on later runs'
+    )
+    parser.add_argument(
+        '--cache-ttl',
+        type=float,
+        help='With --cache-dir, reuse cached pages younger than this many seconds without contacting the server'
+    )
+    parser.add_argument(
+        '--store-dir',
+        help='Keep scraped text in a compressed page store in this directory and reuse it on later runs'
+    )
+    parser.add_argument(
+        '--refresh',
+        action='store_true',
+        help='With --store-dir, scrape the page again even if it is already stored'
+    )
+    parser.add_argument(
+        '--max-context-tokens',
+        type=int,
+        default=3000,
+        help='Most page tokens sent with each question (default: 3000); 0 fills the model\'s context window'
+    )
+    parser.add_argument(
+        '--top-k',
+        type=int,
+        default=5,
+        help='Most relevant chunks sent with each question (default: 5); '
+             '0 sends as many as fit in --max-context-tokens'
+    )
+    
     args = parser.parse_args()
-    interactive_mode(args.url, args.api_key, args.model)
+    interactive_mode(args.url, args.api_key, args.model, args.cache_dir, args.cache_ttl,
+                     args.store_dir, args.refresh, args.max_context_tokens or None, args.top_k or None)
 
@@ -0,0 +1,241 @@
+"""
+Background Jobs Module
+Runs scrape-and-ask jobs on a shared thread pool that outlives any one request
+or UI rerun, with live progress, per-owner queue limits and expiry of finished
+jobs
+"""
+
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Job states
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+FINISHED_STATES = (DONE, FAILED, CANCELLED)
+
+
+class Job:
+    """
+    One URL to scrape, plus the questions to answer and whether to summarize it
+
+    Read .status, .stage and .progress while it runs; .page, .answers and
+    .summary fill in as the steps complete.
+    """
+
+    def __init__(self, job_id, owner, url, questions, summarize, model):
+        self.id = job_id
+        self.owner = owner
+        self.url = url
+        self.questions = list(questions)
+        self.summarize = summarize
+        self.model = model
+        self.status = QUEUED
+        self.stage = "Waiting for a worker"
+        self.steps_done = 0
+        self.steps_total = 1 + len(self.questions) + (1 if summarize else 0)
+        self.page = None
+        self.answers = []
+        self.summary = None
+        self.error = None
+        self.tokens_used = 0
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self._cancel = threading.Event()
+
+    @property
+    def progress(self):
+        """Fraction of steps completed (0.0 to 1.0)"""
+        return self.steps_done / self.steps_total
+
+    @property
+    def active(self):
+        return self.status not in FINISHED_STATES
+
+    def __repr__(self):
+        return f"Job({self.id}, {self.url!r}, {self.status})"
+
+
+class JobManager:
+    def __init__(self, max_workers=4, max_pending_per_owner=10, keep_finished=20, max_finished=200,
+                 finished_ttl=3600, owner_ttl=1800):
+        """
+        Initialize the manager
+
+        The same limits apply to every owner (e.g. every browser session): the
+        pool size caps concurrent jobs overall, and each owner can only have
+        max_pending_per_owner jobs queued or running, so one user can't fill
+        the queue for everyone else.
+
+        Args:
+            max_workers: Jobs run at once across all owners
+            max_pending_per_owner: Queued or running jobs allowed per owner
+            keep_finished: Finished jobs kept per owner (oldest are dropped)
+            max_finished: Finished jobs kept across all owners (oldest are dropped)
+            finished_ttl: Seconds a job is kept after it finishes
+            owner_ttl: Seconds an owner can go without submitting or listing
+                jobs (e.g. a closed browser tab) before its finished jobs are dropped
+        """
+        self.max_pending_per_owner = max_pending_per_owner
+        self.keep_finished = keep_finished
+        self.max_finished = max_finished
+        self.finished_ttl = finished_ttl
+        self.owner_ttl = owner_ttl
+        # Last time each owner submitted or listed jobs
+        self._seen = {}
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='job')
+        self._lock = threading.Lock()
+        self._jobs = {}
+        self._ids = itertools.count(1)
+
+    def submit(self, owner, url, scraper, qa=None, questions=(), summarize=False, model="gpt-3.5-turbo",
+               store=None, answer_options=None):
+        """
+        Queue a job
+
+        Args:
+            owner: Whoever the job belongs to (e.g. a session id)
+            url: URL to scrape
+            scraper: WebScraper to fetch with
+            qa: OpenAIQA for questions and the summary (required if there are any)
+            questions: Questions to answer about the page
+            summarize: Also summarize the page
+            model: OpenAI model
+            store: Optional PageStore; the page is kept there and .page is its
+                PageHandle. Without one the page text isn't kept after the job
+            answer_options: Extra keyword arguments for OpenAIQA.answer_question,
+                e.g. max_context_tokens and top_k
+
+        Returns:
+            The Job
+        """
+        if (questions or summarize) and qa is None:
+            raise ValueError("An OpenAI client is needed for questions and summaries")
+
+        with self._lock:
+            self._seen[owner] = time.time()
+            self._prune()
+            pending = sum(1 for job in self._jobs.values() if job.owner == owner and job.active)
+            if pending >= self.max_pending_per_owner:
+                raise ValueError(
+                    f"You already have {pending} jobs waiting or running; "
+                    f"the limit is {self.max_pending_per_owner}"
+                )
+            job = Job(next(self._ids), owner, url, questions, summarize, model)
+            self._jobs[job.id] = job
+
+        self._executor.submit(self._run, job, scraper, qa, store, answer_options or {})
+        return job
+
+    def _prune(self):
+        """
+        Drop finished jobs that are older than finished_ttl, belong to an idle
+        owner, or are beyond keep_finished or max_finished (caller holds the lock)
+        """
+        now = time.time()
+        idle = {owner for owner, seen in self._seen.items() if now - seen > self.owner_ttl}
+        kept = {}
+        total = 0
+        for job in sorted((job for job in self._jobs.values() if not job.active), key=lambda job: -job.id):
+            if (job.owner in idle or now - (job.finished or now) > self.finished_ttl
+                    or kept.get(job.owner, 0) >= self.keep_finished or total >= self.max_finished):
+                del self._jobs[job.id]
+            else:
+                kept[job.owner] = kept.get(job.owner, 0) + 1
+                total += 1
+        # Idle owners are forgotten once none of their jobs are left
+        owners = {job.owner for job in self._jobs.values()}
+        for owner in idle - owners:
+            del self._seen[owner]
+
+    def _run(self, job, scraper, qa, store, answer_options):
+        """Run one job's steps on a worker thread"""
+        if job._cancel.is_set():
+            job.status, job.stage, job.finished = CANCELLED, "Cancelled", time.time()
+            return
+        job.status = RUNNING
+        job.started = time.time()
+
+        try:
+            job.stage = "Scraping"
+            text = scraper.scrape(job.url)['text']
+            if store is not None:
+                job.page = store.put(job.url, text)
+            job.steps_done += 1
+
+            for i, question in enumerate(job.questions, 1):
+                if job._cancel.is_set():
+                    break
+                job.stage = f"Answering question {i} of {len(job.questions)}"
+                try:
+                    result = qa.answer_question(text, question, model=job.model, **answer_options)
+                    job.answers.append({'question': question, 'answer': result['answer'], 'error': None})
+                    job.tokens_used += result['tokens_used']
+                except Exception as e:
+                    job.answers.append({'question': question, 'answer': None, 'error': str(e)})
+                job.steps_done += 1
+
+            if job.summarize and not job._cancel.is_set():
+                job.stage = "Summarizing"
+                job.summary, tokens_used = qa.summarize_content(text, model=job.model, return_usage=True)
+                job.tokens_used += tokens_used
+                job.steps_done += 1
+        except Exception as e:
+            job.error = str(e)
+            job.status, job.stage = FAILED, "Failed"
+        else:
+            if job._cancel.is_set():
+                job.status, job.stage = CANCELLED, "Cancelled"
+            else:
+                job.status, job.stage = DONE, "Done"
+        job.finished = time.time()
+
+    def jobs(self, owner):
+        """An owner's jobs, newest first"""
+        with self._lock:
+            self._seen[owner] = time.time()
+            self._prune()
+            return sorted((job for job in self._jobs.values() if job.owner == owner), key=lambda job: -job.id)
+
+    def cancel(self, owner, job_id):
+        """
+        Stop a job: a queued job never starts, a running one stops after its
+        current step
+
+        Returns:
+            True if the job was found and still active
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None or job.owner != owner or not job.active:
+            return False
+        job._cancel.set()
+        return True
+
+    def clear_finished(self, owner):
+        """Forget an owner's finished jobs"""
+        with self._lock:
+            for job in [job for job in self._jobs.values() if job.owner == owner and not job.active]:
+                del self._jobs[job.id]
+
+    def stats(self):
+        """Counts of jobs by state across all owners"""
+        with self._lock:
+            self._prune()
+            counts = dict.fromkeys((QUEUED, RUNNING) + FINISHED_STATES, 0)
+            for job in self._jobs.values():
+                counts[job.status] += 1
+            return counts
+
+    def shutdown(self, wait=True):
+        """Stop taking jobs; queued jobs are cancelled"""
+        with self._lock:
+            for job in self._jobs.values():
+                if job.status == QUEUED:
+                    job._cancel.set()
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,136 @@
+"""
+LLM Response Cache Module
+Content-addressed cache for chat completion replies with an in-memory LRU
+tier backed by an optional on-disk store
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+class ResponseCache:
+    def __init__(self, directory=None, max_entries=256):
+        """
+        Initialize the cache
+
+        Args:
+            directory: Directory for the on-disk store. If None, only the
+                in-memory tier is used
+            max_entries: Number of replies kept in memory
+        """
+        self.max_entries = max_entries
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+
+        self._db = None
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(os.path.join(directory, 'responses.sqlite3'), check_same_thread=False)
+            self._db.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    content TEXT NOT NULL,
+                    tokens INTEGER NOT NULL,
+                    created REAL NOT NULL
+                )
+            """)
+            self._db.commit()
+
+        self.stats = {
+            'hits': 0,
+            'memory_hits': 0,
+            'disk_hits': 0,
+            'misses': 0,
+            'tokens_saved': 0
+        }
+
+    @staticmethod
+    def make_key(model, messages, max_tokens, temperature):
+        """
+        Hash everything that determines a reply
+
+        The messages carry the context and the question, so identical page
+        content asked the same question with the same settings maps to the
+        same key.
+        """
+        payload = json.dumps(
+            {
+                'model': model,
+                'messages': messages,
+                'max_tokens': max_tokens,
+                'temperature': temperature
+            },
+            sort_keys=True,
+            ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        """
+        Look up a reply
+
+        Args:
+            key: Key from make_key
+
+        Returns:
+            Tuple of (reply text, tokens the original call used), or None
+        """
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self.stats['memory_hits'] += 1
+            elif self._db is not None:
+                row = self._db.execute(
+                    "SELECT content, tokens FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    entry = (row[0], row[1])
+                    self._remember(key, entry)
+                    self.stats['disk_hits'] += 1
+
+            if entry is None:
+                self.stats['misses'] += 1
+                return None
+
+            self.stats['hits'] += 1
+            self.stats['tokens_saved'] += entry[1]
+            return entry
+
+    def put(self, key, content, tokens):
+        """
+        Store a reply
+
+        Args:
+            key: Key from make_key
+            content: Reply text
+            tokens: Total tokens the call used
+        """
+        with self._lock:
+            self._remember(key, (content, tokens))
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses (key, content, tokens, created) VALUES (?, ?, ?, ?)",
+                    (key, content, tokens, time.time())
+                )
+                self._db.commit()
+
+    def _remember(self, key, entry):
+        """Add an entry to the in-memory tier, evicting the least recently used"""
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def clear(self):
+        """Remove every cached reply from both tiers"""
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM responses")
+                self._db.commit()
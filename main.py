@@ -5,8 +5,43 @@ Combines web scraping and OpenAI question answering
 
 import argparse
 import sys
-from scraper import WebScraper
-from openai_qa import OpenAIQA
+
+# Everything else is imported once the arguments are known, and only if the run
+# needs it: a plain scrape never loads the OpenAI SDK, NumPy or the crawler.
+# benchmarks/bench_startup.py keeps the scrape-only start-up within budget.
+
+
+def report_metrics(metrics, fmt):
+    """Write the collected stage timings to stderr in the requested format"""
+    import logging
+    from metrics import JSONExporter, LogExporter, PrometheusExporter
+    
+    if fmt == 'log':
+        logging.basicConfig(stream=sys.stderr, level=logging.INFO, format='📈 %(message)s')
+        LogExporter().export(metrics)
+    elif fmt == 'json':
+        JSONExporter(sys.stderr).export(metrics)
+    else:
+        sys.stderr.write(PrometheusExporter().export(metrics))
+
+
+def report_changes(changes):
+    """Print what changed on a page since it was last checked"""
+    import time
+    
+    url = changes['url']
+    if changes['first_seen']:
+        print(f"🆕 {url}: first check, {len(changes['added'])} sections recorded")
+        return
+    since = time.strftime('%Y-%m-%d %H:%M', time.localtime(changes['checked_at']))
+    if not (changes['added'] or changes['changed'] or changes['removed']):
+        print(f"✅ {url}: no changes since {since}")
+        return
+    print(f"🔄 {url}: {len(changes['added'])} added, {len(changes['changed'])} changed, "
+          f"{len(changes['removed'])} removed, {len(changes['unchanged'])} unchanged since {since}")
+    for state, icon in (('added', '➕'), ('changed', '✏️'), ('removed', '➖')):
+        for key in changes[state]:
+            print(f"   {icon} {key or '(untitled)'}")
 
 
 def main():
@@ -16,7 +51,17 @@ def main():
     parser.add_argument('url', help='URL of the website to scrape')
     parser.add_argument(
         '-q', '--question',
-        help='Question to answer based on the scraped content'
+        action='append',
+        help='Question to answer based on the scraped content (repeat for several questions)'
+    )
+    parser.add_argument(
+        '--questions-file',
+        help='File with one question per line (blank lines and lines starting with # are ignored)'
+    )
+    parser.add_argument(
+        '--packed',
+        action='store_true',
+        help='Answer all questions in a single OpenAI request so the page content is only sent once'
     )
     parser.add_argument(
         '-s', '--summarize',
@@ -28,56 +73,297 @@ def main():
         action='store_true',
         help='Extract structured content (title, headings, paragraphs)'
     )
+    parser.add_argument(
+        '--engine',
+        default='bs4',
+        help='HTML extraction engine: bs4 (default) or lxml (faster)'
+    )
+    parser.add_argument(
+        '--crawl',
+        action='store_true',
+        help='Crawl the site from the URL (respecting robots.txt) and use every page as content'
+    )
+    parser.add_argument(
+        '--max-pages',
+        type=int,
+        default=20,
+        help='With --crawl, maximum number of pages to fetch (default: 20)'
+    )
+    parser.add_argument(
+        '--max-depth',
+        type=int,
+        default=2,
+        help='With --crawl, maximum link depth from the start URL (default: 2)'
+    )
+    parser.add_argument(
+        '--strip-boilerplate',
+        action='store_true',
+        help='With --crawl, drop text blocks repeated across the site (menus, banners, footers) before using the pages'
+    )
+    parser.add_argument(
+        '--stream',
+        action='store_true',
+        help='Stream the page in chunks and print text blocks as they are parsed (bounded memory)'
+    )
+    parser.add_argument(
+        '--max-bytes',
+        type=int,
+        help='With --stream, stop reading the page after this many bytes'
+    )
+    parser.add_argument(
+        '--cache-dir',
+        help='Cache fetched pages in this directory and revalidate them on later runs'
+    )
+    parser.add_argument(
+        '--cache-ttl',
+        type=float,
+        help='With --cache-dir, reuse cached pages younger than this many seconds without contacting the server'
+    )
+    parser.add_argument(
+        '--store-dir',
+        help='Keep the scraped text in a compressed, deduplicated page store in this directory'
+    )
+    parser.add_argument(
+        '--index-dir',
+        help='Add the scraped pages to a persistent index in this directory and answer '
+             'questions from every page indexed so far, with source URLs'
+    )
+    parser.add_argument(
+        '--changes-dir',
+        help='Remember the sections of each page in this directory and report what changed since the last run; '
+             'with -s, only changed sections are summarized again'
+    )
     parser.add_argument(
         '--api-key',
         help='OpenAI API key (or set OPENAI_API_KEY environment variable)'
     )
+    parser.add_argument(
+        '--llm-cache-dir',
+        help='Cache OpenAI answers and summaries in this directory and reuse them for identical requests'
+    )
+    parser.add_argument(
+        '--rpm',
+        type=int,
+        help='Your OpenAI requests-per-minute limit; requests are paced to stay under it'
+    )
+    parser.add_argument(
+        '--tpm',
+        type=int,
+        help='Your OpenAI tokens-per-minute limit; requests are paced to stay under it'
+    )
     parser.add_argument(
         '--model',
         default='gpt-3.5-turbo',
         help='OpenAI model to use (default: gpt-3.5-turbo)'
     )
+    parser.add_argument(
+        '--max-context-tokens',
+        type=int,
+        default=3000,
+        help='Most page tokens sent with each question or summary request (default: 3000); '
+             '0 fills the model\'s context window'
+    )
+    parser.add_argument(
+        '--top-k',
+        type=int,
+        help='Most relevant chunks sent with each question (default: 5, or 8 with --index-dir); '
+             '0 sends as many as fit in --max-context-tokens'
+    )
+    parser.add_argument(
+        '--profile',
+        nargs='?',
+        const='log',
+        choices=['log', 'json', 'prometheus'],
+        help='Time each stage (fetch, decode, parse, cleanup, prompt build, LLM call) and '
+             'print the totals to stderr as log lines (default), json or prometheus text'
+    )
     
     args = parser.parse_args()
     
+    from scraper import ENGINES, WebScraper
+    from metrics import Metrics
+    if args.engine not in ENGINES:
+        parser.error(f"argument --engine: invalid choice: '{args.engine}' (choose from {', '.join(ENGINES)})")
+    if args.changes_dir and args.stream:
+        parser.error("--changes-dir needs the page's sections and can't be used with --stream")
+    
+    questions = list(args.question or [])
+    if args.questions_file:
+        try:
+            with open(args.questions_file, encoding='utf-8') as f:
+                questions.extend(
+                    line.strip() for line in f
+                    if line.strip() and not line.strip().startswith('#')
+                )
+        except OSError as e:
+            parser.error(f"Cannot read questions file: {e}")
+    
     # Initialize scraper
     print(f"🔍 Scraping website: {args.url}")
-    scraper = WebScraper()
+    if args.cache_dir:
+        from http_cache import HTTPCache
+        cache = HTTPCache(args.cache_dir, ttl=args.cache_ttl)
+    else:
+        cache = None
+    metrics = Metrics(enabled=bool(args.profile))
+    scraper = WebScraper(engine=args.engine, cache=cache, metrics=metrics)
     
     try:
-        # Scrape the website
-        content = scraper.scrape(args.url, structured=args.structured)
+        if args.stream and not (questions or args.summarize):
+            # Nothing needs the whole text, so print blocks as they arrive
+            for block in scraper.stream_text_blocks(args.url, max_bytes=args.max_bytes):
+                print(block)
+            return
         
-        if args.structured:
+        index = store = detector = None
+        if args.changes_dir:
+            from change_detection import ChangeDetector
+            detector = ChangeDetector(args.changes_dir)
+        # (url, sections) of every scraped page, for change detection
+        page_sections = []
+        if args.index_dir:
+            from vector_index import VectorIndex
+            index = VectorIndex(args.index_dir)
+        if args.store_dir:
+            from page_store import PageStore
+            store = PageStore(args.store_dir)
+        
+        # Scrape the website
+        if args.crawl:
+            from crawler import Crawler
+            from boilerplate import BoilerplateDetector
+            boilerplate = BoilerplateDetector() if args.strip_boilerplate else None
+            crawler = Crawler(scraper, max_pages=args.max_pages, max_depth=args.max_depth, boilerplate=boilerplate,
+                              sections=detector is not None)
+            sections = []
+            for page in crawler.crawl(args.url):
+                if page['error']:
+                    print(f"⚠️ {page['url']}: {page['error']}")
+                    continue
+                print(f"📄 {page['url']} ({len(page['text'])} characters)")
+                sections.append(f"Source: {page['url']}\n{page['text']}")
+                if store is not None:
+                    store.put(page['url'], page['text'], title=page['title'])
+                if index is not None:
+                    index.add_document(page['url'], page['text'], title=page['title'])
+                if detector is not None:
+                    page_sections.append((page['url'], page['structured']['sections']))
+            text_content = "\n\n".join(sections)
+            print(f"\n✅ Crawled {crawler.stats['pages']} pages, {len(text_content)} characters")
+            if boilerplate:
+                for host, site in boilerplate.report().items():
+                    print(f"✂️ {host}: removed {site['boilerplate_blocks']} boilerplate blocks, "
+                          f"{site['bytes_saved']} bytes (~{site['tokens_saved']} tokens) saved")
+        elif args.stream:
+            text_content = ' '.join(scraper.stream_text_blocks(args.url, max_bytes=args.max_bytes))
+            print(f"\n✅ Successfully scraped {len(text_content)} characters")
+        elif args.structured or detector is not None:
+            content = scraper.scrape(args.url, structured=True, sections=detector is not None)
             text_content = content['full_text']
+            if detector is not None:
+                page_sections.append((args.url, content['structured']['sections']))
             print(f"\n📄 Title: {content['structured']['title']}")
             print(f"📊 Found {len(content['structured']['headings'])} headings")
             print(f"📝 Found {len(content['structured']['paragraphs'])} paragraphs")
         else:
+            content = scraper.scrape(args.url)
             text_content = content['text']
             print(f"\n✅ Successfully scraped {len(text_content)} characters")
         
+        if store is not None:
+            if not args.crawl:
+                store.put(args.url, text_content)
+            stats = store.stats
+            print(f"📦 Page store: {stats['writes']} new, {stats['deduplicated']} deduplicated, "
+                  f"{stats['bytes_in']} bytes stored as {stats['bytes_stored']}")
+        
+        if index is not None:
+            if not args.crawl:
+                index.add_document(args.url, text_content)
+            print(f"📚 Index: {index.documents()} pages, {len(index)} chunks")
+        
+        if detector is not None:
+            print()
+            for url, sections in page_sections:
+                report_changes(detector.update(url, sections))
+        
+        if cache:
+            print(f"💾 Cache: {cache.stats['hits']} hits, {cache.stats['misses']} misses, "
+                  f"{cache.stats['bytes_saved']} bytes saved")
+        
         # Initialize OpenAI QA
-        if args.question or args.summarize:
+        if questions or args.summarize:
             print("\n🤖 Initializing OpenAI...")
-            qa = OpenAIQA(api_key=args.api_key)
+            from openai_qa import OpenAIQA
+            from llm_cache import ResponseCache
+            from rate_limiter import RateLimiter
+            llm_cache = ResponseCache(args.llm_cache_dir) if args.llm_cache_dir else None
+            limiter = RateLimiter(args.rpm, args.tpm) if args.rpm or args.tpm else None
+            qa = OpenAIQA(api_key=args.api_key, cache=llm_cache, metrics=metrics, rate_limiter=limiter)
+
+        # How much of the page goes with each question
+        context_options = {'max_context_tokens': args.max_context_tokens or None}
+        if args.top_k is not None:
+            context_options['top_k'] = args.top_k or None
         
         # Answer question if provided
-        if args.question:
-            print(f"\n❓ Question: {args.question}")
+        if index is not None and questions:
+            for question in questions:
+                print(f"\n❓ Question: {question}")
+                result = qa.answer_from_index(index, question, model=args.model, **context_options)
+                print(f"💡 Answer:\n{result['answer']}")
+                if result['sources']:
+                    print("🔗 Sources:\n" + "\n".join(f"  - {url}" for url in result['sources']))
+                print(f"📊 Tokens used: {result['tokens_used']}")
+        elif len(questions) == 1:
+            print(f"\n❓ Question: {questions[0]}")
             print("💭 Thinking...")
-            result = qa.answer_question(text_content, args.question, model=args.model)
-            print(f"\n💡 Answer:\n{result['answer']}")
-            print(f"\n📊 Tokens used: {result['tokens_used']}")
+            stream = qa.stream_answer(text_content, questions[0], model=args.model, **context_options)
+            print("\n💡 Answer:")
+            for text in stream:
+                print(text, end="", flush=True)
+            result = stream.result
+            print(f"\n\n📊 Tokens used: {result['tokens_used']}")
+            if result['time_to_first_token'] is not None:
+                print(f"⏱️ First token after {result['time_to_first_token']:.2f}s")
+        elif questions:
+            print(f"\n💭 Answering {len(questions)} questions...")
+            results = qa.answer_questions(
+                text_content,
+                questions,
+                model=args.model,
+                mode='packed' if args.packed else 'concurrent',
+                **context_options
+            )
+            for result in results:
+                print(f"\n❓ Question: {result['question']}")
+                print(f"💡 Answer:\n{result['answer']}")
+            print(f"\n📊 Tokens used: {sum(result['tokens_used'] for result in results)}")
         
         # Generate summary if requested
         if args.summarize:
             print("\n📋 Generating summary...")
-            summary = qa.summarize_content(text_content)
+            sections = [section for _, page in page_sections for section in page]
+            if detector is not None and any(section['blocks'] for section in sections):
+                result = detector.summarize(
+                    sections, qa, model=args.model, max_context_tokens=context_options['max_context_tokens']
+                )
+                summary = result['summary']
+                print(f"♻️ Section summaries: {result['sections_reused']} reused, "
+                      f"{result['sections_summarized']} generated")
+            else:
+                summary = qa.summarize_content(
+                    text_content, model=args.model, max_context_tokens=context_options['max_context_tokens']
+                )
             print(f"\n📄 Summary:\n{summary}")
         
+        if (questions or args.summarize) and qa.cache:
+            stats = qa.cache.stats
+            print(f"\n💾 Response cache: {stats['hits']} hits, {stats['misses']} misses, "
+                  f"{stats['tokens_saved']} tokens saved")
+        
         # If no question or summary, just show content preview
-        if not args.question and not args.summarize:
+        if not questions and not args.summarize:
             preview = text_content[:500] + "..." if len(text_content) > 500 else text_content
             print(f"\n📄 Content Preview:\n{preview}")
             print(f"\n💡 Tip: Use -q 'your question' to ask questions about this content")
@@ -86,6 +372,12 @@ def main():
     except Exception as e:
         print(f"\n❌ Error: {str(e)}", file=sys.stderr)
         sys.exit(1)
+    finally:
+        if args.profile:
+            report_metrics(metrics, args.profile)
+            found = ', '.join(f"{method} {count}" for method, count in scraper.charset.stats.items() if count)
+            if found:
+                print(f"🔤 Encodings found by: {found}", file=sys.stderr)
 
 
 if __name__ == "__main__":
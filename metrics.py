@@ -0,0 +1,231 @@
+"""
+Metrics Module
+Lightweight per-stage timing (fetch, decode, parse, cleanup, prompt build,
+LLM call) with log, JSON and Prometheus text exporters
+"""
+
+import json
+import logging
+import threading
+import time
+
+
+class _StageTimer:
+    """Times one stage; set .bytes and .tokens inside the with block to record them"""
+
+    __slots__ = ('metrics', 'name', 'bytes', 'tokens', '_start')
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+        self.bytes = 0
+        self.tokens = 0
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.metrics.record(self.name, time.perf_counter() - self._start, self.bytes, self.tokens,
+                            error=exc_type is not None)
+        return False
+
+
+class _NullTimer:
+    """Shared do-nothing timer handed out while metrics are disabled"""
+
+    bytes = 0
+    tokens = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def __setattr__(self, name, value):
+        pass
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class Metrics:
+    def __init__(self, enabled=True):
+        """
+        Initialize the collector
+
+        Args:
+            enabled: Record stages. While False, stage() hands out a shared no-op
+                timer and record() returns immediately
+        """
+        self.enabled = enabled
+        self._stages = {}
+        self._lock = threading.Lock()
+
+    def stage(self, name):
+        """
+        Time a stage
+
+        Usage:
+            with metrics.stage('fetch') as stage:
+                response = session.get(url)
+                stage.bytes = len(response.content)
+        """
+        if not self.enabled:
+            return _NULL_TIMER
+        return _StageTimer(self, name)
+
+    def record(self, name, seconds=0.0, bytes=0, tokens=0, error=False):
+        """
+        Record one run of a stage directly
+
+        Args:
+            name: Stage name
+            seconds: Duration in seconds
+            bytes: Bytes (or characters) the stage processed
+            tokens: Tokens the stage used
+            error: True if the stage failed
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            stats = self._stages.get(name)
+            if stats is None:
+                stats = self._stages[name] = {
+                    'count': 0, 'errors': 0, 'seconds': 0.0, 'max_seconds': 0.0, 'bytes': 0, 'tokens': 0
+                }
+            stats['count'] += 1
+            stats['errors'] += bool(error)
+            stats['seconds'] += seconds
+            stats['max_seconds'] = max(stats['max_seconds'], seconds)
+            stats['bytes'] += bytes
+            stats['tokens'] += tokens
+
+    def snapshot(self):
+        """
+        Totals per stage
+
+        Returns:
+            Dictionary mapping stage name to 'count', 'errors', 'seconds',
+            'max_seconds', 'bytes' and 'tokens'
+        """
+        with self._lock:
+            return {name: dict(stats) for name, stats in self._stages.items()}
+
+    def reset(self):
+        """Forget everything recorded so far"""
+        with self._lock:
+            self._stages.clear()
+
+
+# Default for components created without a collector
+NULL_METRICS = Metrics(enabled=False)
+
+
+class LogExporter:
+    def __init__(self, logger=None, level=logging.INFO):
+        """
+        Export metrics as one log line per stage
+
+        Args:
+            logger: Logger to write to (default: the 'metrics' logger)
+            level: Log level of the lines
+        """
+        self.logger = logger or logging.getLogger('metrics')
+        self.level = level
+
+    def export(self, metrics):
+        """Log every stage and return the lines"""
+        lines = []
+        for name, stats in sorted(metrics.snapshot().items()):
+            average = stats['seconds'] / stats['count'] if stats['count'] else 0.0
+            lines.append(
+                f"stage={name} count={stats['count']} errors={stats['errors']} "
+                f"total_ms={stats['seconds'] * 1000:.1f} avg_ms={average * 1000:.2f} "
+                f"max_ms={stats['max_seconds'] * 1000:.2f} bytes={stats['bytes']} tokens={stats['tokens']}"
+            )
+        for line in lines:
+            self.logger.log(self.level, line)
+        return lines
+
+
+class JSONExporter:
+    def __init__(self, stream=None):
+        """
+        Export metrics as a JSON document
+
+        Args:
+            stream: Optional file object the document is written to
+        """
+        self.stream = stream
+
+    def export(self, metrics):
+        """Return (and write, if there is a stream) the snapshot as JSON"""
+        document = json.dumps({'timestamp': time.time(), 'stages': metrics.snapshot()}, indent=2)
+        if self.stream is not None:
+            self.stream.write(document + '\n')
+        return document
+
+
+class PrometheusExporter:
+    def __init__(self, prefix='webscraper'):
+        """
+        Export metrics in the Prometheus text exposition format
+
+        Args:
+            prefix: Prefix of every metric name
+        """
+        self.prefix = prefix
+
+    def export(self, metrics):
+        """Return the snapshot as Prometheus text"""
+        snapshot = metrics.snapshot()
+        families = [
+            ('stage_runs_total', 'counter', 'Number of times a stage ran', 'count'),
+            ('stage_errors_total', 'counter', 'Number of times a stage failed', 'errors'),
+            ('stage_seconds_total', 'counter', 'Total time spent in a stage', 'seconds'),
+            ('stage_max_seconds', 'gauge', 'Longest single run of a stage', 'max_seconds'),
+            ('stage_bytes_total', 'counter', 'Bytes processed by a stage', 'bytes'),
+            ('stage_tokens_total', 'counter', 'Tokens used by a stage', 'tokens'),
+        ]
+        lines = []
+        for suffix, kind, help_text, field in families:
+            name = f"{self.prefix}_{suffix}"
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for stage, stats in sorted(snapshot.items()):
+                lines.append(f'{name}{{stage="{stage}"}} {stats[field]}')
+        return '\n'.join(lines) + '\n'
+
+    def serve(self, metrics, host='127.0.0.1', port=9100):
+        """
+        Serve /metrics over HTTP from a background thread
+
+        Returns:
+            The running ThreadingHTTPServer (call shutdown() to stop it)
+        """
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        exporter = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?', 1)[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = exporter.export(metrics).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
@@ -3,20 +3,57 @@ OpenAI Question Answering Module
 Handles question answering using OpenAI API
 """
 
+import hashlib
 import os
-from openai import OpenAI
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from openai import APIConnectionError, OpenAI
 from dotenv import load_dotenv
 
+from retrieval import BM25Index, chunk_text
+from token_budget import TokenBudgeter
+from metrics import NULL_METRICS
+
 load_dotenv()
 
+# Characters per retrieval chunk
+CHUNK_SIZE = 1200
+
+# Default cap on context tokens sent with a question (None fills the model's window)
+DEFAULT_CONTEXT_TOKENS = 3000
+
+# Separator placed between retrieved chunks
+CHUNK_SEPARATOR = "\n...\n"
+
+# Reply budget for summaries, and the target length in words of each partial
+# summary when summarizing long content map-reduce style
+SUMMARY_MAX_TOKENS = 300
+PART_SUMMARY_WORDS = 120
+
+# Start of each answer in a packed multi-question reply ("A1:", "**A2.**", ...)
+PACKED_ANSWER_RE = re.compile(r'^[\s*#]*A(\d+)\s*[:.)\-]\**\s*', re.MULTILINE)
+
 
 class OpenAIQA:
-    def __init__(self, api_key=None):
+    def __init__(self, api_key=None, cache=None, approximate_tokens=False, base_url=None, metrics=None,
+                 rate_limiter=None):
         """
         Initialize OpenAI client
         
         Args:
             api_key: OpenAI API key. If None, will try to get from environment variable OPENAI_API_KEY
+            cache: Optional ResponseCache; identical requests are then answered from it
+            approximate_tokens: Budget context with a fast token estimate instead of
+                the tokenizer (useful for very large pages)
+            base_url: Optional OpenAI-compatible API endpoint (e.g. a local server)
+            metrics: Optional Metrics collector for per-stage timings
+            rate_limiter: Optional RateLimiter shared by every client of the same
+                account; requests then wait for request/token budget, and 429s,
+                5xx errors and dropped connections are retried by it rather
+                than by the OpenAI SDK
         """
         self.api_key = api_key or os.getenv('OPENAI_API_KEY')
         if not self.api_key:
@@ -24,9 +61,150 @@ class OpenAIQA:
                 "OpenAI API key not found. Please set OPENAI_API_KEY environment variable "
                 "or pass it as a parameter."
             )
-        self.client = OpenAI(api_key=self.api_key)
+        self.rate_limiter = rate_limiter
+        if rate_limiter is not None:
+            self.client = OpenAI(api_key=self.api_key, base_url=base_url, max_retries=0)
+        else:
+            self.client = OpenAI(api_key=self.api_key, base_url=base_url)
+        self.cache = cache
+        self.approximate_tokens = approximate_tokens
+        self.metrics = metrics or NULL_METRICS
+        self._budgeters = {}
+        
+        # Retrieval indexes for recently used documents, keyed by content hash.
+        # One client is shared by threads (e.g. Streamlit sessions), so the LRU
+        # and the budgeters are guarded by a lock
+        self._indexes = OrderedDict()
+        self.max_cached_indexes = 8
+        self._lock = threading.Lock()
+    
+    def build_index(self, context):
+        """
+        Chunk a document and index it for retrieval
+        
+        The index is cached per document, so calling this again with the same
+        text (or asking more questions about it) reuses the existing index.
+        
+        Args:
+            context: The text content to index
+        
+        Returns:
+            BM25Index over the document's chunks
+        """
+        key = hashlib.sha1(context.encode('utf-8', errors='replace')).hexdigest()
+        with self._lock:
+            index = self._indexes.get(key)
+            if index is not None:
+                self._indexes.move_to_end(key)
+                return index
+        
+        # Built outside the lock so other documents aren't held up
+        index = BM25Index(chunk_text(context, chunk_size=CHUNK_SIZE))
+        with self._lock:
+            # Another thread may have indexed the same document meanwhile
+            index = self._indexes.setdefault(key, index)
+            self._indexes.move_to_end(key)
+            while len(self._indexes) > self.max_cached_indexes:
+                self._indexes.popitem(last=False)
+        return index
+    
+    def budgeter(self, model):
+        """Return the (shared) TokenBudgeter for a model"""
+        with self._lock:
+            if model not in self._budgeters:
+                self._budgeters[model] = TokenBudgeter(model, approximate=self.approximate_tokens)
+            return self._budgeters[model]
+    
+    def select_context(self, context, question, top_k=5, budget_tokens=DEFAULT_CONTEXT_TOKENS, model="gpt-3.5-turbo"):
+        """
+        Pick the parts of a document most relevant to a question
+        
+        Documents that fit in the token budget are used whole. Longer ones are
+        chunked, ranked with BM25 and the top chunks are packed, in document
+        order, while they fit in the budget.
+        
+        Args:
+            context: The text content to answer questions from
+            question: The question to answer
+            top_k: Maximum number of chunks to include (None for as many as fit)
+            budget_tokens: Maximum number of context tokens
+            model: Model whose tokenizer is used for counting
+        
+        Returns:
+            Tuple of (context text, number of chunks used)
+        """
+        budgeter = self.budgeter(model)
+        if budgeter.count(context) <= budget_tokens:
+            return context, 1
+        
+        index = self.build_index(context)
+        separator_tokens = budgeter.count(CHUNK_SEPARATOR)
+        selected = index.select(
+            question, k=top_k, budget=budget_tokens,
+            cost=lambda chunk: budgeter.count(chunk) + separator_tokens
+        )
+        if not selected:
+            # The budget is smaller than a single chunk
+            best = index.select(question, k=1)[0]
+            return budgeter.truncate(index.chunks[best], budget_tokens), 1
+        
+        excerpt = CHUNK_SEPARATOR.join(index.chunks[i] for i in selected)
+        return excerpt, len(selected)
+    
+    def _select_context_for_all(self, context, questions, top_k=5, budget_tokens=DEFAULT_CONTEXT_TOKENS,
+                                model="gpt-3.5-turbo"):
+        """Pick context relevant to any of several questions, taking chunks round-robin by rank"""
+        budgeter = self.budgeter(model)
+        if budgeter.count(context) <= budget_tokens:
+            return context, 1
+        
+        index = self.build_index(context)
+        limit = len(index.chunks) if top_k is None else top_k
+        rankings = [[doc_id for doc_id, _ in index.search(question, k=limit)] for question in questions]
+        if not any(rankings):
+            rankings = [list(range(min(limit, len(index.chunks))))]
+        
+        separator_tokens = budgeter.count(CHUNK_SEPARATOR)
+        selected = []
+        total = 0
+        for rank in range(limit):
+            for ranking in rankings:
+                if rank >= len(ranking) or ranking[rank] in selected:
+                    continue
+                size = budgeter.count(index.chunks[ranking[rank]]) + separator_tokens
+                if total + size > budget_tokens:
+                    continue
+                selected.append(ranking[rank])
+                total += size
+        
+        if not selected:
+            # The budget is smaller than a single chunk
+            best = next(ranking[0] for ranking in rankings if ranking)
+            return budgeter.truncate(index.chunks[best], budget_tokens), 1
+        
+        excerpt = CHUNK_SEPARATOR.join(index.chunks[i] for i in sorted(selected))
+        return excerpt, len(selected)
+    
+    def _context_budget(self, model, messages, max_tokens, max_context_tokens):
+        """
+        Context tokens that fit next to the prompt and the reply, optionally capped
+        
+        Raises:
+            ValueError: If the prompt and the reply leave no room for content at all
+        """
+        budgeter = self.budgeter(model)
+        budget = budgeter.available(budgeter.count_messages(messages), max_tokens)
+        if budget <= 0:
+            raise ValueError(
+                f"No room for content: the prompt and a {max_tokens}-token reply fill the "
+                f"{budgeter.context_window}-token context window of {model}"
+            )
+        if max_context_tokens is not None:
+            budget = min(budget, max_context_tokens)
+        return budget
     
-    def answer_question(self, context, question, model="gpt-3.5-turbo", max_tokens=500):
+    def answer_question(self, context, question, model="gpt-3.5-turbo", max_tokens=500, top_k=5,
+                        max_context_tokens=DEFAULT_CONTEXT_TOKENS):
         """
         Answer a question based on the provided context
         
@@ -35,15 +213,107 @@ class OpenAIQA:
             question: The question to answer
             model: OpenAI model to use (default: gpt-3.5-turbo)
             max_tokens: Maximum tokens in response (default: 500)
+            top_k: Maximum number of relevant chunks of a long document to send
+                (None for as many as fit the budget)
+            max_context_tokens: Cap on context tokens; None fills whatever the model's
+                context window has left after the prompt and max_tokens
         
         Returns:
             Dictionary with answer and metadata
         """
-        # Truncate context if too long (to avoid token limits)
-        max_context_length = 12000  # Leave room for question and response
-        if len(context) > max_context_length:
-            context = context[:max_context_length] + "... [content truncated]"
+        messages, chunks_used = self._answer_messages(context, question, top_k, model, max_tokens, max_context_tokens)
+        
+        try:
+            answer, tokens_used = self._chat(messages, model=model, max_tokens=max_tokens, temperature=0.7)
+            
+            return {
+                'question': question,
+                'answer': answer,
+                'model': model,
+                'tokens_used': tokens_used,
+                'chunks_used': chunks_used
+            }
+        except Exception as e:
+            raise Exception(f"Error calling OpenAI API: {str(e)}")
+    
+    def stream_answer(self, context, question, model="gpt-3.5-turbo", max_tokens=500, top_k=5,
+                      max_context_tokens=DEFAULT_CONTEXT_TOKENS):
+        """
+        Answer a question, yielding the answer text as it is generated
+        
+        Args:
+            context: The text content to answer questions from
+            question: The question to answer
+            model: OpenAI model to use (default: gpt-3.5-turbo)
+            max_tokens: Maximum tokens in response (default: 500)
+            top_k: Maximum number of relevant chunks of a long document to send
+            max_context_tokens: Cap on context tokens; None fills the model's context window
+        
+        Returns:
+            AnswerStream; iterate it for text fragments, then read its .result
+            (same keys as answer_question plus 'time_to_first_token' in seconds)
+        """
+        messages, chunks_used = self._answer_messages(context, question, top_k, model, max_tokens, max_context_tokens)
+        return AnswerStream(self, messages, question, model, max_tokens, chunks_used)
+    
+    def answer_from_index(self, index, question, model="gpt-3.5-turbo", max_tokens=500, top_k=8,
+                          max_context_tokens=DEFAULT_CONTEXT_TOKENS):
+        """
+        Answer a question from a VectorIndex of many scraped pages
+        
+        The best matching chunks across all indexed pages are packed into the
+        token budget, each labelled with the URL it came from.
+        
+        Args:
+            index: VectorIndex to search
+            question: The question to answer
+            model: OpenAI model to use (default: gpt-3.5-turbo)
+            max_tokens: Maximum tokens in response
+            top_k: Maximum number of chunks to retrieve (None for as many as fit)
+            max_context_tokens: Cap on context tokens; None fills the model's context window
+        
+        Returns:
+            Dictionary with answer and metadata (as answer_question), plus
+            'sources': URLs of the chunks used, best match first
+        """
+        budgeter = self.budgeter(model)
+        budget = self._context_budget(model, self._question_messages('', question), max_tokens, max_context_tokens)
+        separator_tokens = budgeter.count(CHUNK_SEPARATOR)
+        
+        parts = []
+        sources = []
+        used = 0
+        for hit in index.search(question, k=len(index) if top_k is None else top_k):
+            part = f"Source: {hit['url']}\n{hit['text']}"
+            size = budgeter.count(part) + separator_tokens
+            if used + size > budget:
+                continue
+            parts.append(part)
+            used += size
+            if hit['url'] not in sources:
+                sources.append(hit['url'])
         
+        # The packed excerpt fits the budget, so answer_question sends it whole
+        result = self.answer_question(
+            CHUNK_SEPARATOR.join(parts), question, model=model, max_tokens=max_tokens,
+            max_context_tokens=max_context_tokens
+        )
+        result['chunks_used'] = len(parts)
+        result['sources'] = sources
+        return result
+    
+    def _answer_messages(self, context, question, top_k, model, max_tokens, max_context_tokens):
+        """Build the chat messages for a question, keeping only as much relevant context as fits"""
+        with self.metrics.stage('prompt_build') as stage:
+            stage.bytes = len(context)
+            budget = self._context_budget(model, self._question_messages('', question), max_tokens, max_context_tokens)
+            
+            # Only send the parts of the page relevant to the question
+            context, chunks_used = self.select_context(context, question, top_k=top_k, budget_tokens=budget, model=model)
+            return self._question_messages(context, question), chunks_used
+    
+    def _question_messages(self, context, question):
+        """Chat messages asking one question about some context"""
         prompt = f"""Based on the following website content, please answer the question. 
 If the answer cannot be found in the content, please say so.
 
@@ -54,61 +324,447 @@ Question: {question}
 
 Answer:"""
         
+        return [
+            {"role": "system", "content": "You are a helpful assistant that answers questions based on provided website content."},
+            {"role": "user", "content": prompt}
+        ]
+    
+    def _packed_messages(self, context, questions):
+        """Chat messages asking several numbered questions about some context in one request"""
+        numbered = "\n".join(f"Q{i}: {question}" for i, question in enumerate(questions, 1))
+        prompt = f"""Based on the following website content, please answer each of the questions below.
+If an answer cannot be found in the content, please say so for that question.
+Reply with one answer per question in exactly this format:
+A1: <answer to Q1>
+A2: <answer to Q2>
+
+Website Content:
+{context}
+
+Questions:
+{numbered}
+
+Answers:"""
+        
+        return [
+            {"role": "system", "content": "You are a helpful assistant that answers questions based on provided website content."},
+            {"role": "user", "content": prompt}
+        ]
+    
+    def answer_questions(self, context, questions, model="gpt-3.5-turbo", max_tokens=500, mode="concurrent",
+                         max_workers=4, top_k=5, max_context_tokens=DEFAULT_CONTEXT_TOKENS):
+        """
+        Answer several questions about the same content
+        
+        Args:
+            context: The text content to answer questions from
+            questions: List of questions
+            model: OpenAI model to use (default: gpt-3.5-turbo)
+            max_tokens: Maximum tokens per answer (default: 500)
+            mode: 'concurrent' sends one request per question, at most max_workers
+                at a time. 'packed' answers every question in a single request so
+                the context is only paid for once; questions whose answers can't be
+                parsed out of the reply are re-asked individually. Questions whose
+                answers together would exceed the model's reply limit (or half its
+                context window) are split into several packs, sent concurrently
+            max_workers: Maximum parallel requests in concurrent mode
+            top_k: Maximum number of relevant chunks per question for long documents
+            max_context_tokens: Cap on context tokens per request; None fills the
+                model's context window
+        
+        Returns:
+            List of answer dictionaries (as from answer_question), in question order.
+            In packed mode the request's tokens are split evenly between the answers
+        """
+        if mode not in ('concurrent', 'packed'):
+            raise ValueError(f"Unknown mode: {mode}. Choose 'concurrent' or 'packed'")
+        if not questions:
+            return []
+        
+        if mode == 'concurrent' or len(questions) == 1:
+            with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(questions)))) as executor:
+                return list(executor.map(
+                    lambda question: self.answer_question(
+                        context, question, model=model, max_tokens=max_tokens, top_k=top_k,
+                        max_context_tokens=max_context_tokens
+                    ),
+                    questions
+                ))
+        
+        # Every answer needs max_tokens of reply, and the reply must leave room
+        # for the content, so many questions go out as several packs
+        budgeter = self.budgeter(model)
+        per_pack = max(1, min(budgeter.output_limit, budgeter.context_window // 2) // max_tokens)
+        packs = [questions[i:i + per_pack] for i in range(0, len(questions), per_pack)]
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(packs)))) as executor:
+            answered = list(executor.map(
+                lambda pack: self._answer_pack(context, pack, model, max_tokens, max_workers, top_k,
+                                               max_context_tokens),
+                packs
+            ))
+        return [result for results in answered for result in results]
+    
+    def _answer_pack(self, context, questions, model, max_tokens, max_workers, top_k, max_context_tokens):
+        """Answer a pack of questions in one request (see answer_questions)"""
+        reply_tokens = max_tokens * len(questions)
+        with self.metrics.stage('prompt_build') as stage:
+            stage.bytes = len(context)
+            budget = self._context_budget(model, self._packed_messages('', questions), reply_tokens, max_context_tokens)
+            excerpt, chunks_used = self._select_context_for_all(
+                context, questions, top_k=top_k, budget_tokens=budget, model=model
+            )
+            messages = self._packed_messages(excerpt, questions)
+        
         try:
-            response = self.client.chat.completions.create(
+            reply, tokens_used = self._chat(
+                messages,
                 model=model,
-                messages=[
-                    {"role": "system", "content": "You are a helpful assistant that answers questions based on provided website content."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=max_tokens,
+                max_tokens=reply_tokens,
                 temperature=0.7
             )
-            
-            answer = response.choices[0].message.content.strip()
-            
-            return {
-                'question': question,
-                'answer': answer,
-                'model': model,
-                'tokens_used': response.usage.total_tokens
-            }
         except Exception as e:
             raise Exception(f"Error calling OpenAI API: {str(e)}")
+        
+        answers = self._parse_packed_answers(reply, len(questions))
+        share, remainder = divmod(tokens_used, len(questions))
+        results = []
+        missing = []
+        for i, question in enumerate(questions):
+            if answers.get(i + 1):
+                results.append({
+                    'question': question,
+                    'answer': answers[i + 1],
+                    'model': model,
+                    'tokens_used': share + (1 if i < remainder else 0),
+                    'chunks_used': chunks_used
+                })
+            else:
+                results.append(None)
+                missing.append(i)
+        
+        # Fall back to individual requests for anything the reply didn't cover
+        if missing:
+            retried = self.answer_questions(
+                context, [questions[i] for i in missing], model=model, max_tokens=max_tokens,
+                mode='concurrent', max_workers=max_workers, top_k=top_k, max_context_tokens=max_context_tokens
+            )
+            for i, result in zip(missing, retried):
+                results[i] = result
+        return results
+    
+    def _parse_packed_answers(self, reply, count):
+        """Split an 'A1: ... A2: ...' reply into {question number: answer}"""
+        answers = {}
+        matches = list(PACKED_ANSWER_RE.finditer(reply))
+        for match, following in zip(matches, matches[1:] + [None]):
+            number = int(match.group(1))
+            end = following.start() if following else len(reply)
+            answer = reply[match.end():end].strip()
+            if 1 <= number <= count and answer and number not in answers:
+                answers[number] = answer
+        return answers
+    
+    def _chat(self, messages, model, max_tokens, temperature):
+        """
+        Run one chat completion, going through the response cache if there is one
+        
+        Returns:
+            Tuple of (stripped reply text, total tokens used). Replies served
+            from the cache report 0 tokens used
+        """
+        key = None
+        if self.cache is not None:
+            key = self.cache.make_key(model, messages, max_tokens, temperature)
+            cached = self.cache.get(key)
+            if cached is not None:
+                self.metrics.record('llm_cache_hit')
+                return cached[0], 0
+        
+        with self.metrics.stage('llm_call') as stage:
+            estimate = self._estimate_tokens(messages, model, max_tokens)
+            response = self._create(
+                estimate,
+                model=model,
+                messages=messages,
+                max_tokens=max_tokens,
+                temperature=temperature
+            )
+            content = response.choices[0].message.content.strip()
+            tokens_used = response.usage.total_tokens
+            stage.tokens = tokens_used
+        self._settle(estimate, tokens_used)
+        
+        if key is not None:
+            self.cache.put(key, content, tokens_used)
+        return content, tokens_used
+    
+    def _estimate_tokens(self, messages, model, max_tokens):
+        """Token cost of a request as the rate limiter counts it: prompt plus the reply budget"""
+        if self.rate_limiter is None:
+            return 0
+        return self.budgeter(model).count_messages(messages) + max_tokens
+    
+    def _create(self, estimate, **kwargs):
+        """Send one chat completion request, waiting on the rate limiter if there is one"""
+        if self.rate_limiter is None:
+            return self.client.chat.completions.create(**kwargs)
+        raw = self.rate_limiter.call(
+            lambda: self.client.chat.completions.with_raw_response.create(**kwargs),
+            tokens=estimate,
+            retry_on=(APIConnectionError,)
+        )
+        return raw.parse()
+    
+    def _settle(self, estimate, tokens_used):
+        """Hand the unused part of a request's token reservation back to the limiter"""
+        if self.rate_limiter is not None:
+            self.rate_limiter.settle(estimate, tokens_used)
     
-    def summarize_content(self, content, max_length=200):
+    def summarize_content(self, content, max_length=200, model="gpt-3.5-turbo", map_reduce=True, max_workers=16,
+                          max_context_tokens=None, return_usage=False):
         """
         Summarize website content
         
+        Content that doesn't fit in one request is summarized map-reduce style:
+        the full text is chunked, the chunks are summarized concurrently and the
+        partial summaries are merged in a final step (repeatedly, if needed).
+        
         Args:
             content: The text content to summarize
             max_length: Maximum length of summary in words
+            model: OpenAI model to use (default: gpt-3.5-turbo)
+            map_reduce: If False, summarize only as much as fits in one request
+            max_workers: Maximum number of chunk summaries requested at once
+            max_context_tokens: Cap on content tokens per request; None fills the
+                model's context window
+            return_usage: Also return the tokens used by all of the requests
+        
+        Returns:
+            Summary string, or a tuple of (summary, total tokens used) with
+            return_usage
+        """
+        try:
+            budgeter = self.budgeter(model)
+            budget = self._context_budget(
+                model, self._summary_messages('', max_length, merging=True), SUMMARY_MAX_TOKENS, max_context_tokens
+            )
+            if budgeter.count(content) <= budget:
+                summary, tokens_used = self._summarize(content, max_length, model)
+            elif not map_reduce:
+                summary, tokens_used = self._summarize(budgeter.truncate(content, budget) + "...", max_length, model)
+            else:
+                # Map: summarize every chunk of the page in parallel. Chunks are sized
+                # in characters from the page's own characters-per-token ratio
+                chunk_size = max(1000, int(budget * budgeter.chars_per_token(content) * 0.9))
+                chunks = [budgeter.truncate(chunk, budget) for chunk in chunk_text(content, chunk_size=chunk_size, overlap=200)]
+                partials, map_tokens = self._summarize_parts(chunks, model, max_workers)
+                summary, tokens_used = self._reduce(partials, budget, max_length, model, max_workers)
+                tokens_used += map_tokens
+            return (summary, tokens_used) if return_usage else summary
+        except Exception as e:
+            raise Exception(f"Error summarizing content: {str(e)}")
+    
+    def merge_summaries(self, summaries, max_length=200, model="gpt-3.5-turbo", max_workers=16,
+                        max_context_tokens=None):
+        """
+        Combine summaries of consecutive parts of one website into one summary
+        
+        This is the reduce step of summarize_content, for callers that already
+        have the part summaries (e.g. kept from an earlier run).
+        
+        Args:
+            summaries: Part summaries, in page order
+            max_length: Maximum length of summary in words
+            model: OpenAI model to use (default: gpt-3.5-turbo)
+            max_workers: Maximum number of merge requests sent at once
+            max_context_tokens: Cap on content tokens per request; None fills the
+                model's context window
         
         Returns:
             Summary string
         """
-        max_content_length = 8000
-        if len(content) > max_content_length:
-            content = content[:max_content_length] + "..."
+        try:
+            budget = self._context_budget(
+                model, self._summary_messages('', max_length, merging=True), SUMMARY_MAX_TOKENS, max_context_tokens
+            )
+            summary, _ = self._reduce(list(summaries), budget, max_length, model, max_workers)
+            return summary
+        except Exception as e:
+            raise Exception(f"Error merging summaries: {str(e)}")
+    
+    def _reduce(self, partials, budget, max_length, model, max_workers):
+        """
+        Merge partial summaries until they fit in one request, then into the final summary
+        
+        Returns:
+            Tuple of (summary, total tokens used)
+        """
+        budgeter = self.budgeter(model)
+        tokens_used = 0
+        while budgeter.count("\n\n".join(partials)) > budget and len(partials) > 1:
+            groups = self._group(partials, budget, budgeter.count)
+            partials, tokens = self._summarize_parts(groups, model, max_workers, merging=True)
+            tokens_used += tokens
+        
+        merged = budgeter.truncate("\n\n".join(partials), budget)
+        summary, tokens = self._summarize(merged, max_length, model, merging=True)
+        return summary, tokens_used + tokens
+    
+    def _summarize(self, content, max_length, model, merging=False):
+        """
+        Summarize one piece of content (or a set of partial summaries) in a single call
         
-        prompt = f"""Please provide a concise summary of the following website content in approximately {max_length} words:
+        Returns:
+            Tuple of (summary, tokens used)
+        """
+        return self._chat(
+            self._summary_messages(content, max_length, merging),
+            model=model,
+            max_tokens=SUMMARY_MAX_TOKENS,
+            temperature=0.5
+        )
+    
+    def _summary_messages(self, content, max_length, merging=False):
+        """Chat messages asking for a summary of some content"""
+        if merging:
+            prompt = f"""The following are summaries of consecutive parts of one website. Combine them into a single concise summary of the whole website in approximately {max_length} words:
 
 {content}
 
 Summary:"""
+        else:
+            prompt = f"""Please provide a concise summary of the following website content in approximately {max_length} words:
+
+{content}
+
+Summary:"""
+        
+        return [
+            {"role": "system", "content": "You are a helpful assistant that creates concise summaries."},
+            {"role": "user", "content": prompt}
+        ]
+    
+    def _summarize_parts(self, parts, model, max_workers, merging=False):
+        """
+        Summarize several pieces concurrently, keeping their order
         
+        Returns:
+            Tuple of (list of summaries, total tokens used)
+        """
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(parts)))) as executor:
+            results = list(executor.map(
+                lambda part: self._summarize(part, PART_SUMMARY_WORDS, model, merging=merging),
+                parts
+            ))
+        return [summary for summary, _ in results], sum(tokens for _, tokens in results)
+    
+    def _group(self, texts, budget, cost=len):
+        """Pack consecutive texts into groups whose total cost stays within budget"""
+        groups = []
+        current = []
+        size = 0
+        for text in texts:
+            text_cost = cost(text)
+            if current and size + text_cost > budget:
+                groups.append("\n\n".join(current))
+                current = []
+                size = 0
+            current.append(text)
+            size += text_cost + 1
+        if current:
+            groups.append("\n\n".join(current))
+        return groups
+
+
+class AnswerStream:
+    """
+    Streaming answer from OpenAIQA.stream_answer
+    
+    Iterating yields answer text fragments as they arrive. Once iteration
+    finishes, .result holds the full answer dictionary, including token usage
+    and the time to the first token.
+    """
+    
+    def __init__(self, qa, messages, question, model, max_tokens, chunks_used):
+        self.qa = qa
+        self.messages = messages
+        self.question = question
+        self.model = model
+        self.max_tokens = max_tokens
+        self.chunks_used = chunks_used
+        self.result = None
+    
+    def __iter__(self):
+        started = time.perf_counter()
+        cache = self.qa.cache
+        key = None
+        if cache is not None:
+            key = cache.make_key(self.model, self.messages, self.max_tokens, 0.7)
+            cached = cache.get(key)
+            if cached is not None:
+                self.qa.metrics.record('llm_cache_hit')
+                self._finish(cached[0], 0, time.perf_counter() - started)
+                yield cached[0]
+                return
+        
+        parts = []
+        usage = None
+        time_to_first_token = None
+        estimate = self.qa._estimate_tokens(self.messages, self.model, self.max_tokens)
+        response = None
         try:
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "You are a helpful assistant that creates concise summaries."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=300,
-                temperature=0.5
+            response = self.qa._create(
+                estimate,
+                model=self.model,
+                messages=self.messages,
+                max_tokens=self.max_tokens,
+                temperature=0.7,
+                stream=True,
+                # Ask for a final usage chunk; sent as a raw field so older SDKs pass it through
+                extra_body={"stream_options": {"include_usage": True}}
             )
-            
-            return response.choices[0].message.content.strip()
+            for chunk in response:
+                if getattr(chunk, 'usage', None):
+                    usage = chunk.usage
+                if not chunk.choices:
+                    continue
+                text = chunk.choices[0].delta.content
+                if text:
+                    if time_to_first_token is None:
+                        time_to_first_token = time.perf_counter() - started
+                    parts.append(text)
+                    yield text
         except Exception as e:
-            raise Exception(f"Error summarizing content: {str(e)}")
-
+            if response is not None:
+                # Broke off mid-stream: the prompt and the reply so far were used
+                # (a request that failed outright is refunded by the rate limiter)
+                self.qa._settle(estimate, estimate - self.max_tokens + len(''.join(parts)) // 4)
+            self.qa.metrics.record('llm_call', time.perf_counter() - started, error=True)
+            raise Exception(f"Error calling OpenAI API: {str(e)}")
+        
+        answer = ''.join(parts).strip()
+        if usage is not None:
+            tokens_used = usage.total_tokens
+        else:
+            # Server didn't report usage; estimate at ~4 characters per token
+            prompt_chars = sum(len(message['content']) for message in self.messages)
+            tokens_used = (prompt_chars + len(answer)) // 4
+        
+        self.qa._settle(estimate, tokens_used)
+        self.qa.metrics.record('llm_call', time.perf_counter() - started, tokens=tokens_used)
+        if time_to_first_token is not None:
+            self.qa.metrics.record('llm_first_token', time_to_first_token)
+        
+        if key is not None:
+            cache.put(key, answer, tokens_used)
+        self._finish(answer, tokens_used, time_to_first_token)
+    
+    def _finish(self, answer, tokens_used, time_to_first_token):
+        self.result = {
+            'question': self.question,
+            'answer': answer,
+            'model': self.model,
+            'tokens_used': tokens_used,
+            'chunks_used': self.chunks_used,
+            'time_to_first_token': time_to_first_token
+        }
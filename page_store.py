@@ -0,0 +1,371 @@
+"""
+Page Store Module
+Compressed, content-addressed storage for scraped page text. Identical text is
+stored once, bodies live in one append-only pack file that is read lazily
+through mmap, and a small SQLite index maps URLs to content hashes. Past a size
+limit, least recently used pages are evicted and the pack file is compacted.
+"""
+
+import hashlib
+import mmap
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+try:
+    import zstandard
+except ImportError:  # Optional: fall back to zlib
+    zstandard = None
+
+CODECS = ('zstd', 'zlib')
+
+# Once the pack file passes max_bytes, pages are evicted until the remaining
+# text takes up this fraction of it, so compaction runs once per batch of
+# evictions rather than on every put
+EVICT_TO = 0.75
+
+
+class PageHandle:
+    """
+    Lightweight reference to a stored page
+
+    Holds only the URL, hash and size; the text is decompressed from the
+    store each time .text is read, so handles can be kept around freely.
+    Reading .text raises KeyError once the page has been evicted.
+    """
+
+    __slots__ = ('store', 'url', 'content_hash', 'size', 'title', 'stored_at')
+
+    def __init__(self, store, url, content_hash, size, title=None, stored_at=None):
+        self.store = store
+        self.url = url
+        self.content_hash = content_hash
+        self.size = size
+        self.title = title
+        self.stored_at = stored_at
+
+    @property
+    def text(self):
+        """The page text (read and decompressed on every access)"""
+        return self.store.read(self.content_hash)
+
+    @property
+    def available(self):
+        """False once the page has been evicted from the store"""
+        return self.store.has(self.content_hash)
+
+    def preview(self, length=2000):
+        """The start of the page text"""
+        text = self.text
+        return text[:length] + "..." if len(text) > length else text
+
+    def __len__(self):
+        return self.size
+
+    def __repr__(self):
+        return f"PageHandle({self.url!r}, {self.size} characters)"
+
+
+class TextPage:
+    """
+    In-memory page with the same interface as PageHandle, for when pages
+    aren't kept in a store
+    """
+
+    __slots__ = ('url', 'text', 'title')
+
+    def __init__(self, url, text, title=None):
+        self.url = url
+        self.text = text
+        self.title = title
+
+    @property
+    def available(self):
+        return True
+
+    def preview(self, length=2000):
+        """The start of the page text"""
+        return self.text[:length] + "..." if len(self.text) > length else self.text
+
+    def __len__(self):
+        return len(self.text)
+
+    def __repr__(self):
+        return f"TextPage({self.url!r}, {len(self.text)} characters)"
+
+
+class PageStore:
+    def __init__(self, directory='.cache/pages', codec=None, level=None, max_bytes=200 * 1024 * 1024):
+        """
+        Open (or create) a store
+
+        Args:
+            directory: Directory holding the pack file and its index
+            codec: 'zstd' or 'zlib' for new pages (default: zstd when the
+                zstandard package is installed, zlib otherwise)
+            level: Compression level (default: the codec's default)
+            max_bytes: Maximum size of the pack file; least recently used pages
+                are evicted and the pack compacted beyond this (None for no limit)
+        """
+        if codec is None:
+            codec = 'zstd' if zstandard is not None else 'zlib'
+        if codec not in CODECS:
+            raise ValueError(f"Unknown codec: {codec}. Choose one of: {', '.join(CODECS)}")
+        if codec == 'zstd' and zstandard is None:
+            raise ValueError("The zstd codec needs the zstandard package")
+
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.codec = codec
+        self.level = level
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._map = None
+
+        self._db = sqlite3.connect(os.path.join(directory, 'index.sqlite3'), check_same_thread=False)
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS blobs (
+                hash TEXT PRIMARY KEY,
+                offset INTEGER NOT NULL,
+                length INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                codec TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                hash TEXT NOT NULL,
+                title TEXT,
+                stored_at REAL NOT NULL,
+                last_access REAL NOT NULL DEFAULT 0
+            );
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            );
+        """)
+        if 'last_access' not in {row[1] for row in self._db.execute("PRAGMA table_info(pages)")}:
+            # Store created before eviction existed
+            self._db.execute("ALTER TABLE pages ADD COLUMN last_access REAL NOT NULL DEFAULT 0")
+            self._db.execute("UPDATE pages SET last_access = stored_at")
+        self._db.execute("CREATE INDEX IF NOT EXISTS pages_last_access ON pages (last_access)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS pages_hash ON pages (hash)")
+        self._db.commit()
+
+        # Compaction writes a new pack file; the index names the current one, so a
+        # crash mid-compaction leaves the old file and its offsets in use
+        row = self._db.execute("SELECT value FROM meta WHERE key = 'pack'").fetchone()
+        self._pack_path = os.path.join(directory, row[0] if row else 'pages.pack')
+        open(self._pack_path, 'ab').close()
+
+        self.stats = {
+            'writes': 0,
+            'deduplicated': 0,
+            'bytes_in': 0,
+            'bytes_stored': 0,
+            'evictions': 0,
+            'compactions': 0
+        }
+
+    def _compress(self, data):
+        if self.codec == 'zstd':
+            return zstandard.ZstdCompressor(level=self.level or 3).compress(data)
+        return zlib.compress(data, self.level or 6)
+
+    def _decompress(self, data, codec):
+        if codec == 'zstd':
+            if zstandard is None:
+                raise RuntimeError("This page was stored with zstd; install the zstandard package to read it")
+            return zstandard.ZstdDecompressor().decompress(data)
+        return zlib.decompress(data)
+
+    def put(self, url, text, title=None):
+        """
+        Store a page's text
+
+        Text already in the store (from any URL) is not written again. If the
+        pack file grows past max_bytes, least recently used pages are evicted;
+        the page just stored never is.
+
+        Args:
+            url: Page URL
+            text: Page text
+            title: Optional page title
+
+        Returns:
+            PageHandle for the stored page
+        """
+        data = text.encode('utf-8')
+        content_hash = hashlib.sha256(data).hexdigest()
+        now = time.time()
+
+        with self._lock:
+            self.stats['bytes_in'] += len(data)
+            pack_size = None
+            if self._db.execute("SELECT 1 FROM blobs WHERE hash = ?", (content_hash,)).fetchone():
+                self.stats['deduplicated'] += 1
+            else:
+                compressed = self._compress(data)
+                with open(self._pack_path, 'ab') as f:
+                    offset = f.tell()
+                    f.write(compressed)
+                    f.flush()
+                    os.fsync(f.fileno())
+                    pack_size = f.tell()
+                self._db.execute(
+                    "INSERT INTO blobs (hash, offset, length, size, codec) VALUES (?, ?, ?, ?, ?)",
+                    (content_hash, offset, len(compressed), len(text), self.codec)
+                )
+                self.stats['writes'] += 1
+                self.stats['bytes_stored'] += len(compressed)
+
+            self._db.execute(
+                "INSERT OR REPLACE INTO pages (url, hash, title, stored_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                (url, content_hash, title, now, now)
+            )
+            self._db.commit()
+            if self.max_bytes is not None and pack_size is not None and pack_size > self.max_bytes:
+                self._evict(keep=content_hash)
+        return PageHandle(self, url, content_hash, len(text), title, now)
+
+    def _evict(self, keep):
+        """
+        Evict least recently used pages down to EVICT_TO of max_bytes, then
+        compact the pack file (caller holds the lock)
+
+        Args:
+            keep: Hash of a text that must stay (the page just stored)
+        """
+        # Text no URL points to any more, e.g. an older version of a page
+        self._db.execute("DELETE FROM blobs WHERE hash NOT IN (SELECT hash FROM pages)")
+        live = self._db.execute("SELECT COALESCE(SUM(length), 0) FROM blobs").fetchone()[0]
+        target = self.max_bytes * EVICT_TO
+
+        for url, content_hash in self._db.execute(
+            "SELECT url, hash FROM pages WHERE hash != ? ORDER BY last_access", (keep,)
+        ).fetchall():
+            if live <= target:
+                break
+            self._db.execute("DELETE FROM pages WHERE url = ?", (url,))
+            self.stats['evictions'] += 1
+            if self._db.execute("SELECT 1 FROM pages WHERE hash = ?", (content_hash,)).fetchone() is None:
+                row = self._db.execute("SELECT length FROM blobs WHERE hash = ?", (content_hash,)).fetchone()
+                if row is not None:
+                    self._db.execute("DELETE FROM blobs WHERE hash = ?", (content_hash,))
+                    live -= row[0]
+        self._compact()
+
+    def _compact(self):
+        """Copy the texts still in the index into a new pack file and switch to it (caller holds the lock)"""
+        old_path = self._pack_path
+        name = f"pages-{time.time_ns()}.pack"
+        new_path = os.path.join(self.directory, name)
+        with open(old_path, 'rb') as src, open(new_path, 'wb') as dst:
+            for content_hash, offset, length in self._db.execute(
+                "SELECT hash, offset, length FROM blobs ORDER BY offset"
+            ).fetchall():
+                src.seek(offset)
+                self._db.execute("UPDATE blobs SET offset = ? WHERE hash = ?", (dst.tell(), content_hash))
+                dst.write(src.read(length))
+            dst.flush()
+            os.fsync(dst.fileno())
+        # The new offsets and the new file name are committed together
+        self._db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('pack', ?)", (name,))
+        self._db.commit()
+
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._pack_path = new_path
+        os.remove(old_path)
+        self.stats['compactions'] += 1
+
+    def delete(self, url):
+        """
+        Remove a URL from the store
+
+        Its text is dropped when no other URL shares it; the space is reclaimed
+        at the next compaction.
+
+        Returns:
+            True if the URL was stored
+        """
+        with self._lock:
+            deleted = self._db.execute("DELETE FROM pages WHERE url = ?", (url,)).rowcount > 0
+            self._db.execute("DELETE FROM blobs WHERE hash NOT IN (SELECT hash FROM pages)")
+            self._db.commit()
+        return deleted
+
+    def has(self, content_hash):
+        """True if a text is still in the store"""
+        with self._lock:
+            return self._db.execute("SELECT 1 FROM blobs WHERE hash = ?", (content_hash,)).fetchone() is not None
+
+    def get(self, url):
+        """
+        Look up the latest stored version of a URL
+
+        Returns:
+            PageHandle, or None if the URL isn't stored
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT pages.hash, blobs.size, pages.title, pages.stored_at "
+                "FROM pages JOIN blobs ON blobs.hash = pages.hash WHERE pages.url = ?",
+                (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        return PageHandle(self, url, row[0], row[1], row[2], row[3])
+
+    def read(self, content_hash):
+        """
+        Read and decompress a stored text
+
+        Only the page's own bytes are touched: the pack file is memory-mapped
+        and the OS pages in just the slice that is read.
+
+        Args:
+            content_hash: Hash from a PageHandle
+
+        Returns:
+            The text
+
+        Raises:
+            KeyError: The text has been evicted
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT offset, length, codec FROM blobs WHERE hash = ?", (content_hash,)
+            ).fetchone()
+            if row is None:
+                raise KeyError(content_hash)
+            offset, length, codec = row
+            self._db.execute("UPDATE pages SET last_access = ? WHERE hash = ?", (time.time(), content_hash))
+            self._db.commit()
+            if self._map is None or offset + length > len(self._map):
+                # The pack has grown since it was mapped
+                if self._map is not None:
+                    self._map.close()
+                with open(self._pack_path, 'rb') as f:
+                    self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            data = self._map[offset:offset + length]
+        return self._decompress(data, codec).decode('utf-8')
+
+    def __contains__(self, url):
+        with self._lock:
+            return self._db.execute("SELECT 1 FROM pages WHERE url = ?", (url,)).fetchone() is not None
+
+    def urls(self):
+        """All stored URLs, most recently stored first"""
+        with self._lock:
+            return [url for (url,) in self._db.execute("SELECT url FROM pages ORDER BY stored_at DESC")]
+
+    def close(self):
+        """Release the mapping and the index"""
+        with self._lock:
+            if self._map is not None:
+                self._map.close()
+                self._map = None
+            self._db.close()
@@ -0,0 +1,115 @@
+"""
+Parallel Extraction Module
+Extracts text from batches of HTML on a pool of worker processes, so CPU-bound
+parsing is not limited to the one core the GIL allows
+"""
+
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+
+from scraper import ENGINES, WebScraper
+
+# Scraper living in each worker process, created once by the pool initializer
+_worker_scraper = None
+
+
+def _init_worker(engine):
+    global _worker_scraper
+    _worker_scraper = WebScraper(engine=engine)
+
+
+def _extract_chunk(items, structured):
+    """Extract a chunk of (id, html) pairs inside a worker process"""
+    results = []
+    for item_id, html in items:
+        try:
+            if structured:
+                content = _worker_scraper.extract_structured_content(html)
+            else:
+                content = _worker_scraper.extract_text(html)
+            results.append({'id': item_id, 'content': content, 'error': None})
+        except Exception as e:
+            results.append({'id': item_id, 'content': None, 'error': str(e)})
+    return results
+
+
+class ParallelExtractor:
+    def __init__(self, engine='bs4', max_workers=None, chunk_size=8, max_pending_chunks=None):
+        """
+        Initialize the extractor
+
+        Args:
+            engine: HTML extraction engine used in the workers ('bs4' or 'lxml')
+            max_workers: Number of worker processes (default: number of CPUs)
+            chunk_size: Pages sent to a worker per task; larger chunks cut
+                inter-process overhead for small pages
+            max_pending_chunks: Chunks submitted but not yet collected (default:
+                twice the number of workers). Input is only read this far ahead,
+                so memory stays bounded on very large batches
+        """
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine: {engine}. Choose one of: {', '.join(ENGINES)}")
+        self.engine = engine
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.chunk_size = max(1, chunk_size)
+        self.max_pending_chunks = max_pending_chunks or 2 * self.max_workers
+        self._executor = None
+
+    def _pool(self):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                initializer=_init_worker,
+                initargs=(self.engine,)
+            )
+        return self._executor
+
+    def extract_many(self, pages, structured=False):
+        """
+        Extract many pages in parallel, yielding results as chunks finish
+
+        Args:
+            pages: Iterable of (id, html) pairs. html may be str or raw bytes;
+                bytes are parsed with the encoding the document declares
+            structured: If True, return extract_structured_content dictionaries;
+                if False, extract_text strings
+
+        Yields:
+            Dictionaries with 'id', 'content' and 'error' (None on success,
+            error message on failure), in completion order
+        """
+        executor = self._pool()
+        pages = iter(pages)
+        pending = set()
+
+        def submit_next():
+            chunk = list(islice(pages, self.chunk_size))
+            if chunk:
+                pending.add(executor.submit(_extract_chunk, chunk, structured))
+            return bool(chunk)
+
+        more = True
+        while more and len(pending) < self.max_pending_chunks:
+            more = submit_next()
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                pending.discard(future)
+                yield from future.result()
+                # Back-pressure: read more input only as results are consumed
+                if more:
+                    more = submit_next()
+
+    def close(self):
+        """Shut the worker processes down"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
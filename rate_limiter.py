@@ -0,0 +1,326 @@
+"""
+Rate Limiter Module
+Shared request-per-minute and token-per-minute scheduler for OpenAI calls.
+Each call reserves its estimated tokens from two token buckets before it is
+sent; rate-limit headers keep the buckets in step with the server, and a 429
+pauses every caller for as long as the server asks.
+"""
+
+import asyncio
+import random
+import re
+import threading
+import time
+
+# Durations in x-ratelimit-reset-* headers, e.g. "1s", "6m0s", "20ms"
+DURATION_RE = re.compile(r'(\d+(?:\.\d+)?)(ms|h|m|s)')
+DURATION_UNITS = {'ms': 0.001, 's': 1.0, 'm': 60.0, 'h': 3600.0}
+
+
+def parse_duration(value):
+    """Seconds in a reset header value such as '6m0s', or None if it can't be read"""
+    if not value:
+        return None
+    parts = DURATION_RE.findall(value)
+    if not parts:
+        try:
+            return float(value)
+        except ValueError:
+            return None
+    return sum(float(amount) * DURATION_UNITS[unit] for amount, unit in parts)
+
+
+def _header(headers, name):
+    try:
+        return headers.get(name)
+    except AttributeError:
+        return None
+
+
+def _is_rate_limit_error(error):
+    """True for a 429 from an OpenAI-style client (anything with status_code 429)"""
+    return getattr(error, 'status_code', None) == 429
+
+
+def _is_quota_error(error):
+    """True for a 429 saying the account is out of quota, which waiting won't fix"""
+    body = getattr(error, 'body', None)
+    if isinstance(body, dict) and isinstance(body.get('error'), dict):
+        body = body['error']
+    codes = (getattr(error, 'code', None), getattr(error, 'type', None))
+    if isinstance(body, dict):
+        codes += (body.get('code'), body.get('type'))
+    return _is_rate_limit_error(error) and 'insufficient_quota' in codes
+
+
+def _is_transient_error(error, retry_on=()):
+    """True for errors worth retrying that aren't rate limits: 408, 409, 5xx and retry_on types"""
+    status = getattr(error, 'status_code', None)
+    if status is not None:
+        return status in (408, 409) or status >= 500
+    return isinstance(error, (ConnectionError, TimeoutError) + tuple(retry_on))
+
+
+class TokenBucket:
+    """
+    Bucket refilled continuously at limit per minute
+
+    Takes may run the level below zero; the caller then waits until the
+    refill has paid the debt back, so callers are served in the order they
+    asked and a request larger than the bucket still gets through. The bucket
+    holds burst_seconds worth of the limit, so a cold start can't fire a
+    whole minute's allowance at once.
+    """
+
+    def __init__(self, per_minute, burst_seconds=1.0):
+        self.burst_seconds = burst_seconds
+        self.set_limit(per_minute)
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def set_limit(self, per_minute):
+        self.per_minute = per_minute
+        self.rate = per_minute / 60.0
+        self.capacity = max(1.0, self.rate * self.burst_seconds)
+
+    def _refill(self, now):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def take(self, amount, now):
+        """Remove amount and return the seconds until the bucket is out of debt"""
+        self._refill(now)
+        self.level -= amount
+        return max(0.0, -self.level / self.rate)
+
+    def give(self, amount, now):
+        """Return unused reservation"""
+        self._refill(now)
+        self.level = min(self.capacity, self.level + amount)
+
+    def sync(self, remaining, now):
+        """Never believe there is more left than the server reports"""
+        self._refill(now)
+        self.level = min(self.level, remaining)
+
+
+class RateLimiter:
+    def __init__(self, requests_per_minute=None, tokens_per_minute=None, max_retries=6,
+                 base_delay=1.0, max_delay=60.0):
+        """
+        Initialize the limiter
+
+        One limiter should be shared by everything that calls the same account.
+        A limit left as None is learned from the server's x-ratelimit-limit-*
+        headers instead.
+
+        Args:
+            requests_per_minute: Request limit of the account
+            tokens_per_minute: Token limit of the account
+            max_retries: Times a call is retried after a 429 or a transient error
+            base_delay: First backoff delay in seconds when the server gives no hint
+            max_delay: Longest single backoff delay in seconds
+        """
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._lock = threading.Lock()
+        self._requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self._tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self._paused_until = 0.0
+        self.stats = {
+            'requests': 0,
+            'rate_limited': 0,
+            'retries': 0,
+            'seconds_waited': 0.0
+        }
+
+    def reserve(self, tokens=0):
+        """
+        Reserve one request and an estimated token cost
+
+        Returns:
+            Seconds to wait before sending
+        """
+        with self._lock:
+            now = time.monotonic()
+            wait = max(0.0, self._paused_until - now)
+            if self._requests is not None:
+                wait = max(wait, self._requests.take(1, now))
+            if self._tokens is not None and tokens:
+                wait = max(wait, self._tokens.take(tokens, now))
+            self.stats['requests'] += 1
+            self.stats['seconds_waited'] += wait
+            return wait
+
+    def acquire(self, tokens=0):
+        """Reserve and sleep until the request may be sent (for threads)"""
+        wait = self.reserve(tokens)
+        if wait:
+            time.sleep(wait)
+
+    async def acquire_async(self, tokens=0):
+        """Reserve and sleep until the request may be sent (for asyncio)"""
+        wait = self.reserve(tokens)
+        if wait:
+            await asyncio.sleep(wait)
+
+    def settle(self, estimated, actual):
+        """Give back tokens reserved beyond what a request really used"""
+        if self._tokens is None or actual is None or actual >= estimated:
+            return
+        with self._lock:
+            self._tokens.give(estimated - actual, time.monotonic())
+
+    def update(self, headers):
+        """
+        Adapt to x-ratelimit-* headers from a response
+
+        Limits the server reports replace the configured ones, and the
+        remaining counts cap what the buckets think is left.
+        """
+        if not headers:
+            return
+        with self._lock:
+            now = time.monotonic()
+            for kind in ('requests', 'tokens'):
+                limit = _header(headers, f'x-ratelimit-limit-{kind}')
+                remaining = _header(headers, f'x-ratelimit-remaining-{kind}')
+                bucket = getattr(self, f'_{kind}')
+                try:
+                    limit = float(limit) if limit is not None else None
+                    remaining = float(remaining) if remaining is not None else None
+                except ValueError:
+                    continue
+                if limit:
+                    if bucket is None:
+                        bucket = TokenBucket(limit)
+                        setattr(self, f'_{kind}', bucket)
+                    elif bucket.per_minute != limit:
+                        bucket.set_limit(limit)
+                if bucket is not None and remaining is not None:
+                    bucket.sync(remaining, now)
+
+    def backoff(self, headers, attempt):
+        """
+        Pause every caller after a 429
+
+        The delay comes from retry-after-ms / retry-after, then the reset time
+        of whichever limit is exhausted, then exponential backoff; jitter keeps
+        waiting callers from retrying in lockstep.
+
+        Returns:
+            Seconds paused
+        """
+        delay = None
+        retry_after_ms = _header(headers, 'retry-after-ms')
+        retry_after = _header(headers, 'retry-after')
+        if retry_after_ms:
+            delay = parse_duration(retry_after_ms + 'ms')
+        elif retry_after:
+            delay = parse_duration(retry_after)
+        if delay is None:
+            resets = [
+                parse_duration(_header(headers, f'x-ratelimit-reset-{kind}'))
+                for kind in ('requests', 'tokens')
+                if _header(headers, f'x-ratelimit-remaining-{kind}') in ('0', 0)
+            ]
+            resets = [reset for reset in resets if reset is not None]
+            delay = max(resets) if resets else None
+        if delay is None:
+            delay = self.base_delay * 2 ** attempt
+        delay = min(delay, self.max_delay) * (1 + random.uniform(0, 0.1))
+
+        with self._lock:
+            self.stats['rate_limited'] += 1
+            self._paused_until = max(self._paused_until, time.monotonic() + delay)
+        self.update(headers)
+        return delay
+
+    def _retry_delay(self, error, tokens, attempt, retry_on):
+        """
+        Handle a failed call: refund its token reservation and decide whether to retry
+
+        A 429 pauses every caller (see backoff); a transient error only backs
+        off the caller that hit it. An exhausted quota (insufficient_quota) is
+        not retried.
+
+        Returns:
+            Seconds this caller should sleep before retrying, or None to give up
+        """
+        # The server didn't process the request, so its tokens were never used
+        self.settle(tokens, 0)
+        if attempt >= self.max_retries or _is_quota_error(error):
+            return None
+        if _is_rate_limit_error(error):
+            self.backoff(getattr(getattr(error, 'response', None), 'headers', None), attempt)
+            delay = 0.0  # The shared pause is waited out in acquire
+        elif _is_transient_error(error, retry_on):
+            delay = min(self.base_delay * 2 ** attempt, self.max_delay) * (1 + random.uniform(0, 0.1))
+        else:
+            return None
+        with self._lock:
+            self.stats['retries'] += 1
+        return delay
+
+    def call(self, func, tokens=0, retry_on=()):
+        """
+        Run func() under the limits, retrying it when it is rate limited or
+        fails transiently (408, 409, 5xx, connection errors and timeouts)
+
+        func's result (or a 429 error) is checked for a .headers / .response.headers
+        mapping to adapt to.
+
+        Args:
+            func: Function sending one request
+            tokens: Estimated token cost of the request
+            retry_on: Further exception types to retry, e.g. a client library's
+                connection error
+
+        Returns:
+            func's return value
+        """
+        attempt = 0
+        while True:
+            self.acquire(tokens)
+            try:
+                result = func()
+            except Exception as e:
+                delay = self._retry_delay(e, tokens, attempt, retry_on)
+                if delay is None:
+                    raise
+                if delay:
+                    time.sleep(delay)
+                attempt += 1
+                continue
+            self.update(getattr(result, 'headers', None))
+            return result
+
+    async def call_async(self, func, tokens=0, retry_on=()):
+        """
+        Asyncio version of call: awaits func() under the limits, retrying it
+        when it is rate limited or fails transiently
+
+        Args:
+            func: Function returning an awaitable that sends one request
+            tokens: Estimated token cost of the request
+            retry_on: Further exception types to retry
+
+        Returns:
+            The awaited result
+        """
+        attempt = 0
+        while True:
+            await self.acquire_async(tokens)
+            try:
+                result = await func()
+            except Exception as e:
+                delay = self._retry_delay(e, tokens, attempt, retry_on)
+                if delay is None:
+                    raise
+                if delay:
+                    await asyncio.sleep(delay)
+                attempt += 1
+                continue
+            self.update(getattr(result, 'headers', None))
+            return result
@@ -0,0 +1,148 @@
+"""
+Retrieval Module
+Splits page text into chunks and ranks them against a question with BM25
+"""
+
+import math
+import re
+from collections import Counter
+
+TOKEN_RE = re.compile(r'\w+')
+
+STOPWORDS = frozenset("""
+a an and are as at be but by can could did do does for from had has have how i if in into is it
+its of on or so than that the their them then there these they this to was we were what when
+where which who whom why will with would you your
+""".split())
+
+
+def tokenize(text):
+    """Lowercase word tokens with common stopwords removed"""
+    return [token for token in TOKEN_RE.findall(text.lower()) if token not in STOPWORDS]
+
+
+def chunk_text(text, chunk_size=1200, overlap=150):
+    """
+    Split text into overlapping chunks, preferring sentence and word boundaries
+
+    Args:
+        text: Text to split
+        chunk_size: Target chunk length in characters
+        overlap: Number of characters each chunk repeats from the previous one
+
+    Returns:
+        List of chunk strings in document order
+    """
+    chunks = []
+    length = len(text)
+    start = 0
+
+    while start < length:
+        end = min(start + chunk_size, length)
+        if end < length:
+            # Back off to the end of a sentence, or at least a word
+            floor = start + chunk_size // 2
+            cut = text.rfind('. ', floor, end)
+            if cut == -1:
+                cut = text.rfind(' ', floor, end)
+            if cut != -1:
+                end = cut + 1
+
+        chunk = text[start:end].strip()
+        if chunk:
+            chunks.append(chunk)
+        if end >= length:
+            break
+
+        # Start the next chunk a little earlier, on a word boundary
+        next_start = max(end - overlap, start + 1)
+        space = text.find(' ', next_start, end)
+        start = space + 1 if space != -1 else end
+
+    return chunks
+
+
+class BM25Index:
+    def __init__(self, chunks, k1=1.5, b=0.75):
+        """
+        Build a BM25 index over text chunks
+
+        Args:
+            chunks: List of chunk strings
+            k1: Term frequency saturation parameter
+            b: Length normalization parameter
+        """
+        self.chunks = chunks
+        self.k1 = k1
+        self.b = b
+
+        self.postings = {}
+        self.doc_lengths = []
+        for doc_id, chunk in enumerate(chunks):
+            terms = Counter(tokenize(chunk))
+            self.doc_lengths.append(sum(terms.values()))
+            for term, freq in terms.items():
+                self.postings.setdefault(term, []).append((doc_id, freq))
+
+        count = len(chunks)
+        self.avg_length = (sum(self.doc_lengths) / count) if count else 0.0
+        self.idf = {
+            term: math.log(1 + (count - len(docs) + 0.5) / (len(docs) + 0.5))
+            for term, docs in self.postings.items()
+        }
+
+    def search(self, query, k=5):
+        """
+        Rank chunks against a query
+
+        Args:
+            query: Query text
+            k: Number of results to return
+
+        Returns:
+            List of (chunk index, score) pairs, best first. Only chunks sharing at
+            least one term with the query are returned
+        """
+        scores = {}
+        avg_length = self.avg_length or 1.0
+        for term in set(tokenize(query)):
+            idf = self.idf.get(term)
+            if idf is None:
+                continue
+            for doc_id, freq in self.postings[term]:
+                norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[doc_id] / avg_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * freq * (self.k1 + 1) / (freq + norm)
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        return ranked[:k]
+
+    def select(self, query, k=5, budget=None, cost=len):
+        """
+        Pick the most relevant chunks for a query, returned in document order
+
+        Chunks are taken best first while they fit in the budget. Falls back
+        to the leading chunks when nothing matches the query.
+
+        Args:
+            query: Query text
+            k: Maximum number of chunks (None for no limit)
+            budget: Optional cap on the total cost of the selected chunks
+            cost: Function giving a chunk's cost (default: its length in characters)
+
+        Returns:
+            List of chunk indices in document order
+        """
+        limit = len(self.chunks) if k is None else k
+        ranked = [doc_id for doc_id, _ in self.search(query, limit)]
+        if not ranked:
+            ranked = list(range(min(limit, len(self.chunks))))
+
+        selected = []
+        total = 0
+        for doc_id in ranked:
+            size = cost(self.chunks[doc_id])
+            if budget is not None and total + size > budget:
+                continue
+            selected.append(doc_id)
+            total += size
+        return sorted(selected)
@@ -4,17 +4,235 @@ Handles fetching and parsing website content
 """
 
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import lxml.etree
+import lxml.html
 from urllib.parse import urljoin, urlparse
 import re
 
+# bs4 and asyncio (via fetch_engine) are imported on first use: the lxml engine
+# never needs bs4, and only scrape_async/scrape_many need the event loop
+from charset import CharsetSniffer, decode_body, parser_encoding
+from metrics import NULL_METRICS
+
+# Elements removed before extracting text
+NON_CONTENT_TAGS = ["script", "style", "meta", "link", "noscript"]
+HEADING_TAGS = ['h1', 'h2', 'h3', 'h4', 'h5', 'h6']
+IGNORED_LINK_SCHEMES = ('javascript:', 'mailto:', 'tel:', 'data:')
+
+# Elements that start a new text block when streaming
+BLOCK_TAGS = frozenset(HEADING_TAGS + [
+    'title', 'p', 'div', 'section', 'article', 'main', 'header', 'footer', 'nav', 'aside',
+    'ul', 'ol', 'li', 'dl', 'dt', 'dd', 'table', 'tr', 'td', 'th', 'caption',
+    'blockquote', 'pre', 'figure', 'figcaption', 'form', 'br', 'hr', 'body'
+])
+SKIPPED_STREAM_TAGS = frozenset(['script', 'style', 'noscript'])
+STREAM_PARSER_RESET_BYTES = 4 * 1024 * 1024
+
+# Responses worth retrying: rate limiting and transient server errors
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Longest wait, in seconds, honored from a Retry-After header
+MAX_RETRY_AFTER = 10
+
+# Available extraction engines
+ENGINES = ('bs4', 'lxml')
+
+# A whitespace run that contains a line break or a double space collapses to
+# one space; this matches the bs4 engine's splitlines/split("  ") cleanup
+WHITESPACE_BREAK_RE = re.compile(r'\s*(?:[\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029]|  )\s*')
+
+
+class TextBlockCollector:
+    """
+    lxml parser target that turns HTML into text blocks without building a tree,
+    so memory use does not grow with the size of the page
+    """
+    
+    def __init__(self, normalize):
+        self.normalize = normalize
+        self.blocks = []
+        self._parts = []
+        self._skip_depth = 0
+        # Elements the parser has open, outermost first
+        self._open = []
+    
+    def start(self, tag, attrib):
+        self._open.append(tag)
+        if tag in SKIPPED_STREAM_TAGS:
+            self._skip_depth += 1
+        elif tag in BLOCK_TAGS:
+            self._flush()
+    
+    def end(self, tag):
+        if tag in self._open:
+            del self._open[len(self._open) - 1 - self._open[::-1].index(tag):]
+        if tag in SKIPPED_STREAM_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+        elif tag in BLOCK_TAGS:
+            self._flush()
+    
+    def data(self, data):
+        if not self._skip_depth:
+            self._parts.append(data)
+    
+    def comment(self, text):
+        pass
+    
+    @property
+    def skipping(self):
+        """True while inside a script/style/noscript element"""
+        return self._skip_depth > 0
+    
+    def close(self):
+        self._flush()
+
+    def suspend(self):
+        """
+        Detach the unfinished block and the open elements, so the parser can be
+        closed without ending the block
+
+        Returns:
+            State to hand to resume once a new parser has reopened the elements
+        """
+        state = (self._parts, list(self._open))
+        self._parts = []
+        return state
+
+    def resume(self, state):
+        """Reattach the unfinished block saved by suspend"""
+        self._parts = state[0] + self._parts
+    
+    def _flush(self):
+        if self._parts:
+            text = self.normalize(''.join(self._parts))
+            self._parts = []
+            if text:
+                self.blocks.append(text)
+    
+    def drain(self):
+        """Return and forget the blocks completed so far"""
+        blocks, self.blocks = self.blocks, []
+        return blocks
+
+
+class SectionCollector(TextBlockCollector):
+    """
+    TextBlockCollector that groups the blocks under the heading they follow
+
+    .sections is a list of dictionaries with 'heading' and 'blocks'; blocks
+    before the first heading go into a section with heading ''. The page
+    title is not part of any section.
+    """
+    
+    def __init__(self, normalize):
+        super().__init__(normalize)
+        self.sections = []
+        self._in_heading = False
+    
+    def start(self, tag, attrib):
+        if tag == 'title':
+            self._skip_depth += 1
+            return
+        super().start(tag, attrib)
+        if tag in HEADING_TAGS:
+            self._in_heading = True
+    
+    def end(self, tag):
+        if tag == 'title':
+            self._skip_depth = max(0, self._skip_depth - 1)
+            return
+        super().end(tag)
+        if tag in HEADING_TAGS:
+            self._in_heading = False
+    
+    def _flush(self):
+        super()._flush()
+        for text in self.drain():
+            if self._in_heading:
+                self.sections.append({'heading': text, 'blocks': []})
+            else:
+                if not self.sections:
+                    self.sections.append({'heading': '', 'blocks': []})
+                self.sections[-1]['blocks'].append(text)
+
+
+class CappedRetry(Retry):
+    """
+    urllib3 Retry that waits at most MAX_RETRY_AFTER seconds for a Retry-After
+    header, so a server can't park a fetch (e.g. with "Retry-After: 86400")
+    """
+    
+    def get_retry_after(self, response):
+        retry_after = super().get_retry_after(response)
+        if retry_after is None:
+            return None
+        return min(retry_after, MAX_RETRY_AFTER)
+
 
 class WebScraper:
-    def __init__(self):
+    def __init__(self, max_concurrency=50, per_host_limit=25, engine='bs4', cache=None,
+                 pool_connections=10, pool_maxsize=None, max_retries=3, backoff_factor=0.5, metrics=None):
+        """
+        Initialize the scraper
+
+        Args:
+            max_concurrency: Maximum concurrent requests for scrape_many/scrape_async
+            per_host_limit: Maximum concurrent requests against a single host
+            engine: HTML extraction engine, 'bs4' (BeautifulSoup, default) or
+                'lxml' (faster, works directly on lxml.html)
+            cache: Optional HTTPCache used by fetch_url
+            pool_connections: Number of hosts whose connection pools are kept alive
+            pool_maxsize: Connections kept alive per host (default: max_concurrency)
+            max_retries: Retries for connection errors and 429/5xx responses (0 to disable)
+            backoff_factor: Base delay for exponential backoff between retries, in
+                seconds; a Retry-After header from the server takes precedence,
+                up to MAX_RETRY_AFTER seconds
+            metrics: Optional Metrics collector for per-stage timings
+        """
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine: {engine}. Choose one of: {', '.join(ENGINES)}")
+        self.engine = engine
+        self.cache = cache
+        self.metrics = metrics or NULL_METRICS
+        # Counts how each page's encoding was found (BOM, header, <meta>, ...)
+        self.charset = CharsetSniffer()
+        
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         })
+        
+        # Size the connection pool so concurrent fetches can keep their connections alive,
+        # and retry transient failures with exponential backoff
+        retry = CappedRetry(
+            total=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset(['GET', 'HEAD']),
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize or max_concurrency,
+            max_retries=retry
+        )
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        
+        self.max_concurrency = max_concurrency
+        self.per_host_limit = per_host_limit
+        self._fetch_engine = None
+    
+    @property
+    def fetch_engine(self):
+        """AsyncFetchEngine behind scrape_async and scrape_many, created on first use"""
+        if self._fetch_engine is None:
+            from fetch_engine import AsyncFetchEngine
+            self._fetch_engine = AsyncFetchEngine(max_concurrency=self.max_concurrency, per_host_limit=self.per_host_limit)
+        return self._fetch_engine
     
     def is_valid_url(self, url):
         """Check if URL is valid"""
@@ -26,41 +244,264 @@ class WebScraper:
     
     def fetch_url(self, url, timeout=10):
         """Fetch content from a URL"""
+        body, encoding = self.fetch_bytes(url, timeout)
+        with self.metrics.stage('decode') as stage:
+            stage.bytes = len(body)
+            return decode_body(body, encoding)
+    
+    def fetch_bytes(self, url, timeout=10):
+        """
+        Fetch the raw body of a URL together with its encoding
+        
+        The body is not decoded: the extract_* methods take the bytes and the
+        encoding and let the parser decode them.
+        
+        Returns:
+            Tuple of (body bytes, encoding)
+        """
+        if not self.is_valid_url(url):
+            raise ValueError(f"Invalid URL: {url}")
+        
+        if self.cache is not None:
+            return self._fetch_cached(url, timeout)
+        
+        try:
+            with self.metrics.stage('fetch') as stage:
+                response = self.session.get(url, timeout=timeout)
+                response.raise_for_status()
+                stage.bytes = len(response.content)
+        except requests.exceptions.RequestException as e:
+            raise Exception(f"Error fetching URL: {str(e)}")
+        return response.content, self._sniff(response)
+    
+    def _sniff(self, response):
+        """Encoding of a response body, without requests' full-body detection"""
+        with self.metrics.stage('sniff') as stage:
+            stage.bytes = len(response.content)
+            return self.charset.sniff(response.content, response.headers.get('Content-Type'))
+    
+    def stream_text_blocks(self, url, max_bytes=None, chunk_size=64 * 1024, timeout=10):
+        """
+        Fetch a page in chunks and yield its text block by block
+        
+        The body is never held in memory as a whole: each chunk is fed to an
+        incremental lxml parser and finished blocks (paragraphs, headings,
+        list items, ...) are yielded straight away.
+        
+        Args:
+            url: URL to scrape
+            max_bytes: Stop reading after this many bytes of body (None for no limit)
+            chunk_size: Number of bytes read from the network at a time
+            timeout: Request timeout in seconds
+        
+        Yields:
+            Text blocks with whitespace normalized
+        """
         if not self.is_valid_url(url):
             raise ValueError(f"Invalid URL: {url}")
         
         try:
-            response = self.session.get(url, timeout=timeout)
+            response = self.session.get(url, timeout=timeout, stream=True)
             response.raise_for_status()
-            return response.text
         except requests.exceptions.RequestException as e:
             raise Exception(f"Error fetching URL: {str(e)}")
+        
+        content_type = response.headers.get('Content-Type')
+        encoding = None
+        
+        collector = TextBlockCollector(self._normalize_whitespace)
+        parser = None
+        parser_bytes = 0
+        received = 0
+        
+        with response:
+            try:
+                for chunk in response.iter_content(chunk_size=chunk_size):
+                    if max_bytes is not None and received + len(chunk) > max_bytes:
+                        chunk = chunk[:max_bytes - received]
+                    received += len(chunk)
+                    
+                    if parser is None:
+                        # Only the first chunk is looked at; the rest hasn't arrived yet
+                        encoding = self.charset.sniff(chunk, content_type, complete=False)
+                        parser = self._stream_parser(collector, encoding)
+                    
+                    # libxml2's push parser keeps everything it has been fed, so hand
+                    # over to a fresh parser at a tag boundary once enough has gone
+                    # through. Never inside <script>/<style>, whose text would leak.
+                    # The new parser reopens the elements that were open, and the
+                    # unfinished block carries over, so no block is split
+                    cut = chunk.rfind(b'>') + 1
+                    if parser_bytes >= STREAM_PARSER_RESET_BYTES and cut:
+                        parser.feed(chunk[:cut])
+                        parser_bytes += cut
+                        chunk = chunk[cut:]
+                        if not collector.skipping:
+                            state = collector.suspend()
+                            parser.close()
+                            parser = self._stream_parser(collector, encoding)
+                            parser.feed(''.join(f"<{tag}>" for tag in state[1]).encode('ascii', 'ignore'))
+                            collector.resume(state)
+                            parser_bytes = 0
+                    
+                    if chunk:
+                        parser.feed(chunk)
+                        parser_bytes += len(chunk)
+                    yield from collector.drain()
+                    if max_bytes is not None and received >= max_bytes:
+                        break
+            except requests.exceptions.RequestException as e:
+                raise Exception(f"Error fetching URL: {str(e)}")
+        
+        if parser is not None:
+            parser.close()
+        yield from collector.drain()
     
-    def extract_text(self, html_content):
-        """Extract clean text from HTML content"""
-        soup = BeautifulSoup(html_content, 'lxml')
+    def _fetch_cached(self, url, timeout):
+        """Fetch through the HTTP cache, revalidating stale entries"""
+        entry = self.cache.get(url)
+        if entry is not None and self.cache.is_fresh(entry):
+            self.cache.record_hit(url, entry)
+            return entry['body'], entry['encoding'] or self.charset.sniff(entry['body'])
         
-        # Remove script and style elements
-        for script in soup(["script", "style", "meta", "link", "noscript"]):
-            script.decompose()
+        headers = self.cache.conditional_headers(entry) if entry is not None else {}
+        try:
+            with self.metrics.stage('fetch') as stage:
+                response = self.session.get(url, timeout=timeout, headers=headers)
+                stage.bytes = len(response.content)
+            if entry is not None and response.status_code == 304:
+                self.cache.record_hit(url, entry, revalidated=True)
+                return entry['body'], entry['encoding'] or self.charset.sniff(entry['body'])
+            response.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            raise Exception(f"Error fetching URL: {str(e)}")
         
-        # Get text
-        text = soup.get_text()
+        encoding = self._sniff(response)
+        self.cache.store(url, response, encoding)
+        return response.content, encoding
+    
+    def _parser_input(self, html_content, encoding=None):
+        """
+        Markup and encoding to hand to the parser
+        
+        Bytes are passed through with their encoding (sniffed if not given), so
+        the parser decodes them itself; only an encoding libxml2 doesn't know
+        is decoded in Python first.
         
-        # Clean up whitespace
+        Returns:
+            Tuple of (markup, encoding for the parser or None)
+        """
+        if isinstance(html_content, str):
+            return html_content, None
+        encoding = encoding or self.charset.sniff(html_content)
+        name = parser_encoding(encoding)
+        if name is None:
+            return decode_body(html_content, encoding), None
+        return html_content, name
+    
+    def _stream_parser(self, collector, encoding):
+        """Incremental lxml parser feeding a TextBlockCollector"""
+        return lxml.etree.HTMLParser(target=collector, encoding=parser_encoding(encoding))
+    
+    def _parse_html(self, html_content, encoding=None):
+        """Parse HTML and drop elements that never carry readable text"""
+        with self.metrics.stage('parse') as stage:
+            stage.bytes = len(html_content)
+            from bs4 import BeautifulSoup
+            markup, encoding = self._parser_input(html_content, encoding)
+            soup = BeautifulSoup(markup, 'lxml', from_encoding=encoding)
+            
+            # Remove script and style elements
+            for script in soup(NON_CONTENT_TAGS):
+                script.decompose()
+        
+        return soup
+    
+    def _clean_text(self, text):
+        """Collapse the whitespace left behind by get_text()"""
         lines = (line.strip() for line in text.splitlines())
         chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-        text = ' '.join(chunk for chunk in chunks if chunk)
+        return ' '.join(chunk for chunk in chunks if chunk)
+    
+    def _parse_lxml(self, html_content, encoding=None):
+        """Parse HTML with lxml and drop elements that never carry readable text"""
+        with self.metrics.stage('parse') as stage:
+            stage.bytes = len(html_content)
+            if isinstance(html_content, str):
+                # lxml rejects str input that starts with an XML encoding
+                # declaration (XHTML); as UTF-8 bytes the declaration is overridden
+                html_content, encoding = html_content.encode('utf-8', 'replace'), 'utf-8'
+            markup, encoding = self._parser_input(html_content, encoding)
+            parser = lxml.html.HTMLParser(encoding=encoding) if encoding else None
+            try:
+                doc = lxml.html.document_fromstring(markup, parser=parser)
+            except lxml.etree.ParserError:
+                # Empty or whitespace-only document
+                return None
+            
+            # Removes the subtrees but keeps the text that follows them
+            lxml.etree.strip_elements(doc, *NON_CONTENT_TAGS, with_tail=False)
+        return doc
+    
+    def _normalize_whitespace(self, text):
+        """Single-pass equivalent of _clean_text"""
+        return WHITESPACE_BREAK_RE.sub(' ', text).strip()
+    
+    def extract_text(self, html_content, encoding=None):
+        """
+        Extract clean text from HTML content
         
-        return text
+        Args:
+            html_content: HTML as text, or as raw bytes
+            encoding: Encoding of raw bytes (sniffed from the bytes if None)
+        """
+        if self.engine == 'lxml':
+            doc = self._parse_lxml(html_content, encoding)
+            if doc is None:
+                return ''
+            with self.metrics.stage('cleanup'):
+                return self._normalize_whitespace(''.join(doc.itertext()))
+        
+        soup = self._parse_html(html_content, encoding)
+        with self.metrics.stage('cleanup'):
+            return self._clean_text(soup.get_text())
     
-    def extract_structured_content(self, html_content):
-        """Extract structured content (title, headings, paragraphs)"""
-        soup = BeautifulSoup(html_content, 'lxml')
+    def extract_text_blocks(self, html_content, encoding=None):
+        """
+        Extract text as a list of blocks (paragraphs, headings, list items, ...)
         
-        # Remove script and style elements
-        for script in soup(["script", "style", "meta", "link", "noscript"]):
-            script.decompose()
+        Uses the same lxml parser target as stream_text_blocks, whatever the engine.
+        """
+        markup, encoding = self._parser_input(html_content, encoding)
+        collector = TextBlockCollector(self._normalize_whitespace)
+        parser = lxml.etree.HTMLParser(target=collector, encoding=encoding)
+        parser.feed(markup)
+        parser.close()
+        return collector.drain()
+    
+    def extract_structured_content(self, html_content, base_url=None, encoding=None, sections=False):
+        """
+        Extract structured content (title, headings, paragraphs, links)
+        
+        The page is parsed once; the structured fields and the full text
+        are both read from the same tree.
+        
+        Args:
+            html_content: HTML to extract from, as text or raw bytes
+            base_url: If given, relative links are resolved against it
+            encoding: Encoding of raw bytes (sniffed from the bytes if None)
+            sections: Also add 'sections', every text block (paragraphs, list
+                items, table cells, ...) grouped under the heading it follows,
+                as dictionaries with 'heading' and 'blocks' (blocks before the
+                first heading get heading ''). This takes one more walk over the tree
+        
+        Returns:
+            Dictionary with 'structured' content and 'full_text'
+        """
+        if self.engine == 'lxml':
+            return self._extract_structured_lxml(html_content, base_url, encoding, sections)
+        
+        soup = self._parse_html(html_content, encoding)
         
         content = {
             'title': '',
@@ -69,48 +510,158 @@ class WebScraper:
             'links': []
         }
         
-        # Extract title
-        title_tag = soup.find('title')
-        if title_tag:
-            content['title'] = title_tag.get_text().strip()
+        # Collect every field in one walk over the tree, in document order
+        title_found = False
+        for tag in soup.find_all(['title', 'p', 'a'] + HEADING_TAGS):
+            if tag.name == 'title':
+                if not title_found:
+                    content['title'] = tag.get_text().strip()
+                    title_found = True
+            elif tag.name == 'p':
+                para_text = tag.get_text().strip()
+                if para_text and len(para_text) > 20:  # Filter out very short paragraphs
+                    content['paragraphs'].append(para_text)
+            elif tag.name == 'a':
+                link = self._resolve_link(tag.get('href'), base_url)
+                if link:
+                    content['links'].append(link)
+            else:
+                heading_text = tag.get_text().strip()
+                if heading_text:
+                    content['headings'].append(heading_text)
         
-        # Extract headings
-        for heading in soup.find_all(['h1', 'h2', 'h3', 'h4', 'h5', 'h6']):
-            heading_text = heading.get_text().strip()
-            if heading_text:
-                content['headings'].append(heading_text)
+        with self.metrics.stage('cleanup'):
+            full_text = self._clean_text(soup.get_text())
+            if sections:
+                content['sections'] = self._soup_sections(soup)
+        return {
+            'structured': content,
+            'full_text': full_text
+        }
+    
+    def _extract_structured_lxml(self, html_content, base_url=None, encoding=None, sections=False):
+        """lxml engine version of extract_structured_content"""
+        content = {
+            'title': '',
+            'headings': [],
+            'paragraphs': [],
+            'links': []
+        }
         
-        # Extract paragraphs
-        for para in soup.find_all('p'):
-            para_text = para.get_text().strip()
-            if para_text and len(para_text) > 20:  # Filter out very short paragraphs
-                content['paragraphs'].append(para_text)
+        doc = self._parse_lxml(html_content, encoding)
+        if doc is None:
+            if sections:
+                content['sections'] = []
+            return {'structured': content, 'full_text': ''}
         
-        # Extract main text content
-        main_text = self.extract_text(html_content)
+        title_found = False
+        for element in doc.iter('title', 'p', 'a', *HEADING_TAGS):
+            if element.tag == 'title':
+                if not title_found:
+                    content['title'] = element.text_content().strip()
+                    title_found = True
+            elif element.tag == 'p':
+                para_text = element.text_content().strip()
+                if para_text and len(para_text) > 20:  # Filter out very short paragraphs
+                    content['paragraphs'].append(para_text)
+            elif element.tag == 'a':
+                link = self._resolve_link(element.get('href'), base_url)
+                if link:
+                    content['links'].append(link)
+            else:
+                heading_text = element.text_content().strip()
+                if heading_text:
+                    content['headings'].append(heading_text)
         
+        with self.metrics.stage('cleanup'):
+            full_text = self._normalize_whitespace(''.join(doc.itertext()))
+            if sections:
+                content['sections'] = self._lxml_sections(doc)
         return {
             'structured': content,
-            'full_text': main_text
+            'full_text': full_text
         }
     
-    def scrape(self, url, structured=False):
+    def _soup_sections(self, soup):
+        """Group the text blocks of a parsed bs4 tree into sections (see SectionCollector)"""
+        from bs4 import NavigableString, Tag
+        
+        collector = SectionCollector(self._normalize_whitespace)
+        open_tags = []
+        for node in soup.descendants:
+            # Close the elements this node is not inside of
+            while open_tags and node.parent is not open_tags[-1]:
+                collector.end(open_tags.pop().name)
+            if isinstance(node, Tag):
+                collector.start(node.name, node.attrs)
+                open_tags.append(node)
+            elif type(node) is NavigableString:  # Not a comment, doctype or CDATA
+                collector.data(node)
+        while open_tags:
+            collector.end(open_tags.pop().name)
+        collector.close()
+        return collector.sections
+    
+    def _lxml_sections(self, doc):
+        """Group the text blocks of a parsed lxml tree into sections (see SectionCollector)"""
+        collector = SectionCollector(self._normalize_whitespace)
+        collector.start(doc.tag, doc.attrib)
+        if doc.text:
+            collector.data(doc.text)
+        # Walked by hand: iterwalk skips comments, and with them the text after them
+        elements = [doc]
+        children = [iter(doc)]
+        while children:
+            child = next(children[-1], None)
+            if child is None:
+                children.pop()
+                element = elements.pop()
+                collector.end(element.tag)
+                if children and element.tail:
+                    collector.data(element.tail)
+            elif isinstance(child.tag, str):
+                collector.start(child.tag, child.attrib)
+                if child.text:
+                    collector.data(child.text)
+                elements.append(child)
+                children.append(iter(child))
+            elif child.tail:  # Comment or processing instruction
+                collector.data(child.tail)
+        collector.close()
+        return collector.sections
+    
+    def _resolve_link(self, href, base_url=None):
+        """Return an href as a usable link, or None for in-page and script links"""
+        if not href:
+            return None
+        href = href.strip()
+        if not href or href.startswith('#') or href.lower().startswith(IGNORED_LINK_SCHEMES):
+            return None
+        return urljoin(base_url, href) if base_url else href
+    
+    def scrape(self, url, structured=False, sections=False):
         """
         Scrape a website and return its content
         
         Args:
             url: URL to scrape
             structured: If True, return structured content; if False, return plain text
+            sections: With structured, also return 'sections' (see extract_structured_content)
         
         Returns:
             Dictionary with scraped content
         """
-        html_content = self.fetch_url(url)
-        
+        # The raw bytes go straight to the parser; no str copy of the page is made
+        html_content, encoding = self.fetch_bytes(url)
+        return self._content(url, html_content, encoding, structured, sections)
+    
+    def _content(self, url, html_content, encoding, structured=False, sections=False):
+        """Extract the content scrape returns from a fetched page"""
         if structured:
-            content = self.extract_structured_content(html_content)
+            content = self.extract_structured_content(html_content, base_url=url, encoding=encoding,
+                                                      sections=sections)
         else:
-            text = self.extract_text(html_content)
+            text = self.extract_text(html_content, encoding)
             content = {
                 'url': url,
                 'text': text,
@@ -118,4 +669,57 @@ class WebScraper:
             }
         
         return content
-
+    
+    async def scrape_async(self, url, structured=False):
+        """
+        Scrape a website without blocking the event loop
+        
+        Args:
+            url: URL to scrape
+            structured: If True, return structured content; if False, return plain text
+        
+        Returns:
+            Dictionary with scraped content (same shape as scrape)
+        """
+        # Only the fetch holds a concurrency slot; the page is parsed after it is released
+        html_content, encoding = await self.fetch_engine.run(url, self.fetch_bytes, url)
+        return await self.fetch_engine.offload(self._content, url, html_content, encoding, structured)
+    
+    def scrape_many(self, urls, structured=False):
+        """
+        Scrape many websites concurrently, yielding results as they finish
+        
+        Args:
+            urls: Iterable of URLs to scrape
+            structured: If True, return structured content; if False, return plain text
+        
+        Yields:
+            Dictionaries with 'url', 'content' (as returned by scrape) and 'error'
+            (None on success, error message on failure), in completion order
+        """
+        import asyncio
+        
+        async def scrape_one(url):
+            try:
+                content = await self.scrape_async(url, structured=structured)
+                return {'url': url, 'content': content, 'error': None}
+            except Exception as e:
+                return {'url': url, 'content': None, 'error': str(e)}
+        
+        loop = asyncio.new_event_loop()
+        pending = set()
+        try:
+            pending = {loop.create_task(scrape_one(url)) for url in urls}
+            while pending:
+                done, pending = loop.run_until_complete(
+                    asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                )
+                for task in done:
+                    yield task.result()
+        finally:
+            # The consumer may stop early; don't leave tasks behind
+            for task in pending:
+                task.cancel()
+            if pending:
+                loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            loop.close()
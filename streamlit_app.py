@@ -5,8 +5,14 @@ Web interface for scraping websites and asking questions
 
 import streamlit as st
 import os
+import uuid
 from scraper import WebScraper
 from openai_qa import OpenAIQA
+from http_cache import HTTPCache
+from llm_cache import ResponseCache
+from page_store import PageStore
+from metrics import Metrics, PrometheusExporter
+from jobs import JobManager
 
 # Page configuration
 st.set_page_config(
@@ -47,24 +53,72 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # Initialize session state
-if 'scraped_content' not in st.session_state:
-    st.session_state.scraped_content = None
+# The scraped page: only a handle; its text lives in the shared page store
+if 'scraped_page' not in st.session_state:
+    st.session_state.scraped_page = None
+# Scrapes from every session share the store's size limit, so this page may have been evicted
+if st.session_state.scraped_page is not None and not st.session_state.scraped_page.available:
+    st.session_state.scraped_page = None
+    st.session_state.scraped_url = None
 if 'scraped_url' not in st.session_state:
     st.session_state.scraped_url = None
 if 'qa_initialized' not in st.session_state:
     st.session_state.qa_initialized = False
+# Identifies this browser session's jobs in the shared job manager
+if 'session_id' not in st.session_state:
+    st.session_state.session_id = uuid.uuid4().hex
 
 def initialize_qa():
-    """Initialize OpenAI QA client"""
+    """Get the shared OpenAI QA client for the configured API key"""
     api_key = st.session_state.get('api_key') or os.getenv('OPENAI_API_KEY')
     if api_key:
         try:
-            return OpenAIQA(api_key=api_key)
+            return get_qa(api_key, st.session_state.get('use_llm_cache', True))
         except Exception as e:
             st.error(f"Error initializing OpenAI: {str(e)}")
             return None
     return None
 
+@st.cache_resource
+def get_qa(api_key, use_llm_cache):
+    """OpenAI QA client shared across reruns and sessions, so its connections stay alive"""
+    cache = get_response_cache() if use_llm_cache else None
+    return OpenAIQA(api_key=api_key, cache=cache, metrics=get_metrics())
+
+@st.cache_resource
+def get_scraper(use_cache):
+    """Scraper shared across reruns and sessions, so its connection pool stays alive"""
+    return WebScraper(cache=get_http_cache() if use_cache else None, metrics=get_metrics())
+
+@st.cache_resource
+def get_response_cache():
+    """Shared cache of OpenAI replies, kept in memory and on disk"""
+    return ResponseCache(directory='.cache/llm')
+
+@st.cache_resource
+def get_http_cache():
+    """Shared on-disk HTTP cache, reused across reruns and sessions"""
+    return HTTPCache()
+
+@st.cache_resource
+def get_page_store():
+    """Shared compressed store of scraped page text; least recently used pages are evicted past its size limit"""
+    return PageStore()
+
+@st.cache_resource
+def get_job_manager():
+    """Background job pool shared by every session, so the limits are the same for all of them"""
+    return JobManager(max_workers=4, max_pending_per_owner=10)
+
+@st.cache_resource
+def get_metrics():
+    """Shared stage timings; only collected while enabled in the sidebar"""
+    return Metrics(enabled=False)
+
+def toggle_metrics():
+    """Switch stage metrics on or off for every session"""
+    get_metrics().enabled = st.session_state.collect_metrics
+
 # Header
 st.markdown('<h1 class="main-header">🌐 Web Scraper with AI Q&A</h1>', unsafe_allow_html=True)
 st.markdown('<p class="sub-header">Scrape websites and ask questions using AI</p>', unsafe_allow_html=True)
@@ -99,6 +153,61 @@ with st.sidebar:
         help="Select the OpenAI model to use"
     )
     
+    # How much of the page goes with each question
+    max_context_tokens = st.number_input(
+        "🧩 Page tokens per question",
+        min_value=0,
+        value=3000,
+        step=500,
+        help="Most page tokens sent with each question; 0 fills the model's context window"
+    )
+    top_k = st.number_input(
+        "🔎 Chunks per question",
+        min_value=0,
+        value=5,
+        help="Most relevant chunks of a long page sent with each question; 0 sends as many as fit"
+    )
+    context_options = {'max_context_tokens': int(max_context_tokens) or None, 'top_k': int(top_k) or None}
+    
+    # HTTP cache
+    use_cache = st.checkbox(
+        "💾 Cache pages on disk",
+        value=False,
+        help="Reuse previously downloaded pages, revalidating them with the server"
+    )
+    if use_cache:
+        cache_stats = get_http_cache().stats
+        st.caption(
+            f"Cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses, "
+            f"{cache_stats['bytes_saved'] / 1024:.0f} KB saved"
+        )
+    
+    # Response cache
+    use_llm_cache = st.checkbox(
+        "🧠 Reuse identical AI answers",
+        value=True,
+        key='use_llm_cache',
+        help="Answer repeated questions about the same content from a cache instead of calling OpenAI again"
+    )
+    if use_llm_cache:
+        llm_stats = get_response_cache().stats
+        st.caption(
+            f"Responses: {llm_stats['hits']} hits, {llm_stats['misses']} misses, "
+            f"{llm_stats['tokens_saved']} tokens saved"
+        )
+    
+    # Stage metrics. The scraper and OpenAI client are shared by every session,
+    # and so is their Metrics object: the toggle is global, shows the current
+    # state and only changes it when clicked
+    st.session_state.collect_metrics = get_metrics().enabled
+    st.checkbox(
+        "📈 Collect stage metrics (all sessions)",
+        key='collect_metrics',
+        on_change=toggle_metrics,
+        help="Time fetching, parsing, prompt building and OpenAI calls for everyone using the app; "
+             "see the Metrics tab"
+    )
+    
     st.divider()
     
     # Instructions
@@ -108,18 +217,20 @@ with st.sidebar:
     2. Click "Scrape Website"
     3. Ask questions about the content
     4. Or generate a summary
+    
+    To process several pages at once, queue them in the **Queue** tab.
     """)
     
     st.divider()
     
     # Clear button
     if st.button("🗑️ Clear All Data"):
-        st.session_state.scraped_content = None
+        st.session_state.scraped_page = None
         st.session_state.scraped_url = None
         st.rerun()
 
 # Main content area
-tab1, tab2, tab3 = st.tabs(["🔍 Scrape & Ask", "📋 Summary", "📊 About"])
+tab1, queue_tab, tab2, tab3, tab4 = st.tabs(["🔍 Scrape & Ask", "📥 Queue", "📋 Summary", "📊 About", "📈 Metrics"])
 
 with tab1:
     # URL input
@@ -139,24 +250,24 @@ with tab1:
         else:
             with st.spinner("Scraping website..."):
                 try:
-                    scraper = WebScraper()
+                    scraper = get_scraper(use_cache)
                     content = scraper.scrape(url)
-                    st.session_state.scraped_content = content['text']
+                    st.session_state.scraped_page = get_page_store().put(url, content['text'])
                     st.session_state.scraped_url = url
                     st.success(f"✅ Successfully scraped {len(content['text'])} characters from {url}")
                 except Exception as e:
                     st.error(f"❌ Error scraping website: {str(e)}")
     
     # Display scraped content if available
-    if st.session_state.scraped_content:
+    if st.session_state.scraped_page:
         st.divider()
         st.subheader(f"📄 Content from: {st.session_state.scraped_url}")
         
         # Content preview
         with st.expander("📖 View Scraped Content", expanded=False):
-            content_preview = st.session_state.scraped_content[:2000] + "..." if len(st.session_state.scraped_content) > 2000 else st.session_state.scraped_content
+            content_preview = st.session_state.scraped_page.preview(2000)
             st.text_area("Content", content_preview, height=200, disabled=True, label_visibility="collapsed")
-            st.caption(f"Total characters: {len(st.session_state.scraped_content)}")
+            st.caption(f"Total characters: {len(st.session_state.scraped_page)}")
         
         st.divider()
         
@@ -183,16 +294,27 @@ with tab1:
                     try:
                         qa = initialize_qa()
                         if qa:
-                            result = qa.answer_question(
-                                st.session_state.scraped_content,
+                            stream = qa.stream_answer(
+                                st.session_state.scraped_page.text,
                                 question,
-                                model=model
+                                model=model,
+                                **context_options
                             )
                             
-                            st.success("✅ Answer Generated")
                             st.markdown("### 💡 Answer:")
-                            st.markdown(result['answer'])
-                            st.caption(f"📊 Tokens used: {result['tokens_used']}")
+                            answer_placeholder = st.empty()
+                            answer_text = ""
+                            for text in stream:
+                                answer_text += text
+                                answer_placeholder.markdown(answer_text + "▌")
+                            result = stream.result
+                            answer_placeholder.markdown(result['answer'])
+                            
+                            st.success("✅ Answer Generated")
+                            caption = f"📊 Tokens used: {result['tokens_used']}"
+                            if result['time_to_first_token'] is not None:
+                                caption += f" | ⏱️ First token after {result['time_to_first_token']:.2f}s"
+                            st.caption(caption)
                     except Exception as e:
                         st.error(f"❌ Error: {str(e)}")
             
@@ -204,17 +326,108 @@ with tab1:
                     try:
                         qa = initialize_qa()
                         if qa:
-                            summary = qa.summarize_content(st.session_state.scraped_content)
+                            summary = qa.summarize_content(st.session_state.scraped_page.text)
                             st.success("✅ Summary Generated")
                             st.markdown("### 📋 Summary:")
                             st.markdown(summary)
                     except Exception as e:
                         st.error(f"❌ Error: {str(e)}")
 
+JOB_ICONS = {'queued': '⏳', 'running': '🔄', 'done': '✅', 'failed': '❌', 'cancelled': '🚫'}
+
+# Reruns on its own every 2 seconds, so progress is live without rerunning the whole page
+@st.fragment(run_every=2)
+def show_jobs():
+    """This session's background jobs with their progress and results"""
+    manager = get_job_manager()
+    jobs = manager.jobs(st.session_state.session_id)
+    if not jobs:
+        st.info("No jobs yet. Queue some URLs above")
+        return
+    
+    for job in jobs:
+        with st.expander(f"{JOB_ICONS[job.status]} {job.url} — {job.stage}", expanded=job.active):
+            st.progress(job.progress, text=f"{job.steps_done} of {job.steps_total} steps")
+            if job.error:
+                st.error(f"❌ {job.error}")
+            for answer in job.answers:
+                st.markdown(f"**❓ {answer['question']}**")
+                if answer['error']:
+                    st.error(answer['error'])
+                else:
+                    st.markdown(answer['answer'])
+            if job.summary:
+                st.markdown("**📋 Summary**")
+                st.markdown(job.summary)
+            if job.tokens_used:
+                st.caption(f"📊 Tokens used: {job.tokens_used}")
+            
+            col1, col2 = st.columns([1, 1])
+            with col1:
+                if job.active and st.button("🚫 Cancel", key=f"cancel_job_{job.id}", use_container_width=True):
+                    manager.cancel(st.session_state.session_id, job.id)
+                    st.rerun()
+            with col2:
+                if job.page is not None and st.button("🔍 Open in Scrape & Ask", key=f"open_job_{job.id}",
+                                                      use_container_width=True):
+                    st.session_state.scraped_page = job.page
+                    st.session_state.scraped_url = job.url
+                    st.rerun()
+    
+    if any(not job.active for job in jobs) and st.button("🧹 Clear Finished Jobs"):
+        manager.clear_finished(st.session_state.session_id)
+        st.rerun()
+
+with queue_tab:
+    st.subheader("📥 Background Queue")
+    st.caption(
+        "Queue several pages, with questions for each of them. Jobs run in the background, "
+        "so you can keep using the rest of the app while they finish."
+    )
+    
+    with st.form("queue_form", clear_on_submit=True):
+        queue_urls = st.text_area("URLs (one per line)", placeholder="https://example.com\nhttps://example.org")
+        queue_questions = st.text_area(
+            "Questions for every URL (one per line, optional)",
+            placeholder="What is this website about?"
+        )
+        queue_summarize = st.checkbox("📋 Summarize each page")
+        queue_button = st.form_submit_button("📥 Queue Jobs", type="primary", use_container_width=True)
+    
+    if queue_button:
+        urls = [line.strip() for line in queue_urls.splitlines() if line.strip()]
+        questions = [line.strip() for line in queue_questions.splitlines() if line.strip()]
+        needs_qa = bool(questions or queue_summarize)
+        qa = initialize_qa() if needs_qa else None
+        if not urls:
+            st.error("Please enter at least one URL")
+        elif needs_qa and qa is None:
+            st.warning("⚠️ Please configure your OpenAI API key in the sidebar to ask questions")
+        else:
+            queued = 0
+            for queue_url in urls:
+                try:
+                    get_job_manager().submit(
+                        st.session_state.session_id, queue_url, get_scraper(use_cache), qa,
+                        questions=questions, summarize=queue_summarize, model=model,
+                        store=get_page_store(),
+                        answer_options=context_options
+                    )
+                    queued += 1
+                except ValueError as e:
+                    st.warning(f"⚠️ {e}. {len(urls) - queued} URLs were not queued")
+                    break
+            if queued:
+                st.success(f"✅ Queued {queued} jobs")
+    
+    st.divider()
+    st.subheader("📊 Jobs")
+    show_jobs()
+
 with tab2:
     st.subheader("📋 Content Summary")
     
-    if not st.session_state.scraped_content:
+    if not st.session_state.scraped_page:
         st.info("👆 Please scrape a website first using the 'Scrape & Ask' tab")
     elif not st.session_state.qa_initialized:
         st.warning("⚠️ Please configure your OpenAI API key in the sidebar")
@@ -224,13 +437,13 @@ with tab2:
                 try:
                     qa = initialize_qa()
                     if qa:
-                        summary = qa.summarize_content(st.session_state.scraped_content)
+                        summary = qa.summarize_content(st.session_state.scraped_page.text)
                         st.markdown("### 📋 Summary:")
                         st.markdown(summary)
                         
                         st.divider()
                         st.markdown(f"**Source URL:** {st.session_state.scraped_url}")
-                        st.caption(f"**Content Length:** {len(st.session_state.scraped_content)} characters")
+                        st.caption(f"**Content Length:** {len(st.session_state.scraped_page)} characters")
                 except Exception as e:
                     st.error(f"❌ Error: {str(e)}")
         else:
@@ -252,6 +465,7 @@ with tab3:
     - ✅ Clean text extraction from any website
     - ✅ AI-powered question answering
     - ✅ Content summarization
+    - ✅ Background queue for many pages at once
     - ✅ User-friendly web interface
     - ✅ Multiple OpenAI model support
     
@@ -294,6 +508,39 @@ with tab3:
     For Streamlit Cloud deployment, set the `OPENAI_API_KEY` environment variable.
     """)
 
+with tab4:
+    st.subheader("📈 Stage Metrics")
+    
+    metrics = get_metrics()
+    snapshot = metrics.snapshot()
+    if not metrics.enabled and not snapshot:
+        st.info("Enable \"Collect stage metrics\" in the sidebar, then scrape a page or ask a question")
+    elif not snapshot:
+        st.info("No stages recorded yet. Scrape a page or ask a question")
+    else:
+        st.dataframe(
+            [
+                {
+                    'Stage': name,
+                    'Runs': stats['count'],
+                    'Errors': stats['errors'],
+                    'Total (ms)': round(stats['seconds'] * 1000, 1),
+                    'Average (ms)': round(stats['seconds'] / stats['count'] * 1000, 2),
+                    'Max (ms)': round(stats['max_seconds'] * 1000, 2),
+                    'Bytes': stats['bytes'],
+                    'Tokens': stats['tokens']
+                }
+                for name, stats in sorted(snapshot.items())
+            ],
+            use_container_width=True,
+            hide_index=True
+        )
+        with st.expander("Prometheus format"):
+            st.code(PrometheusExporter().export(metrics), language="text")
+        if st.button("🔄 Reset Metrics"):
+            metrics.reset()
+            st.rerun()
+
 # Footer
 st.divider()
 st.markdown(
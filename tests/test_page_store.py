@@ -0,0 +1,91 @@
+import os
+import random
+
+import pytest
+
+from page_store import PageStore
+
+
+def random_text(rng, words=3000):
+    # Random words barely compress, so every page takes real space in the pack
+    return ' '.join(''.join(rng.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(rng.randint(3, 9)))
+                    for _ in range(words))
+
+
+def pack_size(store):
+    return os.path.getsize(store._pack_path)
+
+
+def test_pack_file_stays_within_max_bytes(tmp_path):
+    rng = random.Random(0)
+    max_bytes = 200 * 1024
+    store = PageStore(str(tmp_path), codec='zlib', max_bytes=max_bytes)
+
+    for i in range(100):
+        store.put(f"https://example.com/{i}", random_text(rng))
+        assert pack_size(store) <= max_bytes
+
+    assert store.stats['evictions'] > 0
+    assert store.stats['compactions'] > 0
+    # Only the current pack file is left behind
+    assert [name for name in os.listdir(tmp_path) if name.endswith('.pack')] == [os.path.basename(store._pack_path)]
+    store.close()
+
+
+def test_least_recently_used_pages_are_evicted(tmp_path):
+    rng = random.Random(1)
+    texts = [random_text(rng) for _ in range(12)]
+    sample = PageStore(str(tmp_path / 'sample'), codec='zlib', max_bytes=None).put('x', texts[0])
+    # Room for about five pages
+    store = PageStore(str(tmp_path / 'store'), codec='zlib', max_bytes=int(5.5 * pack_size(sample.store)))
+
+    first = store.put('https://example.com/0', texts[0])
+    for i in range(1, 12):
+        store.put(f"https://example.com/{i}", texts[i])
+        # Keep reading the first page so it stays recently used
+        assert first.text == texts[0]
+
+    assert first.available
+    assert store.get('https://example.com/1') is None
+    assert store.get('https://example.com/11').text == texts[11]
+    store.close()
+
+
+def test_evicted_handle_raises_key_error(tmp_path):
+    rng = random.Random(2)
+    store = PageStore(str(tmp_path), codec='zlib', max_bytes=50 * 1024)
+    old = store.put('https://example.com/old', random_text(rng))
+    for i in range(10):
+        store.put(f"https://example.com/{i}", random_text(rng))
+
+    assert not old.available
+    with pytest.raises(KeyError):
+        old.text
+    store.close()
+
+
+def test_eviction_survives_reopen(tmp_path):
+    rng = random.Random(3)
+    store = PageStore(str(tmp_path), codec='zlib', max_bytes=100 * 1024)
+    for i in range(20):
+        store.put(f"https://example.com/{i}", random_text(rng))
+    kept = {url: store.get(url).text for url in store.urls()}
+    store.close()
+
+    reopened = PageStore(str(tmp_path), codec='zlib', max_bytes=100 * 1024)
+    assert {url: reopened.get(url).text for url in reopened.urls()} == kept
+    reopened.close()
+
+
+def test_delete(tmp_path):
+    store = PageStore(str(tmp_path), codec='zlib')
+    handle = store.put('https://example.com/a', 'Some text')
+    store.put('https://example.com/b', 'Some text')
+
+    assert store.delete('https://example.com/a')
+    assert not store.delete('https://example.com/a')
+    # The text is still shared with /b
+    assert handle.available
+    assert store.delete('https://example.com/b')
+    assert not handle.available
+    store.close()
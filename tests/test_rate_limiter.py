@@ -0,0 +1,41 @@
+import pytest
+
+from rate_limiter import RateLimiter
+
+
+class FakeAPIError(Exception):
+    """Stands in for an OpenAI SDK error: status_code plus the parsed error body"""
+
+    def __init__(self, status_code, code):
+        super().__init__(code)
+        self.status_code = status_code
+        self.body = {'code': code, 'type': code}
+
+
+def failing(error, calls):
+    def func():
+        calls.append(1)
+        raise error
+    return func
+
+
+def test_insufficient_quota_is_not_retried():
+    limiter = RateLimiter(max_retries=3, base_delay=0.01)
+    calls = []
+
+    with pytest.raises(FakeAPIError):
+        limiter.call(failing(FakeAPIError(429, 'insufficient_quota'), calls), tokens=100)
+
+    assert len(calls) == 1
+    assert limiter.stats['retries'] == 0
+
+
+def test_rate_limit_is_retried():
+    limiter = RateLimiter(max_retries=2, base_delay=0.01)
+    calls = []
+
+    with pytest.raises(FakeAPIError):
+        limiter.call(failing(FakeAPIError(429, 'rate_limit_exceeded'), calls), tokens=100)
+
+    assert len(calls) == 3
+    assert limiter.stats['retries'] == 2
@@ -0,0 +1,53 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import scraper
+from scraper import WebScraper
+
+
+class SlowDownHandler(BaseHTTPRequestHandler):
+    """Answers the first request with 503 and a day-long Retry-After, then with a page"""
+
+    requests = 0
+
+    def do_GET(self):
+        type(self).requests += 1
+        if type(self).requests == 1:
+            self.send_response(503)
+            self.send_header('Retry-After', '86400')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        body = b'<html><body><p>Back again</p></body></html>'
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    SlowDownHandler.requests = 0
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), SlowDownHandler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_port}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_retry_after_is_capped(server, monkeypatch):
+    monkeypatch.setattr(scraper, 'MAX_RETRY_AFTER', 0.2)
+
+    start = time.perf_counter()
+    content = WebScraper(max_retries=1).scrape(f"{server}/page")
+
+    assert content['text'] == 'Back again'
+    assert SlowDownHandler.requests == 2
+    assert time.perf_counter() - start < 5
@@ -0,0 +1,43 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+
+import scraper
+from fixtures import make_page
+from scraper import WebScraper
+from server import LocalServer
+
+# Blocks with inline markup, text after block elements, tables, a script and a
+# comment, so parser resets land inside unfinished blocks and nested elements
+MIXED_BODY = ''.join(
+    f"<div>lead {i} <b>bold</b> more<p>paragraph {i} <i>italic</i> tail</p>after {i}"
+    f"<ul><li>one</li><li>two <a href='/x'>link</a></li></ul>loose {i}</div>"
+    f"<table><tr><td>cell {i}</td><td>a<br>b</td></tr></table>text {i}"
+    f"<script>var s = '<p>';</script> end <!-- note --> last {i}\n"
+    for i in range(200)
+)
+PAGES = {
+    '/mixed': f"<!DOCTYPE html><html><head><title>Mixed</title></head><body>{MIXED_BODY}</body></html>",
+    '/fixture': make_page(200, seed=5),
+}
+
+
+@pytest.fixture(scope='module')
+def server():
+    with LocalServer(PAGES) as server:
+        yield server
+
+
+@pytest.mark.parametrize('path', sorted(PAGES))
+@pytest.mark.parametrize('reset_bytes', [256, 4096])
+@pytest.mark.parametrize('chunk_size', [97, 1024])
+def test_streaming_matches_whole_page_across_parser_resets(server, monkeypatch, path, reset_bytes, chunk_size):
+    monkeypatch.setattr(scraper, 'STREAM_PARSER_RESET_BYTES', reset_bytes)
+    web_scraper = WebScraper()
+
+    streamed = list(web_scraper.stream_text_blocks(f"{server.url}{path}", chunk_size=chunk_size))
+
+    assert streamed == web_scraper.extract_text_blocks(PAGES[path].encode('utf-8'))
@@ -0,0 +1,60 @@
+import os
+import random
+
+import numpy as np
+
+from vector_index import VectorIndex
+
+
+def random_text(rng, words=400):
+    vocabulary = [''.join(rng.choice('abcdefghij') for _ in range(4)) for _ in range(300)]
+    return ' '.join(rng.choice(vocabulary) for _ in range(words))
+
+
+def vector_files(directory):
+    return [name for name in os.listdir(directory) if name.endswith('.f32')]
+
+
+def test_document_frequencies_match_a_fresh_index_after_updates(tmp_path):
+    # Few dimensions make signed collisions that cancel to zero common
+    rng = random.Random(0)
+    index = VectorIndex(str(tmp_path / 'updated'), dimensions=16, chunk_size=200)
+    pages = {}
+    for _ in range(60):
+        url = f"https://example.com/{rng.randrange(5)}"
+        pages[url] = random_text(rng)
+        index.add_document(url, pages[url])
+        assert (index._df >= 0).all()
+
+    fresh = VectorIndex(str(tmp_path / 'fresh'), dimensions=16, chunk_size=200)
+    for url, text in pages.items():
+        fresh.add_document(url, text)
+    assert np.array_equal(index._df, fresh._df)
+    assert len(index) == len(fresh)
+    index.close()
+    fresh.close()
+
+
+def test_replaced_rows_are_compacted(tmp_path):
+    rng = random.Random(1)
+    index = VectorIndex(str(tmp_path), chunk_size=300)
+    pages = {}
+    written = 0
+    for _ in range(40):
+        url = f"https://example.com/{rng.randrange(4)}"
+        pages[url] = random_text(rng)
+        written += index.add_document(url, pages[url])
+        assert index.rows - len(index) <= 0.25 * index.rows
+
+    # Dead rows were dropped, and only the current vectors file is left
+    assert index.rows < written
+    assert vector_files(tmp_path) == [os.path.basename(index._vectors_path)]
+    query = pages["https://example.com/0"][:200]
+    results = index.search(query, k=3)
+    assert results[0]['url'] == "https://example.com/0"
+    index.close()
+
+    reopened = VectorIndex(str(tmp_path))
+    assert reopened.search(query, k=3) == results
+    assert reopened.rows == index.rows
+    reopened.close()
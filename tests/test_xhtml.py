@@ -0,0 +1,28 @@
+import pytest
+
+from scraper import ENGINES, WebScraper
+
+XHTML = '''<?xml version="1.0" encoding="utf-8"?>
+<!DOCTYPE html PUBLIC "-//W3C//DTD XHTML 1.0 Strict//EN" "http://www.w3.org/TR/xhtml1/DTD/xhtml1-strict.dtd">
+<html xmlns="http://www.w3.org/1999/xhtml" xml:lang="fr">
+<head><title>Café du coin</title></head>
+<body>
+<h1>Menü</h1>
+<p>Crème brûlée maison et café – 5 €</p>
+<p><a href="/carte">La carte</a></p>
+</body>
+</html>'''
+
+
+@pytest.mark.parametrize('engine', ENGINES)
+@pytest.mark.parametrize('markup', [XHTML, XHTML.encode('utf-8')], ids=['str', 'bytes'])
+def test_xhtml_with_encoding_declaration(engine, markup):
+    web_scraper = WebScraper(engine=engine)
+
+    assert web_scraper.extract_text(markup) == 'Café du coin Menü Crème brûlée maison et café – 5 € La carte'
+
+    content = web_scraper.extract_structured_content(markup, base_url='https://example.com/')
+    assert content['structured']['title'] == 'Café du coin'
+    assert content['structured']['headings'] == ['Menü']
+    assert content['structured']['paragraphs'] == ['Crème brûlée maison et café – 5 €']
+    assert content['structured']['links'] == ['https://example.com/carte']
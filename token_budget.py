@@ -0,0 +1,170 @@
+"""
+Token Budget Module
+Counts tokens and works out how much content fits in a model's context window
+"""
+
+import math
+import threading
+
+try:
+    import tiktoken
+except ImportError:  # Optional: fall back to the approximate counter
+    tiktoken = None
+
+# Context window sizes in tokens (prompt + completion). Longest matching prefix wins
+MODEL_CONTEXT_WINDOWS = {
+    'gpt-3.5-turbo-instruct': 4096,
+    'gpt-3.5-turbo': 16385,
+    'gpt-4-32k': 32768,
+    'gpt-4-turbo': 128000,
+    'gpt-4-1106': 128000,
+    'gpt-4-0125': 128000,
+    'gpt-4o': 128000,
+    'gpt-4.1': 1047576,
+    'gpt-4': 8192,
+}
+DEFAULT_CONTEXT_WINDOW = 4096
+
+# Most tokens a model will generate in one reply, whatever the context window
+# leaves free. Longest matching prefix wins; models not listed can fill the window
+MODEL_OUTPUT_LIMITS = {
+    'gpt-3.5-turbo': 4096,
+    'gpt-4-turbo': 4096,
+    'gpt-4-1106': 4096,
+    'gpt-4-0125': 4096,
+    'gpt-4o': 16384,
+    'gpt-4.1': 32768,
+}
+
+# Formatting tokens the chat format adds around each message and the reply
+TOKENS_PER_MESSAGE = 4
+TOKENS_PER_REPLY = 3
+
+# Head-room for counting differences between local and server-side tokenization
+SAFETY_MARGIN = 64
+
+_encodings = {}
+_encodings_lock = threading.Lock()
+
+
+def context_window(model):
+    """Return the context window of a model in tokens"""
+    for prefix in sorted(MODEL_CONTEXT_WINDOWS, key=len, reverse=True):
+        if model.startswith(prefix):
+            return MODEL_CONTEXT_WINDOWS[prefix]
+    return DEFAULT_CONTEXT_WINDOW
+
+
+def output_limit(model):
+    """Return the largest reply (max_tokens) a model accepts"""
+    for prefix in sorted(MODEL_OUTPUT_LIMITS, key=len, reverse=True):
+        if model.startswith(prefix):
+            return MODEL_OUTPUT_LIMITS[prefix]
+    return context_window(model)
+
+
+def _encoding_for(model):
+    """Load (once) the tiktoken encoding for a model, or None if unavailable"""
+    if tiktoken is None:
+        return None
+    with _encodings_lock:
+        if model not in _encodings:
+            try:
+                try:
+                    encoding = tiktoken.encoding_for_model(model)
+                except KeyError:
+                    encoding = tiktoken.get_encoding('cl100k_base')
+            except Exception:
+                # Encoding files can't be loaded (e.g. offline); use the estimate
+                encoding = None
+            _encodings[model] = encoding
+        return _encodings[model]
+
+
+def approximate_tokens(text):
+    """
+    Fast, slightly pessimistic token estimate
+
+    About four ASCII characters per token; every extra UTF-8 byte adds half a
+    token, so accented text counts ~0.75 and CJK text ~1.25 tokens per character.
+    """
+    byte_length = len(text.encode('utf-8', errors='replace'))
+    return math.ceil(len(text) / 4 + (byte_length - len(text)) / 2)
+
+
+class TokenBudgeter:
+    def __init__(self, model="gpt-3.5-turbo", approximate=False):
+        """
+        Initialize the budgeter
+
+        Args:
+            model: OpenAI model the budget is for
+            approximate: Always use the fast estimate instead of the tokenizer.
+                Also used automatically when tiktoken isn't available
+        """
+        self.model = model
+        self.context_window = context_window(model)
+        self.output_limit = output_limit(model)
+        self._encoding = None if approximate else _encoding_for(model)
+
+    @property
+    def approximate(self):
+        return self._encoding is None
+
+    def count(self, text):
+        """Count the tokens in a piece of text"""
+        if self._encoding is None:
+            return approximate_tokens(text)
+        return len(self._encoding.encode(text, disallowed_special=()))
+
+    def count_messages(self, messages):
+        """Count the prompt tokens for a list of chat messages"""
+        return TOKENS_PER_REPLY + sum(
+            TOKENS_PER_MESSAGE + self.count(message['content']) for message in messages
+        )
+
+    def available(self, prompt_tokens, max_tokens):
+        """
+        Tokens left for content after the prompt and the reply are reserved
+
+        Args:
+            prompt_tokens: Tokens used by the prompt without the content
+            max_tokens: Tokens reserved for the reply
+
+        Returns:
+            Number of content tokens that fit (never negative)
+        """
+        return max(0, self.context_window - prompt_tokens - max_tokens - SAFETY_MARGIN)
+
+    def truncate(self, text, max_tokens):
+        """
+        Cut text down to at most max_tokens tokens
+
+        Args:
+            text: Text to cut
+            max_tokens: Token limit
+
+        Returns:
+            The longest prefix of text within the limit
+        """
+        if max_tokens <= 0:
+            return ''
+        if self._encoding is not None:
+            tokens = self._encoding.encode(text, disallowed_special=())
+            if len(tokens) <= max_tokens:
+                return text
+            return self._encoding.decode(tokens[:max_tokens])
+
+        total = self.count(text)
+        if total <= max_tokens:
+            return text
+        # Scale by the text's own characters-per-token ratio, then make sure it fits
+        end = int(len(text) * max_tokens / total)
+        while end > 0 and self.count(text[:end]) > max_tokens:
+            end = int(end * 0.95)
+        return text[:end]
+
+    def chars_per_token(self, text):
+        """Average characters per token in a text (used to size character chunks)"""
+        tokens = self.count(text)
+        return len(text) / tokens if tokens else 4.0
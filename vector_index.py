@@ -0,0 +1,329 @@
+"""
+Vector Index Module
+Persistent multi-page retrieval index: chunks are embedded with a local hashing
+vectorizer into a memory-mapped NumPy matrix and searched by cosine similarity.
+Rows of replaced pages are blanked, and the matrix is compacted once enough of
+it is blank.
+"""
+
+import hashlib
+import math
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import Counter
+
+import numpy as np
+
+from retrieval import chunk_text, tokenize
+
+DEFAULT_DIMENSIONS = 1024
+INITIAL_CAPACITY = 1024
+
+# Once blanked rows make up this fraction of the rows written, the live rows are
+# copied into a new vectors file and renumbered
+COMPACT_AT = 0.25
+# Rows copied per step while compacting, to bound memory
+COMPACT_BATCH = 4096
+
+
+def hash_features(text, dimensions):
+    """
+    Sparse hashed term frequencies of a text
+
+    Words and adjacent word pairs are hashed into `dimensions` buckets with
+    CRC32 (stable across processes, unlike hash()); one bit of the hash picks
+    the sign so collisions tend to cancel out.
+
+    Returns:
+        Dictionary mapping bucket to sublinear (1 + log tf) weight
+    """
+    tokens = tokenize(text)
+    terms = Counter(tokens)
+    terms.update(f"{a} {b}" for a, b in zip(tokens, tokens[1:]))
+
+    features = {}
+    for term, count in terms.items():
+        h = zlib.crc32(term.encode('utf-8'))
+        bucket = (h >> 1) % dimensions
+        sign = 1.0 if h & 1 else -1.0
+        features[bucket] = features.get(bucket, 0.0) + sign * (1.0 + math.log(count))
+    return features
+
+
+def _pack_buckets(buckets):
+    """A row's bucket set as bytes for the chunks table"""
+    return np.asarray(buckets, dtype=np.int32).tobytes()
+
+
+def _unpack_buckets(data):
+    """The bucket set stored by _pack_buckets"""
+    return np.frombuffer(data, dtype=np.int32)
+
+
+class VectorIndex:
+    def __init__(self, directory='.cache/index', dimensions=DEFAULT_DIMENSIONS, chunk_size=1200):
+        """
+        Open (or create) an index
+
+        Args:
+            directory: Directory holding the vectors file and the chunk database
+            dimensions: Vector size; fixed when the index is created
+            chunk_size: Characters per chunk for pages added to the index
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.chunk_size = chunk_size
+        self._lock = threading.Lock()
+
+        self._db = sqlite3.connect(os.path.join(directory, 'index.sqlite3'), check_same_thread=False)
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+            CREATE TABLE IF NOT EXISTS documents (
+                url TEXT PRIMARY KEY,
+                content_hash TEXT NOT NULL,
+                title TEXT,
+                added REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS chunks (
+                row INTEGER PRIMARY KEY,
+                url TEXT NOT NULL,
+                text TEXT NOT NULL,
+                buckets BLOB
+            );
+            CREATE INDEX IF NOT EXISTS chunks_url ON chunks (url);
+        """)
+        stored = self._db.execute("SELECT value FROM meta WHERE key = 'dimensions'").fetchone()
+        if stored is None:
+            self._db.execute("INSERT INTO meta (key, value) VALUES ('dimensions', ?)", (str(dimensions),))
+            self._db.commit()
+        self.dimensions = int(stored[0]) if stored else dimensions
+
+        # Each row keeps the buckets it added to the document frequencies, so
+        # removing it takes back exactly those (a bucket whose terms cancel out
+        # is zero in the vector but was still counted)
+        if 'buckets' not in {row[1] for row in self._db.execute("PRAGMA table_info(chunks)")}:
+            # Index created before bucket sets were stored
+            self._db.execute("ALTER TABLE chunks ADD COLUMN buckets BLOB")
+        legacy = self._db.execute("SELECT row, text FROM chunks WHERE buckets IS NULL").fetchall()
+        for row, text in legacy:
+            buckets = _pack_buckets(list(hash_features(text, self.dimensions)))
+            self._db.execute("UPDATE chunks SET buckets = ? WHERE row = ?", (buckets, row))
+        self._db.commit()
+
+        # Rows are committed to the database after their vectors are written, so
+        # the database decides how many rows are valid. rows is where the next
+        # chunk is written; live leaves out the blanked rows of replaced pages
+        self.rows = self._db.execute("SELECT COALESCE(MAX(row) + 1, 0) FROM chunks").fetchone()[0]
+        self.live = self._db.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+
+        # Compaction writes a new vectors file; the database names the current
+        # one, so a crash mid-compaction leaves the old file and its rows in use
+        stored = self._db.execute("SELECT value FROM meta WHERE key = 'vectors'").fetchone()
+        name = stored[0] if stored else 'vectors.f32'
+        for entry in os.listdir(directory):
+            if entry.startswith('vectors-') and entry.endswith('.f32') and entry != name:
+                os.remove(os.path.join(directory, entry))
+        self._vectors_path = os.path.join(directory, name)
+        self._df_path = os.path.join(directory, 'df.npy')
+        self._vectors = None
+        self._open_vectors(max(INITIAL_CAPACITY, self.rows))
+        if legacy or not os.path.exists(self._df_path):
+            self._df = self._count_df()
+            np.save(self._df_path, self._df)
+        else:
+            self._df = np.load(self._df_path)
+
+    def _open_vectors(self, min_rows):
+        """Map the vectors file, growing it (by doubling) to hold at least min_rows"""
+        row_bytes = self.dimensions * 4
+        current = os.path.getsize(self._vectors_path) // row_bytes if os.path.exists(self._vectors_path) else 0
+        capacity = max(current, INITIAL_CAPACITY)
+        while capacity < min_rows:
+            capacity *= 2
+        if capacity != current:
+            if self._vectors is not None:
+                self._vectors.flush()
+                self._vectors = None
+            with open(self._vectors_path, 'ab') as f:
+                f.truncate(capacity * row_bytes)
+        if self._vectors is None or self._vectors.shape[0] != capacity:
+            self._vectors = np.memmap(self._vectors_path, dtype=np.float32, mode='r+', shape=(capacity, self.dimensions))
+
+    def _embed(self, texts):
+        """L2-normalized hashed vectors for a list of texts, plus their bucket sets"""
+        matrix = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        buckets = []
+        for i, text in enumerate(texts):
+            features = hash_features(text, self.dimensions)
+            if features:
+                matrix[i, list(features)] = list(features.values())
+            buckets.append(list(features))
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms, buckets
+
+    def _count_df(self):
+        """Document frequencies counted from the bucket sets of the live rows"""
+        df = np.zeros(self.dimensions, dtype=np.int64)
+        for (buckets,) in self._db.execute("SELECT buckets FROM chunks"):
+            df[_unpack_buckets(buckets)] += 1
+        return df
+
+    def _remove_rows(self, url):
+        """Blank out a page's rows so they never match again (caller holds the lock)"""
+        rows = self._db.execute("SELECT row, buckets FROM chunks WHERE url = ?", (url,)).fetchall()
+        for row, buckets in rows:
+            self._df[_unpack_buckets(buckets)] -= 1
+            self._vectors[row] = 0.0
+        self._db.execute("DELETE FROM chunks WHERE url = ?", (url,))
+        self.live -= len(rows)
+
+    def _compact(self):
+        """Copy the live rows into a new vectors file and renumber them (caller holds the lock)"""
+        live_rows = [row for (row,) in self._db.execute("SELECT row FROM chunks ORDER BY row")]
+        capacity = INITIAL_CAPACITY
+        while capacity < len(live_rows):
+            capacity *= 2
+        name = f"vectors-{time.time_ns()}.f32"
+        new_path = os.path.join(self.directory, name)
+        with open(new_path, 'wb') as f:
+            f.truncate(capacity * self.dimensions * 4)
+        vectors = np.memmap(new_path, dtype=np.float32, mode='r+', shape=(capacity, self.dimensions))
+        for start in range(0, len(live_rows), COMPACT_BATCH):
+            batch = live_rows[start:start + COMPACT_BATCH]
+            vectors[start:start + len(batch)] = self._vectors[batch]
+        vectors.flush()
+
+        # Rows only move down, so renumbering in ascending order never collides.
+        # The new rows and the new file name are committed together
+        self._db.executemany(
+            "UPDATE chunks SET row = ? WHERE row = ?",
+            [(new, old) for new, old in enumerate(live_rows)]
+        )
+        self._db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('vectors', ?)", (name,))
+        self._db.commit()
+
+        old_path = self._vectors_path
+        self._vectors = vectors
+        self._vectors_path = new_path
+        os.remove(old_path)
+        self.rows = len(live_rows)
+
+    def add_document(self, url, text, title=None):
+        """
+        Add or update a page
+
+        Only the new chunks are embedded and appended; nothing else is rebuilt.
+        A page whose text hasn't changed is skipped, and a changed page has its
+        old chunks blanked out. Once blanked rows pass COMPACT_AT of the rows
+        written, the vectors file is compacted.
+
+        Args:
+            url: Page URL (returned with search results as the source)
+            text: Page text
+            title: Optional page title
+
+        Returns:
+            Number of chunks added (0 if the page was unchanged)
+        """
+        content_hash = hashlib.sha256(text.encode('utf-8', errors='replace')).hexdigest()
+        chunks = chunk_text(text, chunk_size=self.chunk_size)
+        vectors, buckets = self._embed(chunks)
+
+        with self._lock:
+            row = self._db.execute("SELECT content_hash FROM documents WHERE url = ?", (url,)).fetchone()
+            if row is not None and row[0] == content_hash:
+                return 0
+            if row is not None:
+                self._remove_rows(url)
+
+            start = self.rows
+            self._open_vectors(start + len(chunks))
+            self._vectors[start:start + len(chunks)] = vectors
+            self._vectors.flush()
+            for features in buckets:
+                self._df[features] += 1
+
+            self._db.executemany(
+                "INSERT INTO chunks (row, url, text, buckets) VALUES (?, ?, ?, ?)",
+                [(start + i, url, chunk, _pack_buckets(buckets[i])) for i, chunk in enumerate(chunks)]
+            )
+            self._db.execute(
+                "INSERT OR REPLACE INTO documents (url, content_hash, title, added) VALUES (?, ?, ?, ?)",
+                (url, content_hash, title, time.time())
+            )
+            self._db.commit()
+            np.save(self._df_path, self._df)
+            self.rows = start + len(chunks)
+            self.live += len(chunks)
+            if self.rows - self.live > COMPACT_AT * self.rows:
+                self._compact()
+            return len(chunks)
+
+    def search(self, query, k=5):
+        """
+        Find the chunks most similar to a query
+
+        Cosine similarity against every row in one matrix-vector product; query
+        terms are weighted by inverse document frequency so rare words count more.
+
+        Args:
+            query: Query text
+            k: Number of results
+
+        Returns:
+            List of dictionaries with 'url', 'text' and 'score', best first
+        """
+        features = hash_features(query, self.dimensions)
+        if not features:
+            return []
+
+        with self._lock:
+            rows = self.rows
+            if self.live == 0:
+                return []
+            query_vector = np.zeros(self.dimensions, dtype=np.float32)
+            query_vector[list(features)] = list(features.values())
+            idf = np.log1p(self.live / (1.0 + self._df)).astype(np.float32)
+            query_vector *= idf
+            norm = np.linalg.norm(query_vector)
+            if norm == 0:
+                return []
+
+            scores = self._vectors[:rows] @ (query_vector / norm)
+            k = min(k, rows)
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            top = [int(row) for row in top if scores[row] > 0]
+            if not top:
+                return []
+
+            placeholders = ','.join('?' * len(top))
+            texts = {
+                row: (url, text)
+                for row, url, text in self._db.execute(
+                    f"SELECT row, url, text FROM chunks WHERE row IN ({placeholders})", top
+                )
+            }
+        return [
+            {'url': texts[row][0], 'text': texts[row][1], 'score': float(scores[row])}
+            for row in top if row in texts
+        ]
+
+    def __len__(self):
+        return self.live
+
+    def documents(self):
+        """Number of pages in the index"""
+        return self._db.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+
+    def close(self):
+        """Flush and release the vectors file and the database"""
+        with self._lock:
+            if self._vectors is not None:
+                self._vectors.flush()
+                self._vectors = None
+            self._db.close()